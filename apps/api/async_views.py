@@ -0,0 +1,174 @@
+"""
+Variantes async de los endpoints que consultan cocina y tablets cada pocos
+segundos: detalles pendientes, últimas órdenes y detalle de una orden.
+
+Se sirven bajo restaurante/asgi.py con el ORM async de Django. Mientras una
+petición espera, el event loop sigue atendiendo otras conexiones en lugar de
+ocupar un worker completo como en gunicorn con workers síncronos. Django aún
+ejecuta cada consulta en un hilo (sync_to_async), así que la ganancia está en
+conexiones simultáneas, no en el tiempo de cada consulta.
+
+Las respuestas son las mismas que las de las vistas DRF de views.py: mismos
+serializers, ETag y X-Cursor en detalles pendientes y Link en últimas órdenes.
+"""
+import base64
+import binascii
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import aauthenticate
+from django.http import HttpResponse
+from django.views import View
+from rest_framework.exceptions import ValidationError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.urls import replace_query_param
+from apps.ordenes.archivo import archivo_de_filtros
+from apps.ordenes.models import Orden, OrdenArchivada, OrdenDetalle
+from apps.ordenes.pagadas import aguardar_orden_pagada, aobtener_orden_pagada, etag_orden_pagada
+from apps.ordenes.paginacion import CursorInvalido, apaginar_por_cursor, filtrar_ordenes
+from apps.platillos.catalogo import obtener_catalogo
+from restaurante.replicas import lectura_en_replica
+from .pagination import encabezados_paginacion, leer_limite
+from .serializers import OrdenDetalleSerializer, OrdenSerializer
+from .views import OrdenDetalleListAPIView, consulta_ultimo_cambio, _decodificar_marca, _etag_detalles, coincide_etag
+
+
+def respuesta_json(data, status=200, headers=None):
+    return HttpResponse(JSONRenderer().render(data), status=status, headers=headers, content_type='application/json')
+
+
+async def autenticar(request):
+    """Sesión o autenticación básica, como SessionAuthentication + BasicAuthentication."""
+    usuario = await request.auser()
+    if usuario.is_authenticated:
+        return usuario
+
+    tipo, _, credenciales = request.headers.get('Authorization', '').partition(' ')
+    if tipo.lower() != 'basic' or not credenciales:
+        return None
+    try:
+        username, _, password = base64.b64decode(credenciales).decode().partition(':')
+    except (binascii.Error, UnicodeError):
+        return None
+    usuario = await aauthenticate(request, username=username, password=password)
+    return usuario if usuario is not None and usuario.is_active else None
+
+
+async def catalogo_cargado():
+    # El catálogo puede necesitar consultas si cambió de versión; no se permiten en el event loop
+    return await sync_to_async(obtener_catalogo)()
+
+
+@lectura_en_replica
+class APIAsyncView(View):
+    async def dispatch(self, request, *args, **kwargs):
+        if await autenticar(request) is None:
+            return respuesta_json(
+                {'detail': 'Authentication credentials were not provided.'},
+                status=401, headers={'WWW-Authenticate': 'Basic realm="api"'},
+            )
+        try:
+            return await super().dispatch(request, *args, **kwargs)
+        except ValidationError as e:
+            return respuesta_json(e.detail, status=400)
+
+
+class OrdenDetalleListAsyncView(APIAsyncView):
+    """Versión async de OrdenDetalleListAPIView (mismos parámetros y encabezados)."""
+    ventana_since = OrdenDetalleListAPIView.ventana_since
+
+    async def get(self, request):
+        since = request.GET.get('since')
+        etag, cursor = _etag_detalles(await consulta_ultimo_cambio().afirst())
+
+        if coincide_etag(request, etag):
+            response = HttpResponse(status=304)
+        elif since is None:
+            catalogo = await catalogo_cargado()
+            detalles = [
+                detalle async for detalle in OrdenDetalleSerializer.preparar_queryset(
+                    OrdenDetalle.objects.filter(orden__estatus='pendiente')
+                )
+            ]
+            response = respuesta_json(OrdenDetalleSerializer(detalles, many=True, context={'catalogo': catalogo}).data)
+        else:
+            response = respuesta_json(await self.get_delta(_decodificar_marca(since), cursor))
+
+        response['ETag'] = etag
+        response['X-Cursor'] = cursor
+        return response
+
+    async def get_delta(self, desde, cursor):
+        pendientes = [
+            pk async for pk in Orden.objects.filter(estatus='pendiente').order_by('id').values_list('id', flat=True)
+        ]
+        tocadas = [
+            fila async for fila in Orden.objects.filter(
+                actualizado__gte=desde - self.ventana_since
+            ).values_list('id', 'estatus')
+        ]
+        actualizadas = [pk for pk, estatus in tocadas if estatus == 'pendiente']
+        completadas = [pk for pk, estatus in tocadas if estatus != 'pendiente']
+        detalles = [
+            detalle async for detalle in OrdenDetalleSerializer.preparar_queryset(
+                OrdenDetalle.objects.filter(orden_id__in=actualizadas)
+            )
+        ] if actualizadas else []
+        catalogo = await catalogo_cargado()
+
+        return {
+            'cursor': cursor,
+            'ordenes_actualizadas': actualizadas,
+            'ordenes_completadas': completadas,
+            'ordenes_pendientes': pendientes,
+            'detalles': OrdenDetalleSerializer(detalles, many=True, context={'catalogo': catalogo}).data,
+        }
+
+
+class UltimasOrdenesAsyncView(APIAsyncView):
+    """Versión async de UltimasOrdenesAPIView (filtros, limite, cursor y encabezado Link)."""
+    async def get(self, request):
+        try:
+            queryset = filtrar_ordenes(OrdenSerializer.preparar_queryset(Orden.objects.all()), request.GET)
+        except CursorInvalido as e:
+            raise ValidationError({'fecha': str(e)})
+        archivo = await sync_to_async(archivo_de_filtros)(
+            request.GET, OrdenSerializer.preparar_queryset(OrdenArchivada.objects.all())
+        )
+        try:
+            ordenes, siguiente = await apaginar_por_cursor(
+                queryset, request.GET.get('cursor'), leer_limite(request.GET), archivo
+            )
+        except CursorInvalido as e:
+            raise ValidationError({'cursor': str(e)})
+
+        catalogo = await catalogo_cargado()
+        siguiente_url = siguiente and replace_query_param(request.build_absolute_uri(), 'cursor', siguiente)
+        return respuesta_json(
+            OrdenSerializer(ordenes, many=True, context={'catalogo': catalogo}).data,
+            headers=encabezados_paginacion(siguiente_url),
+        )
+
+
+class OrdenDetailAsyncView(APIAsyncView):
+    """Versión async de OrdenDetailAPIView, con la misma caché de órdenes pagadas."""
+    async def get(self, request, pk):
+        entrada = await aobtener_orden_pagada('api', pk)
+        if entrada is None:
+            orden = await OrdenSerializer.preparar_queryset(Orden.objects.filter(pk=pk)).afirst()
+            if orden is None:
+                orden = await OrdenSerializer.preparar_queryset(OrdenArchivada.objects.filter(pk=pk)).afirst()
+            if orden is None:
+                return respuesta_json({'detail': 'No Orden matches the given query.'}, status=404)
+            catalogo = await catalogo_cargado()
+            data = OrdenSerializer(orden, context={'catalogo': catalogo}).data
+            if orden.estatus != 'pagada':
+                return respuesta_json(data)
+            entrada = await aguardar_orden_pagada('api', orden, {'etag': etag_orden_pagada(orden), 'data': data})
+
+        headers = {
+            'ETag': entrada['etag'],
+            'Cache-Control': f'private, max-age={settings.ORDENES_PAGADAS_MAX_AGE}',
+        }
+        if coincide_etag(request, entrada['etag']):
+            return HttpResponse(status=304, headers=headers)
+        return respuesta_json(entrada['data'], headers=headers)
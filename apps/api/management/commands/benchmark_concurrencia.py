@@ -0,0 +1,135 @@
+import base64
+import http.client
+import json
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from statistics import mean
+from urllib.parse import urlsplit
+from django.core.management.base import BaseCommand, CommandError
+from restaurante.metricas import percentil
+
+
+class Cliente:
+    """Una tablet: conexión keep-alive que repite la misma petición hasta la fecha límite."""
+    def __init__(self, url, encabezados, timeout):
+        self.partes = urlsplit(url)
+        self.ruta = self.partes.path + (f'?{self.partes.query}' if self.partes.query else '')
+        self.encabezados = encabezados
+        self.timeout = timeout
+        self.conexion = None
+        self.tiempos = []
+        self.errores = 0
+
+    def conectar(self):
+        clase = http.client.HTTPSConnection if self.partes.scheme == 'https' else http.client.HTTPConnection
+        self.conexion = clase(self.partes.netloc, timeout=self.timeout)
+
+    def ejecutar(self, inicio, limite):
+        inicio.wait()
+        while time.perf_counter() < limite:
+            if self.conexion is None:
+                self.conectar()
+            comienzo = time.perf_counter()
+            try:
+                self.conexion.request('GET', self.ruta, headers=self.encabezados)
+                respuesta = self.conexion.getresponse()
+                respuesta.read()
+            except (OSError, http.client.HTTPException):
+                self.errores += 1
+                self.conexion.close()
+                self.conexion = None
+                continue
+            if respuesta.status == 200:
+                self.tiempos.append((time.perf_counter() - comienzo) * 1000)
+            else:
+                self.errores += 1
+        if self.conexion is not None:
+            self.conexion.close()
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara cuántas conexiones simultáneas sostienen uno o más despliegues (p. ej. gunicorn WSGI '
+        'y uvicorn ASGI): para cada nivel de concurrencia abre N clientes keep-alive contra cada URL '
+        'durante --duracion segundos y reporta peticiones/s, latencias y errores.'
+    )
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument('objetivos', nargs='+', metavar='nombre=url',
+                            help='Despliegues a medir, p. ej. wsgi=http://127.0.0.1:8000/api/ordenes-pendientes/')
+        parser.add_argument('--usuario', help='Usuario para autenticación básica (cada petición calcula el hash del password)')
+        parser.add_argument('--password', default='')
+        parser.add_argument('--cookie', help='Cookie de sesión ya iniciada, p. ej. sessionid=...; evita el costo del hash')
+        parser.add_argument('--concurrencia', default='10,50,100,200',
+                            help='Niveles de clientes simultáneos separados por coma')
+        parser.add_argument('--duracion', type=float, default=10, help='Segundos por nivel')
+        parser.add_argument('--timeout', type=float, default=10, help='Segundos antes de contar una petición como error')
+        parser.add_argument('--salida', help='Archivo JSON de resultados')
+
+    def handle(self, *args, **options):
+        objetivos = {}
+        for objetivo in options['objetivos']:
+            nombre, separador, url = objetivo.partition('=')
+            if not separador or not url.startswith(('http://', 'https://')):
+                raise CommandError(f'Objetivo inválido: {objetivo}. Use nombre=http://host:puerto/ruta/')
+            objetivos[nombre] = url
+        try:
+            niveles = [int(nivel) for nivel in options['concurrencia'].split(',')]
+        except ValueError:
+            raise CommandError('--concurrencia debe ser una lista de enteros separados por coma')
+
+        encabezados = {'Connection': 'keep-alive'}
+        if options['usuario']:
+            credenciales = base64.b64encode(f'{options["usuario"]}:{options["password"]}'.encode()).decode()
+            encabezados['Authorization'] = f'Basic {credenciales}'
+        if options['cookie']:
+            encabezados['Cookie'] = options['cookie']
+
+        self.stdout.write(f'{"despliegue":<12} {"clientes":>8} {"pet/s":>9} {"p50 ms":>9} {"p95 ms":>9} {"errores":>8}')
+        resultados = {}
+        for nombre, url in objetivos.items():
+            resultados[nombre] = {'url': url, 'niveles': []}
+            for clientes in niveles:
+                fila = self.medir(url, clientes, encabezados, options['duracion'], options['timeout'])
+                resultados[nombre]['niveles'].append(fila)
+                self.stdout.write(
+                    f'{nombre:<12} {clientes:>8} {fila["peticiones_por_segundo"]:>9.1f} '
+                    f'{fila["p50_ms"]:>9.1f} {fila["p95_ms"]:>9.1f} {fila["errores"]:>8}'
+                )
+
+        if options['salida']:
+            reporte = {
+                'fecha': datetime.now().isoformat(timespec='seconds'),
+                'duracion': options['duracion'],
+                'resultados': resultados,
+            }
+            Path(options['salida']).write_text(json.dumps(reporte, indent=2, ensure_ascii=False))
+            self.stdout.write(f'Resultados guardados en {options["salida"]}')
+
+    def medir(self, url, clientes, encabezados, duracion, timeout):
+        inicio = threading.Barrier(clientes + 1)
+        lista = [Cliente(url, encabezados, timeout) for _ in range(clientes)]
+        # La fecha límite se fija antes de arrancar; la barrera hace que todos empiecen juntos
+        limite = time.perf_counter() + duracion
+        hilos = [threading.Thread(target=cliente.ejecutar, args=(inicio, limite), daemon=True) for cliente in lista]
+        for hilo in hilos:
+            hilo.start()
+        comienzo = time.perf_counter()
+        inicio.wait()
+        for hilo in hilos:
+            hilo.join()
+        transcurrido = time.perf_counter() - comienzo
+
+        tiempos = [tiempo for cliente in lista for tiempo in cliente.tiempos]
+        return {
+            'clientes': clientes,
+            'peticiones': len(tiempos),
+            'peticiones_por_segundo': round(len(tiempos) / transcurrido, 1),
+            'p50_ms': round(percentil(sorted(tiempos), 50), 1) if tiempos else 0,
+            'p95_ms': round(percentil(sorted(tiempos), 95), 1) if tiempos else 0,
+            'media_ms': round(mean(tiempos), 1) if tiempos else 0,
+            'errores': sum(cliente.errores for cliente in lista),
+        }
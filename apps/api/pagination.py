@@ -0,0 +1,51 @@
+from django.conf import settings
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+from apps.ordenes.paginacion import CursorInvalido, paginar_por_cursor
+
+def leer_limite(params, nombre='limite'):
+    """Tamaño de página pedido en `params`, acotado a ORDENES_POR_PAGINA_MAX."""
+    try:
+        limite = int(params.get(nombre, settings.ORDENES_POR_PAGINA_API))
+    except ValueError:
+        raise ValidationError({nombre: 'Debe ser un número entero'})
+    return max(1, min(limite, settings.ORDENES_POR_PAGINA_MAX))
+
+
+class OrdenCursorPagination(BasePagination):
+    """
+    Paginación por cursor sobre (fecha_hora, id). El cuerpo sigue siendo una
+    lista; la siguiente página se anuncia en el encabezado Link (rel="next").
+    Parámetros: cursor y limite. Si la vista define get_archivo(), pagina
+    también las órdenes archivadas que retorne.
+    """
+    cursor_query_param = 'cursor'
+    limite_query_param = 'limite'
+
+    def get_limite(self, request):
+        return leer_limite(request.query_params, self.limite_query_param)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        archivo = view.get_archivo() if hasattr(view, 'get_archivo') else None
+        try:
+            ordenes, self.siguiente = paginar_por_cursor(
+                queryset, request.query_params.get(self.cursor_query_param), self.get_limite(request), archivo
+            )
+        except CursorInvalido as e:
+            raise ValidationError({self.cursor_query_param: str(e)})
+        return ordenes
+
+    def get_next_link(self):
+        if self.siguiente is None:
+            return None
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, self.siguiente)
+
+    def get_paginated_response(self, data):
+        return Response(data, headers=encabezados_paginacion(self.get_next_link()))
+
+
+def encabezados_paginacion(siguiente):
+    return {'Link': f'<{siguiente}>; rel="next"'} if siguiente else {}
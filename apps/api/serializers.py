@@ -1,5 +1,9 @@
+from django.db.models import Prefetch
 from rest_framework import serializers
-from apps.ordenes.models import Orden, OrdenDetalle, Mesa
+from apps.ordenes.models import (
+    Orden, OrdenArchivada, OrdenDetalle, OrdenDetalleArchivado, Mesa, VentasDiarias, VentasDiariasMetodoPago, VentasDiariasCategoria,
+)
+from apps.platillos.catalogo import obtener_catalogo
 from apps.platillos.models import Platillo, Categoria
 from apps.accounts.models import AppUser
 
@@ -15,13 +19,33 @@ class PlatilloSerializer(serializers.ModelSerializer):
         model = Platillo
         fields = ['id', 'nombre', 'descripcion', 'precio', 'categoria']
 
+class PlatilloCatalogoField(serializers.Field):
+    """
+    Platillo anidado tomado del catálogo en memoria en lugar de un JOIN;
+    el catálogo se resuelve una vez por respuesta y se guarda en el contexto.
+    """
+    def __init__(self, **kwargs):
+        kwargs.update(source='platillo_id', read_only=True)
+        super().__init__(**kwargs)
+
+    def to_representation(self, platillo_id):
+        catalogo = self.context.get('catalogo')
+        if catalogo is None:
+            catalogo = self.context['catalogo'] = obtener_catalogo()
+        return catalogo.serializado(platillo_id, PlatilloSerializer)
+
 class OrdenDetalleSerializer(serializers.ModelSerializer):
-    platillo = PlatilloSerializer(read_only=True)
+    platillo = PlatilloCatalogoField()
     subtotal = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True)
 
     class Meta:
         model = OrdenDetalle
-        fields = ['id', 'platillo', 'cantidad', 'notas', 'precio_unitario', 'subtotal']
+        fields = ['id', 'orden', 'platillo', 'cantidad', 'notas', 'precio_unitario', 'subtotal']
+
+    @classmethod
+    def preparar_queryset(cls, queryset):
+        """El platillo sale del catálogo en memoria, no hay relaciones que cargar."""
+        return queryset
 
 class MesaSerializer(serializers.ModelSerializer):
     estado = serializers.StringRelatedField()
@@ -43,4 +67,42 @@ class OrdenSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Orden
-        fields = ['id', 'empleado', 'mesa', 'fecha_hora', 'estatus', 'detalles', 'total']
+        fields = ['id', 'empleado', 'mesa', 'fecha_hora', 'estatus', 'detalles', 'total', 'num_detalles']
+
+    @classmethod
+    def preparar_queryset(cls, queryset):
+        """
+        Carga de antemano mesa, estado, empleado y detalles con sus platillos,
+        de modo que serializar cualquier número de órdenes cueste dos consultas.
+        total y num_detalles son columnas de Orden, no requieren consultas extra.
+        Acepta también querysets de OrdenArchivada, con sus detalles archivados.
+        """
+        detalles = OrdenDetalleArchivado if queryset.model is OrdenArchivada else OrdenDetalle
+        return queryset.select_related('mesa__estado', 'empleado').prefetch_related(
+            Prefetch('detalles', queryset=OrdenDetalleSerializer.preparar_queryset(detalles.objects.order_by('id')))
+        )
+
+class VentasDiariasSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = VentasDiarias
+        fields = ['fecha', 'total', 'ordenes']
+
+class VentasDiariasMetodoPagoSerializer(serializers.ModelSerializer):
+    metodo_pago = serializers.CharField(source='metodo_pago.nombre', read_only=True)
+
+    class Meta:
+        model = VentasDiariasMetodoPago
+        fields = ['fecha', 'metodo_pago', 'total', 'ordenes']
+
+class VentasDiariasCategoriaSerializer(serializers.ModelSerializer):
+    categoria = serializers.CharField(source='categoria.nombre', read_only=True)
+
+    class Meta:
+        model = VentasDiariasCategoria
+        fields = ['fecha', 'categoria', 'total', 'cantidad']
+
+class PlatilloVendidoSerializer(serializers.Serializer):
+    """Fila de ventas.mas_vendidos(); el platillo sale del catálogo en memoria."""
+    platillo = PlatilloCatalogoField()
+    cantidad = serializers.IntegerField()
+    total = serializers.DecimalField(max_digits=14, decimal_places=2)
@@ -1,3 +1,210 @@
-from django.test import TestCase
+import base64
+from datetime import timedelta
+from unittest import mock
+from asgiref.sync import async_to_sync
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from apps.ordenes.models import Orden, OrdenDetalle
+from apps.ordenes.pagadas import clave_orden_pagada
+from apps.ordenes.tests import DatosOrdenesMixin
+
+# Sesión + usuario + consulta principal (+ prefetch de detalles en órdenes,
+# + último cambio para el ETag en detalles pendientes). Los platillos no cuestan
+# consultas: salen del catálogo en memoria.
+CONSULTAS_DETALLES_PENDIENTES = 4
+CONSULTAS_ORDENES = 4
+
+
+class PresupuestoConsultasTests(DatosOrdenesMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.usuario)
+
+    def crear_ordenes(self, cantidad, lineas):
+        for _ in range(cantidad):
+            orden = self.crear_orden(estatus='pendiente')
+            for _ in range(lineas - 1):
+                OrdenDetalle.objects.create(orden=orden, platillo=self.platillo, cantidad=1, precio_unitario=self.platillo.precio)
+
+    def test_ordenes_pendientes_consultas_constantes(self):
+        self.crear_ordenes(1, 1)
+        with self.assertNumQueries(CONSULTAS_DETALLES_PENDIENTES):
+            self.client.get(reverse('api:orden_detalle_list'))
+
+        self.crear_ordenes(4, 3)
+        with self.assertNumQueries(CONSULTAS_DETALLES_PENDIENTES):
+            response = self.client.get(reverse('api:orden_detalle_list'))
+        self.assertEqual(len(response.json()), 13)
+
+    def test_ultimas_ordenes_consultas_constantes(self):
+        self.crear_ordenes(1, 1)
+        with self.assertNumQueries(CONSULTAS_ORDENES):
+            self.client.get(reverse('api:ultimas_ordenes'))
+
+        self.crear_ordenes(6, 4)
+        with self.assertNumQueries(CONSULTAS_ORDENES):
+            response = self.client.get(reverse('api:ultimas_ordenes'))
+        self.assertEqual(len(response.json()), 7)
+        self.assertEqual(response.json()[0]['total'], '60.00')
+
+    def test_detalle_orden_consultas_constantes(self):
+        self.crear_ordenes(1, 5)
+        orden = OrdenDetalle.objects.first().orden
+        with self.assertNumQueries(CONSULTAS_ORDENES):
+            response = self.client.get(reverse('api:orden_detail', args=[orden.id]))
+        self.assertEqual(len(response.json()['detalles']), 5)
+
+
+class DeltaDetallesPendientesTests(DatosOrdenesMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.usuario)
+        self.url = reverse('api:orden_detalle_list')
+
+    def test_since_retorna_solo_ordenes_tocadas(self):
+        vieja = self.crear_orden(estatus='pendiente')
+        Orden.objects.filter(pk=vieja.pk).update(actualizado=vieja.actualizado - timedelta(minutes=5))
+        cursor = self.client.get(self.url)['X-Cursor']
+
+        Orden.objects.filter(pk=vieja.pk).update(actualizado=vieja.actualizado - timedelta(minutes=10))
+        nueva = self.crear_orden(estatus='pendiente')
+        delta = self.client.get(self.url, {'since': cursor}).json()
+
+        self.assertEqual(delta['ordenes_actualizadas'], [nueva.id])
+        self.assertEqual([detalle['orden'] for detalle in delta['detalles']], [nueva.id])
+
+        nueva.estatus = 'pagada'
+        nueva.save()
+        delta = self.client.get(self.url, {'since': delta['cursor']}).json()
+        self.assertEqual(delta['ordenes_completadas'], [nueva.id])
+        self.assertEqual(delta['detalles'], [])
+
+    def test_sin_cambios_responde_304(self):
+        # Como una pantalla de cocina: cada sondeo manda el cursor y el ETag de la respuesta anterior
+        self.crear_orden(estatus='pendiente')
+        response = self.client.get(self.url)
+        response = self.client.get(self.url, {'since': response['X-Cursor']}, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+        nueva = self.crear_orden(estatus='pendiente')
+        response = self.client.get(self.url, {'since': response['X-Cursor']}, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(nueva.id, response.json()['ordenes_actualizadas'])
+
+        response = self.client.get(self.url, {'since': response['X-Cursor']}, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_etag_cambia_al_eliminar_una_orden_pendiente(self):
+        eliminada = self.crear_orden(estatus='pendiente')
+        self.crear_orden(estatus='pendiente')
+        etag = self.client.get(self.url)['ETag']
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        eliminada.delete()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 1)
+
+    def test_delta_reporta_ordenes_pendientes_eliminadas(self):
+        eliminada = self.crear_orden(estatus='pendiente')
+        sigue = self.crear_orden(estatus='pendiente')
+        response = self.client.get(self.url)
+
+        eliminada.delete()
+        for url in (self.url, reverse('api:orden_detalle_list_async')):
+            delta = self.client.get(url, {'since': response['X-Cursor']}, HTTP_IF_NONE_MATCH=response['ETag'])
+            self.assertEqual(delta.status_code, 200)
+            self.assertEqual(delta.json()['ordenes_pendientes'], [sigue.id])
+            self.assertNotIn(eliminada.id, delta.json()['ordenes_actualizadas'])
+
+    def test_if_none_match_compara_etags_completos(self):
+        self.crear_orden(estatus='pendiente')
+        etag = self.client.get(self.url)['ETag']
+
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=f'{etag}x').status_code, 200)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=f'W/{etag}').status_code, 304)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=f'"otro", {etag}').status_code, 304)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH='*').status_code, 304)
+
+
+class PlatillosMasVendidosTests(DatosOrdenesMixin, TestCase):
+    def test_top_por_ventana(self):
+        self.crear_orden(cantidad=3)
+        self.client.force_login(self.usuario)
+        response = self.client.get(reverse('api:platillos_mas_vendidos'), {'ventana': '7d'})
+
+        fila = response.json()['platillos'][0]
+        self.assertEqual((fila['platillo']['nombre'], fila['cantidad'], fila['total']), ('Margherita', 3, '45.00'))
+        self.assertEqual(self.client.get(reverse('api:platillos_mas_vendidos'), {'ventana': 'anio'}).status_code, 400)
+
+
+class VistasAsyncTests(DatosOrdenesMixin, TestCase):
+    """Las variantes async responden lo mismo que las vistas DRF."""
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.usuario)
+        async_to_sync(self.async_client.aforce_login)(self.usuario)
+        for _ in range(3):
+            self.crear_orden(cantidad=2, estatus='pendiente')
+        self.crear_orden()
+
+    def comparar(self, nombre, *args, **params):
+        sincrona = self.client.get(reverse(f'api:{nombre}', args=args), params)
+        asincrona = async_to_sync(self.async_client.get)(reverse(f'api:{nombre}_async', args=args), params)
+        self.assertEqual(asincrona.status_code, sincrona.status_code)
+        self.assertEqual(asincrona.json(), sincrona.json())
+        return sincrona, asincrona
+
+    def test_mismas_respuestas(self):
+        sincrona, asincrona = self.comparar('orden_detalle_list')
+        self.assertEqual(asincrona['ETag'], sincrona['ETag'])
+        self.comparar('orden_detalle_list', since=sincrona['X-Cursor'])
+        sincrona, asincrona = self.comparar('ultimas_ordenes', limite=2)
+        self.assertEqual(asincrona['Link'], sincrona['Link'].replace('/api/', '/api/async/'))
+        self.comparar('orden_detail', Orden.objects.first().pk)
+        self.comparar('orden_detail', 0)
+        self.comparar('ultimas_ordenes', cursor='xx')
+
+    def test_autenticacion_basica(self):
+        async_to_sync(self.async_client.alogout)()
+        url = reverse('api:ultimas_ordenes_async')
+        self.assertEqual(async_to_sync(self.async_client.get)(url).status_code, 401)
+
+        credenciales = base64.b64encode(b'mesero:secreto123').decode()
+        response = async_to_sync(self.async_client.get)(url, headers={'Authorization': f'Basic {credenciales}'})
+        self.assertEqual(len(response.json()), 4)
+
+
+class OrdenPagadaCacheTests(DatosOrdenesMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.usuario)
+        self.orden = self.crear_orden(cantidad=2)
+        self.url = reverse('api:orden_detail', args=[self.orden.pk])
+
+    def test_orden_pagada_sin_consultas_y_304(self):
+        primera = self.client.get(self.url)
+        with self.assertNumQueries(2):  # Solo sesión y usuario
+            segunda = self.client.get(self.url)
+
+        self.assertEqual(segunda.json(), primera.json())
+        self.assertTrue(segunda['ETag'].startswith('"'))
+        self.assertEqual(segunda['Cache-Control'], 'private, max-age=300')
+        response = self.client.get(self.url, headers={'If-None-Match': segunda['ETag']})
+        self.assertEqual(response.status_code, 304)
+
+    @override_settings(ORDENES_PAGADAS_TIMEOUT=60)
+    def test_entrada_expira(self):
+        with mock.patch('apps.ordenes.pagadas.cache.set') as guardar:
+            self.client.get(self.url)
+        guardar.assert_any_call(clave_orden_pagada('api', self.orden.pk), mock.ANY, 60)
+
+    def test_reabrir_invalida(self):
+        self.client.get(self.url)
+        self.orden.estatus = 'pendiente'
+        self.orden.save()
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.json()['estatus'], 'pendiente')
+        self.assertNotIn('ETag', response)
 
-# Create your tests here.
@@ -1,5 +1,5 @@
 from django.urls import path
-from . import views
+from . import async_views, views
 
 app_name = 'api'
 
@@ -7,4 +7,9 @@ urlpatterns = [
     path('ordenes-pendientes/', views.OrdenDetalleListAPIView.as_view(), name='orden_detalle_list'),
     path('ultimas-ordenes/', views.UltimasOrdenesAPIView.as_view(), name='ultimas_ordenes'),
     path('ordenes/<int:pk>/', views.OrdenDetailAPIView.as_view(), name='orden_detail'),
+    path('ventas-diarias/', views.VentasDiariasAPIView.as_view(), name='ventas_diarias'),
+    path('platillos-mas-vendidos/', views.PlatillosMasVendidosAPIView.as_view(), name='platillos_mas_vendidos'),
+    path('async/ordenes-pendientes/', async_views.OrdenDetalleListAsyncView.as_view(), name='orden_detalle_list_async'),
+    path('async/ultimas-ordenes/', async_views.UltimasOrdenesAsyncView.as_view(), name='ultimas_ordenes_async'),
+    path('async/ordenes/<int:pk>/', async_views.OrdenDetailAsyncView.as_view(), name='orden_detail_async'),
 ]
@@ -1,49 +1,245 @@
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from django.conf import settings
+from django.db.models import Count, Subquery
+from django.db.models.functions import Coalesce
+from django.http import Http404
 from django.shortcuts import render
+from django.utils import timezone
+from django.utils.http import parse_etags
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework import generics
-from apps.ordenes.models import Orden, OrdenDetalle
+from rest_framework import generics, status
+from apps.ordenes.models import Orden, OrdenArchivada, OrdenDetalle, VentasDiarias, VentasDiariasMetodoPago, VentasDiariasCategoria
 from rest_framework.authentication import SessionAuthentication, BasicAuthentication
 from rest_framework.permissions import IsAuthenticated
-from .serializers import OrdenDetalleSerializer, OrdenSerializer
+from apps.ordenes.archivo import archivo_de_filtros
+from apps.ordenes.pagadas import etag_orden_pagada, guardar_orden_pagada, obtener_orden_pagada
+from apps.ordenes.paginacion import CursorInvalido, filtrar_ordenes
+from apps.ordenes.ventas import VENTANAS, mas_vendidos
+from apps.platillos.catalogo import obtener_catalogo
+from restaurante.replicas import lectura_en_replica
+from .pagination import OrdenCursorPagination
+from .serializers import (
+    OrdenDetalleSerializer, OrdenSerializer, PlatilloVendidoSerializer, VentasDiariasSerializer,
+    VentasDiariasMetodoPagoSerializer, VentasDiariasCategoriaSerializer,
+)
 
+def _codificar_marca(fecha_hora):
+    return str(int(fecha_hora.timestamp() * 1_000_000)) if fecha_hora else '0'
+
+def _decodificar_marca(cursor):
+    try:
+        microsegundos = int(cursor)
+    except ValueError:
+        raise ValidationError({'since': 'Cursor inválido'})
+    return datetime.fromtimestamp(microsegundos / 1_000_000, tz=dt_timezone.utc)
+
+def consulta_ultimo_cambio():
+    """
+    Último cambio de cualquier orden y número de órdenes pendientes, en una
+    consulta que lee solo índices. El conteo detecta órdenes pendientes
+    eliminadas, que no cambian el último `actualizado`.
+    """
+    pendientes = Orden.objects.filter(estatus='pendiente').order_by().values('estatus').annotate(
+        conteo=Count('id')
+    ).values('conteo')
+    return Orden.objects.order_by('-actualizado').values('actualizado').annotate(
+        pendientes=Coalesce(Subquery(pendientes), 0)
+    )[:1]
+
+def _etag_detalles(ultimo):
+    """
+    ETag y cursor de los detalles pendientes a partir de la fila de
+    consulta_ultimo_cambio(). Solo depende del estado actual, no del since
+    pedido: un cliente que sondea con el cursor y el ETag de la respuesta
+    anterior recibe 304 mientras nada cambie.
+    """
+    cursor = _codificar_marca(ultimo and ultimo['actualizado'])
+    return f'"{cursor}-{ultimo["pendientes"] if ultimo else 0}"', cursor
+
+def coincide_etag(request, etag):
+    """Si `etag` está en If-None-Match (lista separada por comas, o *), con comparación débil."""
+    etags = parse_etags(request.headers.get('If-None-Match', ''))
+    return etags == ['*'] or etag in (valor.removeprefix('W/') for valor in etags)
+
+@lectura_en_replica
 class OrdenDetalleListAPIView(APIView):
     """
     API endpoint que retorna los detalles de órdenes pendientes
+
+    Sin parámetros retorna la lista completa y el cursor actual en X-Cursor.
+    Con ?since=<cursor> retorna solo las órdenes tocadas desde ese cursor:
+    ordenes_actualizadas (reemplazar sus líneas por las incluidas en detalles)
+    y ordenes_completadas (quitar sus líneas), junto con el nuevo cursor.
+    Una orden eliminada ya no tiene fila que aparezca en el delta, así que
+    también se envía ordenes_pendientes, el conjunto completo de ids: quitar
+    las líneas de cualquier orden que no esté ahí.
+    Si nada cambió responde 304 al reenviar el ETag recibido.
     """
     authentication_classes = [SessionAuthentication, BasicAuthentication]
     permission_classes = [IsAuthenticated]
+    # Margen para cambios confirmados fuera de orden; reenviar una orden es idempotente
+    ventana_since = timedelta(seconds=2)
 
     def get(self, request, format=None):
-        orden_detalles = OrdenDetalle.objects.filter(orden__estatus='pendiente')
-        serializer = OrdenDetalleSerializer(orden_detalles, many=True)
-        return Response(serializer.data)
+        since = request.query_params.get('since')
+        etag, cursor = _etag_detalles(consulta_ultimo_cambio().first())
 
+        if coincide_etag(request, etag):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        elif since is None:
+            orden_detalles = OrdenDetalleSerializer.preparar_queryset(
+                OrdenDetalle.objects.filter(orden__estatus='pendiente')
+            )
+            response = Response(OrdenDetalleSerializer(orden_detalles, many=True).data)
+        else:
+            response = Response(self.get_delta(_decodificar_marca(since), cursor))
+
+        response['ETag'] = etag
+        response['X-Cursor'] = cursor
+        return response
+
+    def get_delta(self, desde, cursor):
+        pendientes = list(Orden.objects.filter(estatus='pendiente').order_by('id').values_list('id', flat=True))
+        tocadas = Orden.objects.filter(actualizado__gte=desde - self.ventana_since).values_list('id', 'estatus')
+        actualizadas = [pk for pk, estatus in tocadas if estatus == 'pendiente']
+        completadas = [pk for pk, estatus in tocadas if estatus != 'pendiente']
+        detalles = OrdenDetalleSerializer.preparar_queryset(
+            OrdenDetalle.objects.filter(orden_id__in=actualizadas)
+        ) if actualizadas else []
+
+        return {
+            'cursor': cursor,
+            'ordenes_actualizadas': actualizadas,
+            'ordenes_completadas': completadas,
+            'ordenes_pendientes': pendientes,
+            'detalles': OrdenDetalleSerializer(detalles, many=True).data,
+        }
+
+@lectura_en_replica
 class UltimasOrdenesAPIView(generics.ListAPIView):
     """
-    API endpoint que retorna las últimas órdenes del sistema
-    Por defecto retorna las últimas 10 órdenes ordenadas por fecha_hora descendente
+    API endpoint que retorna las últimas órdenes del sistema, paginadas por cursor
+    Por defecto retorna 10 órdenes por página ordenadas por fecha_hora descendente
+    Filtros opcionales: estatus, desde y hasta (YYYY-MM-DD); tamaño con limite.
+    Con desde o hasta incluye las órdenes archivadas del rango.
     """
     authentication_classes = [SessionAuthentication, BasicAuthentication]
     permission_classes = [IsAuthenticated]
     serializer_class = OrdenSerializer
-    
+    pagination_class = OrdenCursorPagination
+
     def get_queryset(self):
-        # Obtener las últimas 10 órdenes por defecto
-        queryset = Orden.objects.all().order_by('-fecha_hora')[:10]
-        
-        # Opción para filtrar por estatus mediante query params
-        estatus = self.request.query_params.get('estatus', None)
-        if estatus:
-            queryset = Orden.objects.filter(estatus=estatus).order_by('-fecha_hora')[:10]
-        
-        return queryset
+        try:
+            return filtrar_ordenes(OrdenSerializer.preparar_queryset(Orden.objects.all()), self.request.query_params)
+        except CursorInvalido as e:
+            raise ValidationError({'fecha': str(e)})
 
+    def get_archivo(self):
+        return archivo_de_filtros(self.request.query_params, OrdenSerializer.preparar_queryset(OrdenArchivada.objects.all()))
+
+@lectura_en_replica
 class OrdenDetailAPIView(generics.RetrieveAPIView):
     """
     API endpoint que retorna el detalle completo de una orden específica
+
+    Las órdenes pagadas se sirven desde caché (ver apps.ordenes.pagadas) con
+    ETag fuerte y Cache-Control largo; con If-None-Match responde 304.
+    Si la orden ya se archivó (ver apps.ordenes.archivo) se lee del archivo.
     """
     authentication_classes = [SessionAuthentication, BasicAuthentication]
     permission_classes = [IsAuthenticated]
     serializer_class = OrdenSerializer
-    queryset = Orden.objects.all()
+    queryset = OrdenSerializer.preparar_queryset(Orden.objects.all())
+
+    def get_object(self):
+        try:
+            return super().get_object()
+        except Http404:
+            orden = OrdenSerializer.preparar_queryset(OrdenArchivada.objects.filter(pk=self.kwargs['pk'])).first()
+            if orden is None:
+                raise
+            return orden
+
+    def retrieve(self, request, *args, **kwargs):
+        entrada = obtener_orden_pagada('api', self.kwargs['pk'])
+        if entrada is None:
+            orden = self.get_object()
+            data = self.get_serializer(orden).data
+            if orden.estatus != 'pagada':
+                return Response(data)
+            entrada = guardar_orden_pagada('api', orden, {'etag': etag_orden_pagada(orden), 'data': data})
+
+        headers = {
+            'ETag': entrada['etag'],
+            'Cache-Control': f'private, max-age={settings.ORDENES_PAGADAS_MAX_AGE}',
+        }
+        if coincide_etag(request, entrada['etag']):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response(entrada['data'], headers=headers)
+
+
+@lectura_en_replica
+class VentasDiariasAPIView(APIView):
+    """
+    API endpoint de reporte de ventas por día, leído de los acumulados diarios.
+    Parámetros opcionales: desde y hasta (YYYY-MM-DD); por defecto los últimos 30 días.
+    """
+    authentication_classes = [SessionAuthentication, BasicAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def _fecha(self, nombre, default):
+        valor = self.request.query_params.get(nombre)
+        if not valor:
+            return default
+        try:
+            return date.fromisoformat(valor)
+        except ValueError:
+            raise ValidationError({nombre: 'Formato de fecha inválido, use YYYY-MM-DD'})
+
+    def get(self, request, format=None):
+        hasta = self._fecha('hasta', timezone.localdate())
+        desde = self._fecha('desde', hasta - timedelta(days=29))
+        rango = {'fecha__range': (desde, hasta)}
+
+        return Response({
+            'desde': desde,
+            'hasta': hasta,
+            'dias': VentasDiariasSerializer(
+                VentasDiarias.objects.filter(**rango).order_by('fecha'), many=True
+            ).data,
+            'por_metodo_pago': VentasDiariasMetodoPagoSerializer(
+                VentasDiariasMetodoPago.objects.filter(**rango).select_related('metodo_pago').order_by('fecha'), many=True
+            ).data,
+            'por_categoria': VentasDiariasCategoriaSerializer(
+                VentasDiariasCategoria.objects.filter(**rango).select_related('categoria').order_by('fecha'), many=True
+            ).data,
+        })
+
+@lectura_en_replica
+class PlatillosMasVendidosAPIView(APIView):
+    """
+    API endpoint del top de platillos por unidades vendidas, leído de los
+    acumulados por platillo. Parámetros opcionales: ventana (hoy, 7d, 30d o
+    todo; por defecto todo) y limite (por defecto 10, máximo 100).
+    """
+    authentication_classes = [SessionAuthentication, BasicAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, format=None):
+        ventana = request.query_params.get('ventana', 'todo')
+        if ventana not in VENTANAS:
+            raise ValidationError({'ventana': f'Use una de: {", ".join(VENTANAS)}'})
+        try:
+            limite = max(1, min(int(request.query_params.get('limite', 10)), 100))
+        except ValueError:
+            raise ValidationError({'limite': 'Debe ser un número entero'})
+
+        catalogo = obtener_catalogo()
+        filas = [fila for fila in mas_vendidos(ventana, limite) if catalogo.platillo(fila['platillo_id'])]
+        return Response({
+            'ventana': ventana,
+            'platillos': PlatilloVendidoSerializer(filas, many=True, context={'catalogo': catalogo}).data,
+        })
+
@@ -1,6 +1,31 @@
+import logging
 from django.apps import AppConfig
+from django.core.signals import request_started
+
+logger = logging.getLogger(__name__)
 
 
 class OrdenesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.ordenes'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        # Se precarga al iniciar el primer request y no aquí, porque ready()
+        # también corre en comandos como migrate, cuando las tablas pueden no existir
+        request_started.connect(self.calentar_en_primer_request, dispatch_uid='ordenes_calentar_referencias')
+
+    def calentar(self):
+        """Precarga las referencias; lanza EstadoMesaFaltante si faltan estados requeridos."""
+        from .referencias import calentar_referencias
+        request_started.disconnect(dispatch_uid='ordenes_calentar_referencias')
+        calentar_referencias()
+
+    def calentar_en_primer_request(self, **kwargs):
+        from .referencias import EstadoMesaFaltante
+        # gunicorn ya calentó al arrancar y no llega aquí (ver restaurante/arranque.py). Con
+        # runserver o uvicorn el error se registra y se atiende, para poder crear los estados
+        try:
+            self.calentar()
+        except EstadoMesaFaltante:
+            logger.exception('Configuración de referencias incompleta')
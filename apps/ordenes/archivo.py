@@ -0,0 +1,118 @@
+"""
+Archivo de órdenes pagadas antiguas.
+
+archivar_lote() mueve las órdenes pagadas anteriores a una fecha de corte,
+con sus detalles y pagos, a OrdenArchivada, OrdenDetalleArchivado y
+PagoArchivado, conservando los ids. Cada lote es una transacción y lo
+movido sale de las tablas vivas, así que el comando archivar_ordenes se
+puede interrumpir y volver a ejecutar sin repetir ni perder órdenes.
+
+Las pantallas operativas (captura, pago, API de cocina, listas sin filtro
+de fechas) solo leen las tablas vivas. La búsqueda de una orden por id, el
+recibo, la exportación CSV, reconstruir_ventas() y las listas de órdenes
+filtradas con desde/hasta consultan también el archivo cuando el id o el
+rango de fechas lo requieren.
+"""
+from datetime import date, datetime, time, timedelta
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.db.models import Max
+from django.utils import timezone
+from .models import Orden, OrdenArchivada, OrdenDetalle, OrdenDetalleArchivado, Pago, PagoArchivado
+from .paginacion import filtrar_ordenes
+
+CAMPOS_ORDEN = ['id', 'empleado_id', 'mesa_id', 'fecha_hora', 'estatus', 'total', 'num_detalles', 'actualizado']
+CAMPOS_DETALLE = ['id', 'orden_id', 'platillo_id', 'cantidad', 'notas', 'precio_unitario']
+CAMPOS_PAGO = ['id', 'orden_id', 'metodo_pago_id', 'cantidad', 'fecha_hora']
+
+
+def fecha_corte(dias=None):
+    """Momento antes del cual las órdenes pagadas se archivan (ARCHIVO_DIAS por defecto)."""
+    return timezone.now() - timedelta(days=settings.ARCHIVO_DIAS if dias is None else dias)
+
+
+def _copiar(origen, destino, campos, **filtro):
+    destino.objects.bulk_create(destino(**fila) for fila in origen.objects.filter(**filtro).values(*campos))
+
+
+def _borrar(modelo, campo, ids):
+    """
+    DELETE ... WHERE campo IN (ids) por SQL, sin pasar por QuerySet.delete():
+    este carga cada fila y envía sus señales, y las de estos modelos no deben
+    correr al archivar. Las de OrdenDetalle recalcularían el total y
+    publicarían un evento por fila, la de Orden descontaría la venta de los
+    acumulados, que deben conservarla, y la caché de pagadas sigue siendo válida.
+    """
+    conexion = connections[router.db_for_write(modelo)]
+    nombre = conexion.ops.quote_name
+    with conexion.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {nombre(modelo._meta.db_table)} '
+            f'WHERE {nombre(modelo._meta.get_field(campo).column)} IN ({", ".join(["%s"] * len(ids))})',
+            ids,
+        )
+
+
+def archivar_lote(corte, tamano=1000):
+    """
+    Mueve al archivo hasta `tamano` órdenes pagadas anteriores a `corte`, las
+    más antiguas primero. Retorna cuántas movió; 0 cuando ya no quedan.
+    """
+    with transaction.atomic():
+        ids = list(
+            Orden.objects.select_for_update().filter(estatus='pagada', fecha_hora__lt=corte)
+            .order_by('fecha_hora', 'id').values_list('id', flat=True)[:tamano]
+        )
+        if not ids:
+            return 0
+        _copiar(Orden, OrdenArchivada, CAMPOS_ORDEN, id__in=ids)
+        _copiar(OrdenDetalle, OrdenDetalleArchivado, CAMPOS_DETALLE, orden_id__in=ids)
+        _copiar(Pago, PagoArchivado, CAMPOS_PAGO, orden_id__in=ids)
+        for modelo, campo in ((Pago, 'orden'), (OrdenDetalle, 'orden'), (Orden, 'id')):
+            _borrar(modelo, campo, ids)
+    return len(ids)
+
+
+def archivo_requerido(desde):
+    """
+    Si un rango que empieza en la fecha `desde` (None = sin límite) puede
+    incluir órdenes archivadas. Cuesta una lectura del índice por fecha.
+    """
+    ultima = OrdenArchivada.objects.aggregate(ultima=Max('fecha_hora'))['ultima']
+    if ultima is None:
+        return False
+    return desde is None or timezone.make_aware(datetime.combine(desde, time.min)) <= ultima
+
+
+def buscar_orden(pk, queryset=None, archivo=None):
+    """
+    Orden viva con id `pk` o, si ya no está, la archivada. `queryset` y
+    `archivo` permiten precargar relaciones de cada tabla. Retorna None si
+    no existe en ninguna.
+    """
+    queryset = Orden.objects.all() if queryset is None else queryset
+    archivo = OrdenArchivada.objects.all() if archivo is None else archivo
+    return queryset.filter(pk=pk).first() or archivo.filter(pk=pk).first()
+
+
+def modelos_de_rango(desde):
+    """[(Orden, OrdenDetalle, Pago)] más los modelos archivados si el rango los necesita."""
+    modelos = [(Orden, OrdenDetalle, Pago)]
+    if archivo_requerido(desde):
+        modelos.insert(0, (OrdenArchivada, OrdenDetalleArchivado, PagoArchivado))
+    return modelos
+
+
+def archivo_de_filtros(params, queryset=None):
+    """
+    Órdenes archivadas que entran en los filtros de una lista de órdenes
+    (ver paginacion.filtrar_ordenes), para paginarlas junto con las vivas; None
+    si no hace falta leer el archivo. Sin desde ni hasta la lista es operativa
+    y solo lee las tablas vivas; en el archivo no hay órdenes pendientes.
+    """
+    if not (params.get('desde') or params.get('hasta')) or params.get('estatus') == 'pendiente':
+        return None
+    queryset = filtrar_ordenes(OrdenArchivada.objects.all() if queryset is None else queryset, params)
+    if not archivo_requerido(date.fromisoformat(params['desde']) if params.get('desde') else None):
+        return None
+    return queryset
@@ -0,0 +1,198 @@
+"""
+Generación de datos sintéticos con bulk_create para benchmarks y pruebas de carga.
+
+Las fechas de las órdenes y pagos se asignan a mano (ver fechas_manuales), y
+Orden.total/num_detalles se calculan en memoria, así que no se depende de las
+señales que bulk_create no envía. Los acumulados diarios se reconstruyen al
+final con reconstruir_ventas().
+"""
+import random
+from contextlib import contextmanager
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+from django.contrib.auth.hashers import make_password
+from django.db import connections, transaction
+from django.utils import timezone
+from apps.accounts.models import AppUser
+from apps.platillos.models import Categoria, Platillo
+from .models import Mesa, MesaEstado, MetodoPago, Orden, OrdenDetalle, Pago
+from .referencias import ESTADO_DISPONIBLE, ESTADO_OCUPADA
+from .ventas import reconstruir_ventas, reconstruir_ventas_platillo
+
+CATEGORIAS = ['Entradas', 'Pizzas', 'Pastas', 'Ensaladas', 'Postres', 'Bebidas']
+METODOS_PAGO = ['Efectivo', 'Tarjeta de crédito', 'Tarjeta de débito', 'Transferencia']
+HORA_APERTURA, HORA_CIERRE = 12, 22
+# Prefijo reservado: no debe coincidir con cuentas reales como 'mesero1'
+PREFIJO_MESERO = 'sintetico.mesero'
+
+
+@contextmanager
+def fechas_manuales():
+    """Desactiva auto_now/auto_now_add de órdenes y pagos para conservar las fechas generadas."""
+    campos = [
+        Orden._meta.get_field('fecha_hora'),
+        Orden._meta.get_field('actualizado'),
+        Pago._meta.get_field('fecha_hora'),
+    ]
+    originales = [(campo, campo.auto_now, campo.auto_now_add) for campo in campos]
+    for campo in campos:
+        campo.auto_now = campo.auto_now_add = False
+    try:
+        yield
+    finally:
+        for campo, auto_now, auto_now_add in originales:
+            campo.auto_now, campo.auto_now_add = auto_now, auto_now_add
+
+
+def generar_catalogo(rng, platillos_por_categoria=8):
+    categorias = Categoria.objects.bulk_create(Categoria(nombre=nombre) for nombre in CATEGORIAS)
+    return Platillo.objects.bulk_create(
+        Platillo(
+            nombre=f'{categoria.nombre} {numero}',
+            descripcion=f'Platillo sintético {numero} de {categoria.nombre.lower()}',
+            precio=Decimal(rng.randrange(3000, 35000)) / 100,
+            categoria=categoria,
+        )
+        for categoria in categorias
+        for numero in range(1, platillos_por_categoria + 1)
+    )
+
+
+def asegurar_referencias(rng, mesas=20, empleados=5):
+    """
+    Crea lo que falte para generar órdenes: catálogo, estados de mesa, métodos
+    de pago, `mesas` mesas y `empleados` meseros. No borra ni modifica lo existente.
+    """
+    if not Platillo.objects.exists():
+        generar_catalogo(rng)
+    disponible, _ = MesaEstado.objects.get_or_create(nombre=ESTADO_DISPONIBLE)
+    MesaEstado.objects.get_or_create(nombre=ESTADO_OCUPADA)
+    if not MetodoPago.objects.exists():
+        MetodoPago.objects.bulk_create(MetodoPago(nombre=nombre) for nombre in METODOS_PAGO)
+
+    existentes = Mesa.objects.count()
+    Mesa.objects.bulk_create(
+        Mesa(nombre=f'Mesa {numero}', capacidad=rng.choice((2, 4, 6)), estado=disponible)
+        for numero in range(existentes + 1, mesas + 1)
+    )
+    existentes = AppUser.objects.filter(username__startswith=PREFIJO_MESERO).count()
+    password = make_password(None)
+    AppUser.objects.bulk_create(
+        AppUser(username=f'{PREFIJO_MESERO}{numero}', first_name='Mesero', last_name=str(numero), password=password)
+        for numero in range(existentes + 1, empleados + 1)
+    )
+
+
+def cargar_referencias():
+    """Retorna (platillos, mesas, empleados, metodos) con solo las columnas que usa generar_ordenes()."""
+    return (
+        list(Platillo.objects.only('id', 'precio').order_by('id')),
+        list(Mesa.objects.only('id').order_by('id')),
+        list(AppUser.objects.filter(username__startswith=PREFIJO_MESERO).only('id').order_by('id')),
+        list(MetodoPago.objects.only('id').order_by('id')),
+    )
+
+
+def _momento(rng, dia):
+    segundos = rng.randrange((HORA_CIERRE - HORA_APERTURA) * 3600)
+    return timezone.make_aware(datetime.combine(dia, time(HORA_APERTURA)) + timedelta(seconds=segundos))
+
+
+def generar_ordenes(rng, dias, ordenes_por_dia, mesas, empleados, platillos, metodos,
+                    estatus='pagada', lineas_max=5, lote=2000, variar=False):
+    """
+    Genera órdenes con sus detalles (y pagos si estatus es 'pagada') para cada
+    día de `dias`, insertando por lotes de `lote` órdenes. Con `variar`, el
+    número de órdenes oscila ±20% alrededor de `ordenes_por_dia` y sube los
+    viernes y sábados. Retorna el número de órdenes creadas.
+    """
+    creadas = 0
+    pendientes = []
+
+    def insertar(ordenes_con_lineas):
+        ordenes = Orden.objects.bulk_create(orden for orden, _ in ordenes_con_lineas)
+        detalles = []
+        for orden, lineas in ordenes_con_lineas:
+            for detalle in lineas:
+                detalle.orden = orden
+                detalles.append(detalle)
+        OrdenDetalle.objects.bulk_create(detalles, batch_size=lote)
+        if estatus == 'pagada':
+            Pago.objects.bulk_create(
+                (
+                    Pago(orden=orden, metodo_pago=rng.choice(metodos), cantidad=orden.total,
+                         fecha_hora=orden.fecha_hora + timedelta(minutes=rng.randrange(20, 90)))
+                    for orden in ordenes
+                ),
+                batch_size=lote,
+            )
+        return len(ordenes)
+
+    with fechas_manuales():
+        for dia in dias:
+            cantidad = ordenes_por_dia
+            if variar:
+                cantidad = round(ordenes_por_dia * rng.uniform(0.8, 1.2) * (1.3 if dia.weekday() in (4, 5) else 1))
+            for _ in range(cantidad):
+                lineas = []
+                for platillo in rng.sample(platillos, rng.randint(1, min(lineas_max, len(platillos)))):
+                    lineas.append(OrdenDetalle(
+                        platillo=platillo, cantidad=rng.randint(1, 4), precio_unitario=platillo.precio,
+                    ))
+                fecha_hora = _momento(rng, dia)
+                orden = Orden(
+                    empleado=rng.choice(empleados),
+                    mesa=rng.choice(mesas),
+                    fecha_hora=fecha_hora,
+                    actualizado=fecha_hora,
+                    estatus=estatus,
+                    total=sum(linea.cantidad * linea.precio_unitario for linea in lineas),
+                    num_detalles=len(lineas),
+                )
+                pendientes.append((orden, lineas))
+                if len(pendientes) >= lote:
+                    with transaction.atomic():
+                        creadas += insertar(pendientes)
+                    pendientes = []
+        if pendientes:
+            with transaction.atomic():
+                creadas += insertar(pendientes)
+    return creadas
+
+
+def dias_entre(desde, hasta):
+    return [desde + timedelta(days=i) for i in range((hasta - desde).days + 1)]
+
+
+def generar_rango(desde, hasta, ordenes_por_dia, semilla, lote=2000):
+    """
+    Genera órdenes pagadas entre desde y hasta (inclusive) con las referencias
+    existentes. Pensada para ejecutarse en un proceso del pool de generar_datos.
+    """
+    platillos, mesas, empleados, metodos = cargar_referencias()
+    rng = random.Random(f'{semilla}-{desde.isoformat()}')
+    try:
+        return generar_ordenes(rng, dias_entre(desde, hasta), ordenes_por_dia,
+                               mesas, empleados, platillos, metodos, lote=lote, variar=True)
+    finally:
+        connections.close_all()
+
+
+def generar_datos(meses=3, ordenes_por_dia=50, mesas=20, empleados=5, pendientes=20, semilla=1):
+    """
+    Puebla una base vacía: catálogo, referencias, `meses` de órdenes pagadas
+    hasta ayer, `pendientes` órdenes abiertas hoy y los acumulados diarios.
+    """
+    rng = random.Random(semilla)
+    asegurar_referencias(rng, mesas, empleados)
+    platillos, lista_mesas, lista_empleados, metodos = cargar_referencias()
+
+    hoy = timezone.localdate()
+    desde = hoy - timedelta(days=30 * meses)
+    generar_ordenes(rng, dias_entre(desde, hoy - timedelta(days=1)), ordenes_por_dia,
+                    lista_mesas, lista_empleados, platillos, metodos)
+    generar_ordenes(rng, [hoy], pendientes, lista_mesas, lista_empleados, platillos, metodos, estatus='pendiente')
+
+    with transaction.atomic():
+        reconstruir_ventas(desde, hoy)
+        reconstruir_ventas_platillo()
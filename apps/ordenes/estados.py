@@ -0,0 +1,79 @@
+"""
+Transiciones de estado de mesas y órdenes con UPDATE condicional.
+
+Cada transición es un solo UPDATE filtrado por el estado esperado: si dos
+meseros ocupan la misma mesa o cobran la misma orden al mismo tiempo, solo
+uno afecta la fila y el otro recibe un ConflictoEstado, sin bloqueos
+explícitos. Como QuerySet.update() no envía post_save, los eventos y el
+campo `actualizado` se manejan aquí.
+"""
+from django.db import transaction
+from django.utils import timezone
+from .eventos import evento_orden, publicar_al_confirmar
+from .models import Mesa, Orden
+from .referencias import obtener_referencias
+from .ventas import acumular_venta
+
+
+class ConflictoEstado(Exception):
+    """Otra petición cambió la mesa u orden antes que esta."""
+
+
+class MesaNoDisponible(ConflictoEstado):
+    pass
+
+
+class OrdenNoPendiente(ConflictoEstado):
+    pass
+
+
+def ocupar_mesa(mesa_id):
+    referencias = obtener_referencias()
+    if not Mesa.objects.filter(pk=mesa_id, estado=referencias.disponible).update(estado=referencias.ocupada):
+        raise MesaNoDisponible('La mesa ya fue ocupada o no está disponible')
+
+
+def liberar_mesa(mesa_id):
+    """
+    Regresa la mesa a disponible solo si sigue ocupada, para no pisar otro
+    estado asignado a mano (p. ej. reservada). Retorna si hubo cambio.
+    """
+    referencias = obtener_referencias()
+    return bool(Mesa.objects.filter(pk=mesa_id, estado=referencias.ocupada).update(estado=referencias.disponible))
+
+
+def exigir_pendiente(orden):
+    """
+    Los platillos de una orden pagada ya están en los acumulados de ventas: no
+    se modifican. Se llama dentro de la transacción que los modifica: el UPDATE
+    condicional confirma que la orden sigue pendiente y bloquea su fila hasta
+    el commit, así que un marcar_pagada simultáneo espera y acumula los
+    platillos ya guardados.
+    """
+    if orden.estatus != 'pendiente' or not Orden.objects.filter(
+        pk=orden.pk, estatus='pendiente'
+    ).update(actualizado=timezone.now()):
+        raise OrdenNoPendiente('La orden ya fue pagada; sus platillos no se pueden modificar')
+
+
+def marcar_pagada(orden):
+    """Pasa la orden de pendiente a pagada; falla si otra petición ya la cobró."""
+    ahora = timezone.now()
+    if not Orden.objects.filter(pk=orden.pk, estatus='pendiente').update(estatus='pagada', actualizado=ahora):
+        raise OrdenNoPendiente('La orden ya fue pagada')
+    orden.estatus = 'pagada'
+    orden.actualizado = ahora
+    publicar_al_confirmar(evento_orden(orden))
+
+
+def registrar_pago(orden, pago):
+    """
+    Cobra la orden en una transacción: la marca pagada, guarda el pago,
+    actualiza los acumulados de ventas y libera la mesa.
+    """
+    with transaction.atomic():
+        marcar_pagada(orden)
+        pago.orden = orden
+        pago.save()
+        acumular_venta(orden, pago)
+        liberar_mesa(orden.mesa_id)
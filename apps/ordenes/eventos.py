@@ -0,0 +1,89 @@
+"""
+Difusión en proceso de cambios de órdenes hacia las pantallas conectadas.
+
+Las señales de Orden y OrdenDetalle publican un evento por cambio (después
+del commit) y el Broker lo reparte a la cola de cada conexión abierta de
+EventosOrdenesView. Así, cientos de pantallas comparten un solo punto de
+detección de cambios en lugar de consultar la base de datos cada una.
+
+El broker vive en memoria del proceso: requiere servir la aplicación con un
+servidor ASGI en un solo proceso (o con sesión fija por worker), por ejemplo:
+
+    uvicorn restaurante.asgi:application
+
+Con gunicorn y workers síncronos (gunicorn.conf.py) cada pantalla ocuparía
+un worker y solo recibiría los eventos publicados en ese proceso, así que
+EventosOrdenesView responde 501 si no se sirve con ASGI.
+"""
+import asyncio
+import threading
+from django.db import transaction
+
+
+class Broker:
+    def __init__(self, tamano_cola=100):
+        self.tamano_cola = tamano_cola
+        self._suscriptores = {}
+        self._lock = threading.Lock()
+
+    def suscribir(self):
+        """Registra una cola en el event loop actual y la retorna."""
+        cola = asyncio.Queue(maxsize=self.tamano_cola)
+        with self._lock:
+            self._suscriptores[cola] = asyncio.get_running_loop()
+        return cola
+
+    def cancelar(self, cola):
+        with self._lock:
+            self._suscriptores.pop(cola, None)
+
+    @property
+    def hay_suscriptores(self):
+        return bool(self._suscriptores)
+
+    def publicar(self, evento):
+        """Entrega el evento a todas las colas; puede llamarse desde cualquier hilo."""
+        with self._lock:
+            suscriptores = list(self._suscriptores.items())
+        for cola, loop in suscriptores:
+            try:
+                loop.call_soon_threadsafe(self._entregar, cola, evento)
+            except RuntimeError:
+                # El loop de la conexión ya se cerró
+                self.cancelar(cola)
+
+    @staticmethod
+    def _entregar(cola, evento):
+        if cola.full():
+            # Pantalla lenta: se descarta el evento más antiguo
+            cola.get_nowait()
+        cola.put_nowait(evento)
+
+
+broker = Broker()
+
+
+def publicar_al_confirmar(evento):
+    if broker.hay_suscriptores:
+        transaction.on_commit(lambda: broker.publicar(evento))
+
+
+def evento_detalle(detalle, tipo='detalle'):
+    return {
+        'tipo': tipo,
+        'id': detalle.id,
+        'orden': detalle.orden_id,
+        'platillo': detalle.platillo_id,
+        'cantidad': detalle.cantidad,
+        'notas': detalle.notas,
+    }
+
+
+def evento_orden(orden):
+    return {
+        'tipo': 'orden',
+        'id': orden.id,
+        'mesa': orden.mesa_id,
+        'estatus': orden.estatus,
+        'total': str(orden.total),
+    }
@@ -0,0 +1,125 @@
+"""
+Exportación CSV de órdenes, detalles y pagos en streaming.
+
+Las filas se leen con values_list().iterator(chunk_size), así que ni la
+vista ni el comando exportar_csv cargan el historial completo en memoria.
+Los nombres de platillos y métodos de pago salen del catálogo y del
+registro de referencias en lugar de un JOIN por fila. Si el rango alcanza
+órdenes archivadas, sus filas salen primero y después las de las tablas
+vivas.
+
+La vista fija la base de lectura al armar la respuesta (ver
+restaurante/replicas.py): el streaming corre fuera del middleware.
+"""
+import csv
+from datetime import datetime, time, timedelta
+from itertools import islice
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from apps.platillos.catalogo import obtener_catalogo
+from restaurante.replicas import base_de_lectura
+from .archivo import modelos_de_rango
+from .referencias import obtener_referencias
+
+TAMANO_LOTE = 2000
+
+
+class Eco:
+    """Archivo falso para csv.writer: write() retorna la línea en lugar de guardarla."""
+    def write(self, valor):
+        return valor
+
+
+def _momento(fecha_hora):
+    return timezone.localtime(fecha_hora).isoformat(timespec='seconds')
+
+
+def _rango(campo, desde, hasta):
+    filtros = {}
+    if desde:
+        filtros[f'{campo}__gte'] = timezone.make_aware(datetime.combine(desde, time.min))
+    if hasta:
+        filtros[f'{campo}__lt'] = timezone.make_aware(datetime.combine(hasta + timedelta(days=1), time.min))
+    return filtros
+
+
+def _ordenes(desde, hasta, tamano, base):
+    yield ['orden', 'fecha_hora', 'estatus', 'mesa', 'empleado', 'num_detalles', 'total']
+    for orden_modelo, _, _ in modelos_de_rango(desde):
+        filas = orden_modelo.objects.using(base).filter(**_rango('fecha_hora', desde, hasta)).order_by('id').values_list(
+            'id', 'fecha_hora', 'estatus', 'mesa__nombre', 'empleado__username', 'num_detalles', 'total',
+        )
+        for orden_id, fecha_hora, *resto in filas.iterator(chunk_size=tamano):
+            yield [orden_id, _momento(fecha_hora), *resto]
+
+
+def _detalles(desde, hasta, tamano, base):
+    yield ['detalle', 'orden', 'fecha_hora', 'estatus', 'platillo', 'cantidad', 'precio_unitario', 'subtotal', 'notas']
+    catalogo = obtener_catalogo()
+    for _, detalle_modelo, _ in modelos_de_rango(desde):
+        filas = detalle_modelo.objects.using(base).filter(**_rango('orden__fecha_hora', desde, hasta)).order_by('id').values_list(
+            'id', 'orden_id', 'orden__fecha_hora', 'orden__estatus', 'platillo_id', 'cantidad', 'precio_unitario',
+            'notas',
+        )
+        for detalle_id, orden_id, fecha_hora, estatus, platillo_id, cantidad, precio, notas in filas.iterator(
+            chunk_size=tamano
+        ):
+            platillo = catalogo.platillo(platillo_id)
+            yield [
+                detalle_id, orden_id, _momento(fecha_hora), estatus, platillo.nombre if platillo else platillo_id,
+                cantidad, precio, cantidad * precio, notas or '',
+            ]
+
+
+def _pagos(desde, hasta, tamano, base):
+    yield ['pago', 'orden', 'fecha_hora', 'metodo_pago', 'cantidad']
+    referencias = obtener_referencias()
+    for _, _, pago_modelo in modelos_de_rango(desde):
+        filas = pago_modelo.objects.using(base).filter(**_rango('fecha_hora', desde, hasta)).order_by('id').values_list(
+            'id', 'orden_id', 'fecha_hora', 'metodo_pago_id', 'cantidad',
+        )
+        for pago_id, orden_id, fecha_hora, metodo_id, cantidad in filas.iterator(chunk_size=tamano):
+            metodo = referencias.metodo_pago(metodo_id)
+            yield [pago_id, orden_id, _momento(fecha_hora), metodo.nombre if metodo else metodo_id, cantidad]
+
+
+EXPORTACIONES = {
+    'ordenes': _ordenes,
+    'detalles': _detalles,
+    'pagos': _pagos,
+}
+
+
+def filas_csv(tipo, desde=None, hasta=None, tamano=TAMANO_LOTE, base=None):
+    """Filas (listas) del CSV de `tipo`, empezando por los encabezados; `base` es el alias a leer."""
+    return EXPORTACIONES[tipo](desde, hasta, tamano, base)
+
+
+def lineas_csv(tipo, desde=None, hasta=None, tamano=TAMANO_LOTE, base=None):
+    """Texto CSV en bloques de hasta `tamano` filas, listo para una respuesta en streaming."""
+    escritor = csv.writer(Eco())
+    filas = filas_csv(tipo, desde, hasta, tamano, base)
+    while lote := list(islice(filas, tamano)):
+        yield ''.join(escritor.writerow(fila) for fila in lote)
+
+
+async def _lineas_async(lineas):
+    # Cada bloque se lee en el hilo de la conexión (thread_sensitive), así el cursor sigue abierto entre bloques
+    siguiente = sync_to_async(lambda: next(lineas, None), thread_sensitive=True)
+    while (bloque := await siguiente()) is not None:
+        yield bloque
+
+
+def respuesta_csv(request, tipo, desde=None, hasta=None):
+    lineas = lineas_csv(tipo, desde, hasta, base=base_de_lectura())
+    if isinstance(request, ASGIRequest):
+        # Con un iterador síncrono, Django bajo ASGI lo consumiría completo antes de enviar
+        lineas = _lineas_async(lineas)
+    nombre = '_'.join([tipo, *(fecha.isoformat() for fecha in (desde, hasta) if fecha)])
+    return StreamingHttpResponse(
+        lineas,
+        content_type='text/csv; charset=utf-8',
+        headers={'Content-Disposition': f'attachment; filename="{nombre}.csv"'},
+    )
@@ -1,7 +1,12 @@
 # apps/ordenes/forms.py
 import django.forms as forms
-from .models import Mesa, MesaEstado, Orden, MetodoPago, Pago
-from apps.platillos.models import Platillo
+from django.db import transaction
+from django.utils.choices import CallableChoiceIterator
+from .eventos import evento_detalle, publicar_al_confirmar
+from .estados import ocupar_mesa
+from .models import Mesa, MesaEstado, Orden, OrdenDetalle, MetodoPago, Pago
+from .referencias import obtener_referencias
+from apps.platillos.forms import PlatilloCatalogoField
 
 class MesaEstadoForm(forms.ModelForm):
     class Meta:
@@ -33,25 +38,66 @@ class OrdenForm(forms.ModelForm):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         if 'mesa' in self.fields:
-            self.fields['mesa'].queryset = Mesa.objects.filter(estado__nombre__iexact='Disponible')
+            self.fields['mesa'].queryset = Mesa.objects.filter(estado=obtener_referencias().disponible)
 
     def save(self, commit=True):
         orden = super().save(commit=False)
         if commit:
             orden.estatus = 'pendiente'  # Set default status
             orden.empleado = self.initial['empleado']
-            orden.save()
-
-            mesa = orden.mesa
-            mesa.estado = MesaEstado.objects.get(nombre='Ocupada')
-            mesa.save()
+            with transaction.atomic():
+                # Si otro mesero ganó la mesa se lanza MesaNoDisponible y no se crea la orden
+                ocupar_mesa(orden.mesa_id)
+                orden.save()
         return orden
 
 class OrdenDetalleForm(forms.Form):
-    platillo = forms.ModelChoiceField(queryset=Platillo.objects.all(), widget=forms.Select(attrs={'class': 'form-control'}))
+    platillo = PlatilloCatalogoField(widget=forms.Select(attrs={'class': 'form-control'}))
     cantidad = forms.IntegerField(widget=forms.NumberInput(attrs={'class': 'form-control'}))
     notas = forms.CharField(widget=forms.Textarea(attrs={'class': 'form-control', 'rows': 3}), required=False)    
-    orden_id = forms.IntegerField(widget=forms.HiddenInput())
+    # Solo informativo: las vistas usan la orden de la URL o la del detalle, no este campo
+    orden_id = forms.IntegerField(widget=forms.HiddenInput(), required=False)
+
+class OrdenDetalleLineaForm(forms.Form):
+    platillo = PlatilloCatalogoField(widget=forms.Select(attrs={'class': 'form-control'}))
+    cantidad = forms.IntegerField(min_value=1, initial=1, widget=forms.NumberInput(attrs={'class': 'form-control'}))
+    notas = forms.CharField(widget=forms.TextInput(attrs={'class': 'form-control'}), required=False)
+
+class BaseOrdenDetalleLineaFormSet(forms.BaseFormSet):
+    """
+    Captura de varias líneas en un solo envío. Todas se validan juntas, los
+    precios se toman del catálogo en memoria (ver apps.platillos.catalogo) y
+    se guardan con bulk_create en una transacción.
+    """
+    def clean(self):
+        super().clean()
+        if any(self.errors):
+            return
+        self.lineas = [form.cleaned_data for form in self.forms if form.cleaned_data]
+        if not self.lineas:
+            raise forms.ValidationError('Agregue al menos un platillo')
+
+    def save(self, orden):
+        detalles = [
+            OrdenDetalle(
+                orden=orden,
+                platillo=linea['platillo'],
+                cantidad=linea['cantidad'],
+                notas=linea['notas'],
+                precio_unitario=linea['platillo'].precio,
+            )
+            for linea in self.lineas
+        ]
+        # Sin savepoint propio dentro de la transacción de la vista (ver OrdenDetalleView.post)
+        with transaction.atomic(savepoint=False):
+            # bulk_create no envía post_save: se recalcula el total y se publican los eventos aquí
+            OrdenDetalle.objects.bulk_create(detalles)
+            Orden.objects.filter(pk=orden.pk).recalcular_totales()
+            for detalle in detalles:
+                publicar_al_confirmar(evento_detalle(detalle))
+        return detalles
+
+OrdenDetalleLineaFormSet = forms.formset_factory(OrdenDetalleLineaForm, formset=BaseOrdenDetalleLineaFormSet, extra=5)
 
 class MetodoPagoForm(forms.ModelForm):
     class Meta:
@@ -61,12 +107,43 @@ class MetodoPagoForm(forms.ModelForm):
             'nombre': forms.TextInput(attrs={'class': 'form-control'})
         }
 
+class MetodoPagoField(forms.TypedChoiceField):
+    """Selección de método de pago servida desde el registro de referencias, sin consultas."""
+    def __init__(self, **kwargs):
+        kwargs.setdefault('empty_value', None)
+        super().__init__(
+            choices=CallableChoiceIterator(lambda: [('', '---------'), *obtener_referencias().metodos_pago_choices()]),
+            coerce=self.a_metodo_pago,
+            **kwargs,
+        )
+
+    @staticmethod
+    def a_metodo_pago(valor):
+        metodo = obtener_referencias().metodo_pago(int(valor))
+        if metodo is None:
+            raise ValueError('Método de pago inexistente')
+        return metodo
+
+    def valid_value(self, value):
+        try:
+            return obtener_referencias().metodo_pago(int(value)) is not None
+        except (TypeError, ValueError):
+            return False
+
 class PagoForm(forms.ModelForm):
+    # Fuera de Meta.fields: ya se validó contra el registro, así que el modelo no
+    # repite el SELECT de la validación del FK; se asigna en save()
+    metodo_pago = MetodoPagoField(widget=forms.Select(attrs={'class': 'form-control'}))
+    field_order = ['orden', 'metodo_pago', 'cantidad']
+
     class Meta:
         model = Pago
-        fields = ['orden', 'metodo_pago', 'cantidad']
+        fields = ['orden', 'cantidad']
         widgets = {
             'orden': forms.HiddenInput(),
-            'metodo_pago': forms.Select(attrs={'class': 'form-control'}),
             'cantidad': forms.NumberInput(attrs={'class': 'form-control'})
-        }
\ No newline at end of file
+        }
+
+    def save(self, commit=True):
+        self.instance.metodo_pago = self.cleaned_data['metodo_pago']
+        return super().save(commit)
\ No newline at end of file
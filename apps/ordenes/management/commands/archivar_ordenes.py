@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from apps.ordenes.archivo import archivar_lote, fecha_corte
+
+
+class Command(BaseCommand):
+    help = (
+        'Mueve las órdenes pagadas más antiguas que --dias, con sus detalles y pagos, a las tablas de archivo. '
+        'Cada lote es una transacción: se puede interrumpir y volver a ejecutar.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dias', type=int, help='Antigüedad mínima en días. Por defecto, ARCHIVO_DIAS')
+        parser.add_argument('--lote', type=int, default=1000, help='Órdenes movidas por transacción')
+        parser.add_argument('--max-lotes', type=int, help='Detenerse después de este número de lotes')
+
+    def handle(self, *args, **options):
+        if options['lote'] < 1:
+            raise CommandError('--lote debe ser mayor que cero')
+        corte = fecha_corte(options['dias'])
+        self.stdout.write(f'Archivando órdenes pagadas anteriores a {timezone.localtime(corte):%Y-%m-%d %H:%M}')
+
+        total = lotes = 0
+        while options['max_lotes'] is None or lotes < options['max_lotes']:
+            movidas = archivar_lote(corte, options['lote'])
+            if not movidas:
+                break
+            total += movidas
+            lotes += 1
+            self.stdout.write(f'Lote {lotes}: {movidas} órdenes ({total} en total)')
+
+        self.stdout.write(self.style.SUCCESS(f'{total} órdenes archivadas'))
@@ -0,0 +1,157 @@
+import json
+import time
+from datetime import datetime
+from pathlib import Path
+from statistics import mean
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, setup_test_environment, teardown_test_environment
+from django.urls import reverse
+from apps.accounts.models import AppUser
+from apps.ordenes.datos_sinteticos import generar_datos
+from apps.ordenes.models import MetodoPago, Orden
+from apps.ordenes.referencias import invalidar_referencias
+from apps.platillos.catalogo import invalidar_catalogo
+from restaurante.metricas import percentil
+
+
+class Command(BaseCommand):
+    help = (
+        'Crea una base de pruebas temporal con datos sintéticos, mide las vistas y endpoints '
+        'principales con el cliente de pruebas y escribe los resultados en JSON. Con --baseline '
+        'compara contra una medición anterior y termina con error si hay regresiones.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--meses', type=int, default=3, help='Meses de órdenes pagadas a generar')
+        parser.add_argument('--ordenes-por-dia', type=int, default=50)
+        parser.add_argument('--mesas', type=int, default=20)
+        parser.add_argument('--repeticiones', type=int, default=20, help='Peticiones medidas por vista')
+        parser.add_argument('--semilla', type=int, default=1)
+        parser.add_argument('--salida', default='benchmark.json', help='Archivo JSON de resultados')
+        parser.add_argument('--baseline', help='JSON de una medición anterior para comparar')
+        parser.add_argument('--tolerancia', type=float, default=0.25,
+                            help='Aumento máximo permitido del p50 respecto a la baseline (0.25 = 25%%)')
+
+    def handle(self, *args, **options):
+        parametros = {
+            campo: options[campo] for campo in ('meses', 'ordenes_por_dia', 'mesas', 'repeticiones', 'semilla')
+        }
+        baseline = None
+        if options['baseline']:
+            try:
+                baseline = json.loads(Path(options['baseline']).read_text())
+            except (OSError, ValueError) as error:
+                raise CommandError(f'No se pudo leer la baseline: {error}')
+
+        setup_test_environment()
+        nombre_original = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            resultados = self.medir(parametros)
+        finally:
+            connection.creation.destroy_test_db(nombre_original, verbosity=0)
+            teardown_test_environment()
+
+        reporte = {
+            'fecha': datetime.now().isoformat(timespec='seconds'),
+            'motor': connection.vendor,
+            'parametros': parametros,
+            'resultados': resultados,
+        }
+        Path(options['salida']).write_text(json.dumps(reporte, indent=2, ensure_ascii=False))
+        self.mostrar(resultados)
+        self.stdout.write(f'Resultados guardados en {options["salida"]}')
+
+        if baseline is not None:
+            self.comparar(reporte, baseline, options['tolerancia'])
+
+    def medir(self, parametros):
+        repeticiones = parametros['repeticiones']
+        inicio = time.perf_counter()
+        # Una orden pendiente por cada pago medido (más el de calentamiento) y otra para el detalle
+        generar_datos(
+            meses=parametros['meses'], ordenes_por_dia=parametros['ordenes_por_dia'],
+            mesas=parametros['mesas'], pendientes=repeticiones + 2, semilla=parametros['semilla'],
+        )
+        # bulk_create no envía señales: se invalidan a mano las cachés de catálogo y referencias
+        invalidar_catalogo()
+        invalidar_referencias()
+        self.stdout.write(
+            f'Datos generados en {time.perf_counter() - inicio:.1f}s: '
+            f'{Orden.objects.count()} órdenes'
+        )
+
+        client = Client()
+        client.force_login(AppUser.objects.create_superuser('benchmark', password=None))
+
+        pendientes = list(Orden.objects.filter(estatus='pendiente').order_by('id').values_list('id', 'total'))
+        orden_detalle, _ = pendientes.pop()
+        orden_pagada = Orden.objects.filter(estatus='pagada').latest('fecha_hora').pk
+        metodo = MetodoPago.objects.first().pk
+        por_pagar = iter(pendientes)
+
+        def pagar():
+            orden_id, total = next(por_pagar)
+            return client.post(
+                reverse('ordenes:ordenes_pagar', args=[orden_id]),
+                {'orden': orden_id, 'metodo_pago': metodo, 'cantidad': total},
+            )
+
+        escenarios = {
+            'index_user': lambda: client.get(reverse('index_user')),
+            'ordenes_list': lambda: client.get(reverse('ordenes:ordenes_list')),
+            'ordenes_detalle_list': lambda: client.get(reverse('ordenes:ordenes_detalle_list', args=[orden_detalle])),
+            'ordenes_pagar_get': lambda: client.get(reverse('ordenes:ordenes_pagar', args=[orden_detalle])),
+            'ordenes_pagar_post': pagar,
+            'api_orden_detalle_list': lambda: client.get(reverse('api:orden_detalle_list')),
+            'api_ultimas_ordenes': lambda: client.get(reverse('api:ultimas_ordenes')),
+            'api_orden_detail': lambda: client.get(reverse('api:orden_detail', args=[orden_pagada])),
+        }
+
+        resultados = {}
+        for nombre, peticion in escenarios.items():
+            peticion()  # Calentamiento: plantillas, catálogo y conexiones
+            tiempos = []
+            for _ in range(repeticiones):
+                with CaptureQueriesContext(connection) as consultas:
+                    inicio = time.perf_counter()
+                    respuesta = peticion()
+                    tiempos.append((time.perf_counter() - inicio) * 1000)
+                if respuesta.status_code not in (200, 302):
+                    raise CommandError(f'{nombre} respondió {respuesta.status_code}')
+            resultados[nombre] = {
+                'p50_ms': round(percentil(sorted(tiempos), 50), 2),
+                'p95_ms': round(percentil(sorted(tiempos), 95), 2),
+                'media_ms': round(mean(tiempos), 2),
+                'min_ms': round(min(tiempos), 2),
+                'consultas': len(consultas),
+            }
+        return resultados
+
+    def mostrar(self, resultados):
+        self.stdout.write(f'{"vista":<24} {"p50 ms":>9} {"p95 ms":>9} {"consultas":>10}')
+        for nombre, fila in resultados.items():
+            self.stdout.write(f'{nombre:<24} {fila["p50_ms"]:>9.2f} {fila["p95_ms"]:>9.2f} {fila["consultas"]:>10}')
+
+    def comparar(self, reporte, baseline, tolerancia):
+        if baseline.get('parametros') != reporte['parametros'] or baseline.get('motor') != reporte['motor']:
+            self.stdout.write(self.style.WARNING(
+                'La baseline se midió con otros parámetros o motor; la comparación es orientativa'
+            ))
+
+        regresiones = []
+        for nombre, fila in reporte['resultados'].items():
+            anterior = baseline.get('resultados', {}).get(nombre)
+            if anterior is None:
+                continue
+            limite = anterior['p50_ms'] * (1 + tolerancia)
+            if fila['p50_ms'] > limite:
+                regresiones.append(f'{nombre}: p50 {fila["p50_ms"]:.2f}ms > {limite:.2f}ms')
+            if fila['consultas'] > anterior['consultas']:
+                regresiones.append(f'{nombre}: {fila["consultas"]} consultas (antes {anterior["consultas"]})')
+
+        if regresiones:
+            raise CommandError('Regresiones respecto a la baseline:\n' + '\n'.join(regresiones))
+        self.stdout.write(self.style.SUCCESS('Sin regresiones respecto a la baseline'))
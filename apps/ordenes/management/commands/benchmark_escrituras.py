@@ -0,0 +1,175 @@
+import json
+import random
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from statistics import mean
+import django
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connections
+from apps.accounts.models import AppUser
+from apps.ordenes.datos_sinteticos import PREFIJO_MESERO, asegurar_referencias
+from apps.ordenes.estados import ConflictoEstado, registrar_pago
+from apps.ordenes.forms import OrdenDetalleLineaFormSet, OrdenForm
+from apps.ordenes.models import Mesa, MetodoPago, Pago
+from apps.platillos.catalogo import obtener_catalogo
+from restaurante.metricas import percentil
+
+
+def _usar_base(ruta, opciones):
+    """Apunta la conexión default a `ruta` con `opciones`; debe llamarse antes de conectar."""
+    connections['default'].close()
+    connections['default'].settings_dict.update(NAME=str(ruta), OPTIONS=dict(opciones))
+
+
+def _iniciar_proceso(ruta, opciones):
+    django.setup()
+    _usar_base(ruta, opciones)
+
+
+def _capturar_ordenes(numero, limite, semilla):
+    """
+    Un mesero: abre una orden, captura sus líneas y la cobra, con los mismos
+    formularios y transacciones que las vistas, hasta la fecha límite.
+    """
+    rng = random.Random(semilla + numero)
+    mesero = AppUser.objects.get(username=f'{PREFIJO_MESERO}{numero + 1}')
+    mesas = list(Mesa.objects.values_list('id', flat=True))
+    metodos = list(MetodoPago.objects.values_list('id', flat=True))
+    platillos = [platillo.id for platillo in obtener_catalogo().platillos]
+    tiempos, conflictos, bloqueos = [], 0, 0
+
+    while time.time() < limite:
+        comienzo = time.perf_counter()
+        try:
+            form = OrdenForm({'mesa': rng.choice(mesas), 'empleado': mesero.pk}, initial={'empleado': mesero})
+            if not form.is_valid():
+                conflictos += 1  # La mesa elegida está ocupada por otro mesero
+                continue
+            orden = form.save()
+            lineas = rng.randint(1, 4)
+            datos = {'form-TOTAL_FORMS': lineas, 'form-INITIAL_FORMS': 0}
+            for indice in range(lineas):
+                datos[f'form-{indice}-platillo'] = rng.choice(platillos)
+                datos[f'form-{indice}-cantidad'] = rng.randint(1, 3)
+            formset = OrdenDetalleLineaFormSet(datos)
+            formset.is_valid()
+            formset.save(orden)
+            orden.refresh_from_db(fields=['total'])
+            registrar_pago(orden, Pago(metodo_pago_id=rng.choice(metodos), cantidad=orden.total))
+        except ConflictoEstado:
+            conflictos += 1
+            continue
+        except OperationalError as error:
+            if 'locked' not in str(error):
+                raise
+            bloqueos += 1
+            continue
+        tiempos.append((time.perf_counter() - comienzo) * 1000)
+    connections.close_all()
+    return {'tiempos': tiempos, 'conflictos': conflictos, 'bloqueos': bloqueos}
+
+
+class Command(BaseCommand):
+    help = (
+        'Mide escrituras concurrentes en SQLite: varios procesos abren, capturan y cobran órdenes '
+        'sobre una copia temporal de la base durante --duracion segundos. Reporta órdenes por minuto, '
+        'latencias, conflictos de mesa y errores "database is locked", y falla si hay bloqueos o no se '
+        'alcanza --pico. Es la medición de throughput de ContencionMesasTests, que solo verifica que '
+        'cada mesa tenga un ganador.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--procesos', type=int, default=4, help='Procesos escribiendo a la vez (workers)')
+        parser.add_argument('--duracion', type=float, default=15, help='Segundos de medición')
+        parser.add_argument('--mesas', type=int, default=40)
+        parser.add_argument('--pico', type=int, default=120, help='Órdenes cobradas por minuto que se deben sostener')
+        parser.add_argument('--comparar', action='store_true',
+                            help='Medir también sin el perfil (journal por defecto, BEGIN diferido, 5 s de espera)')
+        parser.add_argument('--semilla', type=int, default=1)
+        parser.add_argument('--salida', help='Archivo JSON de resultados')
+
+    def handle(self, *args, **options):
+        base = settings.DATABASES['default']
+        if base['ENGINE'] != 'django.db.backends.sqlite3':
+            raise CommandError('benchmark_escrituras mide el perfil SQLite; la base default no es SQLite')
+        if options['procesos'] < 1:
+            raise CommandError('--procesos debe ser mayor que cero')
+        perfiles = {'perfil': base.get('OPTIONS', {})}
+        if options['comparar']:
+            perfiles = {'sin_perfil': {}, **perfiles}
+
+        with tempfile.TemporaryDirectory() as carpeta:
+            plantilla = Path(carpeta) / 'plantilla.sqlite3'
+            self.preparar(plantilla, options)
+            resultados = {}
+            for nombre, opciones in perfiles.items():
+                ruta = Path(carpeta) / f'{nombre}.sqlite3'
+                shutil.copyfile(plantilla, ruta)
+                resultados[nombre] = self.medir(ruta, opciones, options)
+                self.mostrar(nombre, resultados[nombre])
+
+        if options['salida']:
+            reporte = {
+                'fecha': datetime.now().isoformat(timespec='seconds'),
+                'procesos': options['procesos'],
+                'duracion': options['duracion'],
+                'pico': options['pico'],
+                'resultados': resultados,
+            }
+            Path(options['salida']).write_text(json.dumps(reporte, indent=2, ensure_ascii=False))
+            self.stdout.write(f'Resultados guardados en {options["salida"]}')
+
+        medido = resultados['perfil']
+        if medido['bloqueos']:
+            raise CommandError(f'{medido["bloqueos"]} errores "database is locked" con el perfil SQLite')
+        if medido['ordenes_por_minuto'] < options['pico']:
+            raise CommandError(f'{medido["ordenes_por_minuto"]} órdenes/min, por debajo del pico de {options["pico"]}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Sin bloqueos y {medido["ordenes_por_minuto"]} órdenes/min (pico requerido: {options["pico"]})'
+        ))
+
+    def preparar(self, ruta, options):
+        """Base temporal migrada, con catálogo, mesas y un mesero por proceso."""
+        original = dict(connections['default'].settings_dict)
+        _usar_base(ruta, {})
+        try:
+            call_command('migrate', verbosity=0)
+            asegurar_referencias(random.Random(options['semilla']), options['mesas'], options['procesos'])
+        finally:
+            connections['default'].close()
+            connections['default'].settings_dict.update(NAME=original['NAME'], OPTIONS=original['OPTIONS'])
+
+    def medir(self, ruta, opciones, options):
+        procesos = options['procesos']
+        # Los procesos hijos no deben heredar las conexiones abiertas del padre
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=procesos, initializer=_iniciar_proceso, initargs=(ruta, opciones)) as pool:
+            # Arrancar los procesos antes de fijar la fecha límite, para no medir django.setup()
+            list(pool.map(time.sleep, [0.1] * procesos))
+            # Reloj de pared: la fecha límite se compara en otros procesos
+            limite = time.time() + options['duracion']
+            futuros = [pool.submit(_capturar_ordenes, numero, limite, options['semilla']) for numero in range(procesos)]
+            parciales = [futuro.result() for futuro in futuros]
+
+        tiempos = [tiempo for parcial in parciales for tiempo in parcial['tiempos']]
+        return {
+            'ordenes': len(tiempos),
+            'ordenes_por_minuto': round(len(tiempos) * 60 / options['duracion']),
+            'p50_ms': round(percentil(sorted(tiempos), 50), 1) if tiempos else 0,
+            'p95_ms': round(percentil(sorted(tiempos), 95), 1) if tiempos else 0,
+            'media_ms': round(mean(tiempos), 1) if tiempos else 0,
+            'conflictos': sum(parcial['conflictos'] for parcial in parciales),
+            'bloqueos': sum(parcial['bloqueos'] for parcial in parciales),
+        }
+
+    def mostrar(self, nombre, fila):
+        self.stdout.write(
+            f'{nombre:<12} {fila["ordenes_por_minuto"]:>8} órdenes/min  p50 {fila["p50_ms"]:>7.1f} ms  '
+            f'p95 {fila["p95_ms"]:>7.1f} ms  conflictos {fila["conflictos"]:>4}  bloqueos {fila["bloqueos"]:>4}'
+        )
@@ -0,0 +1,87 @@
+import json
+import tempfile
+import time
+from pathlib import Path
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+from restaurante.estaticos import referencias_estaticas
+
+BUSCADORES_COMPLETOS = [
+    'django.contrib.staticfiles.finders.FileSystemFinder',
+    'django.contrib.staticfiles.finders.AppDirectoriesFinder',
+]
+
+
+def _resumen(carpeta):
+    """Archivos y bytes en `carpeta`, separando originales, .gz y .br."""
+    resumen = {tipo: {'archivos': 0, 'bytes': 0} for tipo in ('originales', 'gz', 'br')}
+    for archivo in Path(carpeta).rglob('*'):
+        if archivo.is_file() and archivo.name != 'staticfiles.json':
+            tipo = {'.gz': 'gz', '.br': 'br'}.get(archivo.suffix, 'originales')
+            resumen[tipo]['archivos'] += 1
+            resumen[tipo]['bytes'] += archivo.stat().st_size
+    resumen['total_bytes'] = sum(resumen[tipo]['bytes'] for tipo in ('originales', 'gz', 'br'))
+    return resumen
+
+
+def _mb(cantidad):
+    return f'{cantidad / 1024 / 1024:.2f} MB'
+
+
+class Command(BaseCommand):
+    help = (
+        'Falla si una plantilla usa un estático que no existe. Recolecta en STATIC_ROOT solo los estáticos que usan las plantillas (más los de las apps), '
+        'con hash en el nombre y versiones gzip y brotli. Con --comparar recolecta también todo static/ '
+        'en una carpeta temporal y reporta los bytes y el tiempo ahorrados.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--comparar', action='store_true', help='Medir también el collectstatic completo')
+        parser.add_argument('--salida', help='Archivo JSON del reporte')
+
+    def handle(self, *args, **options):
+        referencias = referencias_estaticas()
+        # Un estático que falta haría fallar en producción cada página que lo usa (ESTATICOS_ESTRICTOS)
+        faltantes = sorted(ruta for ruta in referencias if not finders.find(ruta))
+        if faltantes:
+            raise CommandError(f'Las plantillas usan archivos que no existen en static/ ni en las apps: {", ".join(faltantes)}')
+
+        reporte = {
+            'referencias': sorted(referencias),
+            'podado': self.recolectar(settings.STATIC_ROOT, settings.STATICFILES_FINDERS),
+        }
+        self.mostrar('podado', reporte['podado'])
+
+        if options['comparar']:
+            with tempfile.TemporaryDirectory() as carpeta:
+                reporte['completo'] = self.recolectar(carpeta, BUSCADORES_COMPLETOS)
+            self.mostrar('completo', reporte['completo'])
+            reporte['ahorro'] = {
+                'bytes': reporte['completo']['total_bytes'] - reporte['podado']['total_bytes'],
+                'segundos': round(reporte['completo']['segundos'] - reporte['podado']['segundos'], 2),
+            }
+            self.stdout.write(self.style.SUCCESS(
+                f'Ahorro: {_mb(reporte["ahorro"]["bytes"])} y {reporte["ahorro"]["segundos"]}s de collectstatic'
+            ))
+
+        if options['salida']:
+            Path(options['salida']).write_text(json.dumps(reporte, indent=2, ensure_ascii=False))
+            self.stdout.write(f'Reporte guardado en {options["salida"]}')
+
+    def recolectar(self, destino, buscadores):
+        with override_settings(STATIC_ROOT=destino, STATICFILES_FINDERS=buscadores):
+            inicio = time.perf_counter()
+            call_command('collectstatic', interactive=False, clear=True, verbosity=0)
+            segundos = time.perf_counter() - inicio
+        return {'segundos': round(segundos, 2), **_resumen(destino)}
+
+    def mostrar(self, nombre, resultado):
+        self.stdout.write(
+            f'{nombre:<9} {resultado["segundos"]:>6.2f}s  '
+            f'{resultado["originales"]["archivos"]:>4} archivos {_mb(resultado["originales"]["bytes"]):>9}  '
+            f'gz {_mb(resultado["gz"]["bytes"]):>9}  br {_mb(resultado["br"]["bytes"]):>9}  '
+            f'total {_mb(resultado["total_bytes"]):>9}'
+        )
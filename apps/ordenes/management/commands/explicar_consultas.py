@@ -0,0 +1,72 @@
+import re
+from datetime import timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+from apps.api.views import consulta_ultimo_cambio
+from apps.ordenes.models import Mesa, Orden, OrdenDetalle, Pago, VentasDiarias
+from apps.ordenes.paginacion import codificar_cursor, consulta_pagina
+from apps.ordenes.ventas import consulta_mas_vendidos
+
+# Recorridos completos de tabla según el motor
+ESCANEO_COMPLETO = {
+    'sqlite': re.compile(r'\bSCAN (?P<tabla>\w+)(?!.*\bUSING\b.*\bINDEX\b)'),
+    'postgresql': re.compile(r'\bSeq Scan on (?P<tabla>\w+)'),
+}
+
+
+def consultas_frecuentes():
+    """Consultas de las vistas y la API, construidas igual que en su origen."""
+    ahora = timezone.now()
+    hoy = timezone.localdate()
+    cursor = codificar_cursor(Orden(id=1, fecha_hora=ahora - timedelta(days=90)))
+
+    return [
+        ('Lista de órdenes (primera página)', consulta_pagina(Orden.objects.select_related('mesa'))),
+        ('Lista de órdenes (página profunda)', consulta_pagina(Orden.objects.select_related('mesa'), cursor)),
+        ('Lista de órdenes por estatus', consulta_pagina(Orden.objects.filter(estatus='pendiente'))),
+        ('Detalles de una orden', OrdenDetalle.objects.filter(orden_id=1)),
+        ('API detalles pendientes', OrdenDetalle.objects.filter(orden__estatus='pendiente')),
+        ('API último cambio (ETag)', consulta_ultimo_cambio()),
+        ('API delta desde cursor', Orden.objects.filter(actualizado__gte=ahora - timedelta(minutes=1)).values_list('id', 'estatus')),
+        ('Dashboard ventas de la semana', VentasDiarias.objects.filter(fecha__range=(hoy - timedelta(days=6), hoy))),
+        ('Platillos más vendidos (hoy)', consulta_mas_vendidos('hoy', hoy)[:10]),
+        ('Platillos más vendidos (30 días)', consulta_mas_vendidos('30d', hoy)[:10]),
+        ('Platillos más vendidos (histórico)', consulta_mas_vendidos('todo', hoy)[:10]),
+        ('Reconstrucción de ventas por rango', Orden.objects.filter(
+            estatus='pagada', fecha_hora__gte=ahora - timedelta(days=31), fecha_hora__lt=ahora
+        )),
+        ('Pagos por rango de fechas', Pago.objects.filter(fecha_hora__gte=ahora - timedelta(days=31))),
+        ('Mesas disponibles', Mesa.objects.filter(estado_id=1)),
+    ]
+
+
+class Command(BaseCommand):
+    help = 'Muestra el plan de ejecución de las consultas frecuentes y señala recorridos completos de tabla'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--estricto', action='store_true', help='Termina con error si alguna consulta recorre una tabla completa')
+
+    def handle(self, *args, **options):
+        patron = ESCANEO_COMPLETO.get(connection.vendor)
+        if patron is None:
+            raise CommandError(f'Motor no soportado: {connection.vendor}')
+
+        señaladas = []
+        for nombre, queryset in consultas_frecuentes():
+            plan = queryset.explain()
+            tablas = sorted({match.group('tabla') for match in patron.finditer(plan)})
+            self.stdout.write(self.style.MIGRATE_HEADING(nombre))
+            self.stdout.write(plan)
+            if tablas:
+                señaladas.append(nombre)
+                self.stdout.write(self.style.WARNING(f"Recorrido completo de: {', '.join(tablas)}"))
+            self.stdout.write('')
+
+        if not señaladas:
+            self.stdout.write(self.style.SUCCESS('Ninguna consulta recorre tablas completas'))
+            return
+        mensaje = f'{len(señaladas)} consulta(s) con recorrido completo: {"; ".join(señaladas)}'
+        if options['estricto']:
+            raise CommandError(mensaje)
+        self.stdout.write(self.style.WARNING(mensaje))
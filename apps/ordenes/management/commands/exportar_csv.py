@@ -0,0 +1,37 @@
+import csv
+import sys
+from datetime import date
+from django.core.management.base import BaseCommand, CommandError
+from apps.ordenes.exportacion import EXPORTACIONES, TAMANO_LOTE, filas_csv
+
+
+class Command(BaseCommand):
+    help = 'Exporta órdenes, detalles o pagos a CSV leyendo por bloques, con memoria constante'
+
+    def add_arguments(self, parser):
+        parser.add_argument('tipo', choices=sorted(EXPORTACIONES))
+        parser.add_argument('--desde', type=date.fromisoformat, help='Fecha inicial (YYYY-MM-DD)')
+        parser.add_argument('--hasta', type=date.fromisoformat, help='Fecha final (YYYY-MM-DD)')
+        parser.add_argument('--salida', default='-', help='Archivo de salida; - para la salida estándar')
+        parser.add_argument('--chunk-size', type=int, default=TAMANO_LOTE, help='Filas leídas por bloque')
+
+    def handle(self, *args, **options):
+        if options['desde'] and options['hasta'] and options['desde'] > options['hasta']:
+            raise CommandError('--desde debe ser anterior o igual a --hasta')
+
+        filas = filas_csv(options['tipo'], options['desde'], options['hasta'], options['chunk_size'])
+        if options['salida'] == '-':
+            total = self.escribir(sys.stdout, filas)
+        else:
+            with open(options['salida'], 'w', newline='', encoding='utf-8') as archivo:
+                total = self.escribir(archivo, filas)
+            self.stderr.write(self.style.SUCCESS(f'{total} filas exportadas a {options["salida"]}'))
+
+    def escribir(self, archivo, filas):
+        escritor = csv.writer(archivo)
+        escritor.writerow(next(filas))
+        total = 0
+        for fila in filas:
+            escritor.writerow(fila)
+            total += 1
+        return total
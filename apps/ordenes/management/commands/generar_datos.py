@@ -0,0 +1,79 @@
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date, timedelta
+import django
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.utils import timezone
+from apps.ordenes.datos_sinteticos import asegurar_referencias, generar_rango
+from apps.ordenes.referencias import invalidar_referencias
+from apps.platillos.catalogo import invalidar_catalogo
+
+
+def _rangos(desde, hasta, partes):
+    """Divide desde..hasta en hasta `partes` rangos contiguos de días."""
+    dias = (hasta - desde).days + 1
+    tamano = -(-dias // partes)
+    inicio = desde
+    while inicio <= hasta:
+        fin = min(inicio + timedelta(days=tamano - 1), hasta)
+        yield inicio, fin
+        inicio = fin + timedelta(days=1)
+
+
+class Command(BaseCommand):
+    help = (
+        'Genera órdenes, detalles y pagos sintéticos con bulk_create, opcionalmente repartiendo '
+        'los rangos de fechas entre varios procesos. No borra datos existentes.'
+    )
+
+    def add_arguments(self, parser):
+        ayer = timezone.localdate() - timedelta(days=1)
+        parser.add_argument('--desde', type=date.fromisoformat, default=ayer - timedelta(days=364),
+                            help='Fecha inicial (YYYY-MM-DD). Por defecto, hace un año')
+        parser.add_argument('--hasta', type=date.fromisoformat, default=ayer,
+                            help='Fecha final (YYYY-MM-DD). Por defecto, ayer')
+        parser.add_argument('--ordenes-por-dia', type=int, default=200, help='Promedio de órdenes por día')
+        parser.add_argument('--mesas', type=int, default=30, help='Mesas a crear si faltan')
+        parser.add_argument('--empleados', type=int, default=10, help='Meseros a crear si faltan')
+        parser.add_argument('--lote', type=int, default=2000, help='Órdenes insertadas por transacción')
+        parser.add_argument('--procesos', type=int, default=1, help='Procesos en paralelo, cada uno con un rango de fechas')
+        parser.add_argument('--semilla', type=int, default=1)
+
+    def handle(self, *args, **options):
+        desde, hasta = options['desde'], options['hasta']
+        if desde > hasta:
+            raise CommandError('--desde debe ser anterior o igual a --hasta')
+        procesos = options['procesos']
+        if procesos > 1 and connection.vendor == 'sqlite':
+            # SQLite admite un solo escritor; varios procesos solo esperarían el bloqueo
+            self.stdout.write(self.style.WARNING('SQLite no admite escrituras en paralelo; se usa un solo proceso'))
+            procesos = 1
+
+        inicio = time.perf_counter()
+        asegurar_referencias(random.Random(options['semilla']), options['mesas'], options['empleados'])
+        invalidar_catalogo()
+        invalidar_referencias()
+
+        argumentos = (options['ordenes_por_dia'], options['semilla'], options['lote'])
+        rangos = list(_rangos(desde, hasta, procesos * 4 if procesos > 1 else 1))
+        total = 0
+        if procesos == 1:
+            for rango in rangos:
+                total += generar_rango(*rango, *argumentos)
+        else:
+            # Los procesos hijos no deben heredar las conexiones abiertas del padre
+            connections.close_all()
+            with ProcessPoolExecutor(max_workers=procesos, initializer=django.setup) as pool:
+                futuros = {pool.submit(generar_rango, *rango, *argumentos): rango for rango in rangos}
+                for futuro in as_completed(futuros):
+                    creadas = futuro.result()
+                    total += creadas
+                    rango_desde, rango_hasta = futuros[futuro]
+                    self.stdout.write(f'{rango_desde} a {rango_hasta}: {creadas} órdenes')
+
+        self.stdout.write(f'{total} órdenes generadas en {time.perf_counter() - inicio:.1f}s; reconstruyendo ventas diarias')
+        call_command('reconstruir_ventas', desde=desde, hasta=hasta, stdout=self.stdout)
+        self.stdout.write(self.style.SUCCESS(f'Listo en {time.perf_counter() - inicio:.1f}s'))
@@ -0,0 +1,109 @@
+import json
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+from statistics import median
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Se ejecuta en un proceso nuevo para medir un arranque en frío, como el de un worker
+SCRIPT = """
+import json, time
+inicio = time.perf_counter()
+import restaurante.wsgi
+importacion = time.perf_counter() - inicio
+from restaurante.arranque import calentar
+print(json.dumps({'importacion': importacion, 'pasos': calentar()}))
+"""
+
+LINEA_IMPORTTIME = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|\s*(\S+)')
+
+
+def _grupo(modulo):
+    """apps.<app> y restaurante por separado; el resto, por paquete de primer nivel."""
+    partes = modulo.split('.')
+    if partes[0] == 'apps' and len(partes) > 1:
+        return '.'.join(partes[:2])
+    return partes[0]
+
+
+def agrupar_importaciones(salida):
+    """Microsegundos propios de importación por grupo, a partir de la salida de -X importtime."""
+    grupos = defaultdict(int)
+    for linea in salida.splitlines():
+        coincidencia = LINEA_IMPORTTIME.match(linea)
+        if coincidencia:
+            grupos[_grupo(coincidencia.group(3))] += int(coincidencia.group(1))
+    return dict(grupos)
+
+
+def _ms(segundos):
+    return 'falló' if segundos is None else f'{segundos * 1000:.0f} ms'
+
+
+class Command(BaseCommand):
+    help = (
+        'Mide el arranque de un worker en un proceso nuevo: cuánto tarda en importar restaurante.wsgi '
+        '(por paquete y por app, con python -X importtime) y cada paso del calentamiento de '
+        'restaurante/arranque.py. Con --repeticiones reporta la mediana.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeticiones', type=int, default=3)
+        parser.add_argument('--top', type=int, default=15, help='Grupos de importación a mostrar')
+        parser.add_argument('--salida', help='Archivo JSON del reporte')
+
+    def handle(self, *args, **options):
+        if options['repeticiones'] < 1:
+            raise CommandError('--repeticiones debe ser mayor que cero')
+        corridas = [self.medir() for _ in range(options['repeticiones'])]
+
+        importacion = median(corrida['importacion'] for corrida in corridas)
+        pasos = {
+            nombre: None if None in valores else median(valores)
+            for nombre, valores in (
+                (nombre, [corrida['pasos'][nombre] for corrida in corridas]) for nombre in corridas[0]['pasos']
+            )
+        }
+        grupos = {
+            grupo: median(corrida['grupos'].get(grupo, 0) for corrida in corridas) / 1e6
+            for grupo in set().union(*(corrida['grupos'] for corrida in corridas))
+        }
+        grupos = dict(sorted(grupos.items(), key=lambda grupo: grupo[1], reverse=True))
+
+        self.stdout.write(f'Importar restaurante.wsgi: {_ms(importacion)}')
+        for grupo, segundos in list(grupos.items())[:options['top']]:
+            self.stdout.write(f'  {grupo:<28} {_ms(segundos):>8}')
+        self.stdout.write('Calentamiento:')
+        for nombre, segundos in pasos.items():
+            self.stdout.write(f'  {nombre:<28} {_ms(segundos):>8}')
+        calentamiento = sum(segundos for segundos in pasos.values() if segundos is not None)
+        self.stdout.write(self.style.SUCCESS(
+            f'Listo para atender en {_ms(importacion + calentamiento)} (mediana de {len(corridas)} corridas)'
+        ))
+
+        if options['salida']:
+            reporte = {
+                'repeticiones': len(corridas),
+                'importacion': importacion,
+                'importacion_por_grupo': grupos,
+                'calentamiento': pasos,
+            }
+            Path(options['salida']).write_text(json.dumps(reporte, indent=2, ensure_ascii=False))
+            self.stdout.write(f'Reporte guardado en {options["salida"]}')
+
+    def medir(self):
+        entorno = {**os.environ, 'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', 'restaurante.settings')}
+        proceso = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', SCRIPT],
+            cwd=settings.BASE_DIR, env=entorno, capture_output=True, text=True,
+        )
+        if proceso.returncode:
+            raise CommandError(f'El arranque falló:\n{proceso.stderr[-2000:]}')
+        # El calentamiento puede escribir en stdout; el JSON es la última línea
+        resultado = json.loads(proceso.stdout.strip().splitlines()[-1])
+        resultado['grupos'] = agrupar_importaciones(proceso.stderr)
+        return resultado
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max, Min
+from apps.ordenes.models import Orden
+
+
+class Command(BaseCommand):
+    help = (
+        'Recalcula en bloque el total y el número de detalles almacenados de todas las órdenes. '
+        'Solo escribe (y marca como actualizadas) las que tenían valores distintos.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=5000, help='Órdenes por UPDATE (por rango de id)')
+
+    def handle(self, *args, **options):
+        lote = options['lote']
+        rango = Orden.objects.aggregate(inicio=Min('id'), fin=Max('id'))
+        if rango['inicio'] is None:
+            self.stdout.write('No hay órdenes que recalcular')
+            return
+
+        actualizadas = 0
+        for desde in range(rango['inicio'], rango['fin'] + 1, lote):
+            with transaction.atomic():
+                actualizadas += Orden.objects.filter(
+                    id__gte=desde, id__lt=desde + lote
+                ).recalcular_totales(solo_distintas=True)
+
+        self.stdout.write(self.style.SUCCESS(f'Totales corregidos en {actualizadas} órdenes'))
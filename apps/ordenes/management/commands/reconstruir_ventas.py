@@ -0,0 +1,49 @@
+from datetime import date, timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Min
+from django.utils import timezone
+from apps.ordenes.models import Orden, OrdenArchivada
+from apps.ordenes.ventas import reconstruir_ventas, reconstruir_ventas_platillo
+
+
+class Command(BaseCommand):
+    help = (
+        'Rellena o reconstruye los acumulados de ventas diarias para un rango de fechas, por lotes de días, '
+        'y después el histórico por platillo'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--desde', type=date.fromisoformat, help='Fecha inicial (YYYY-MM-DD). Por defecto, la primera orden pagada, archivada o no')
+        parser.add_argument('--hasta', type=date.fromisoformat, help='Fecha final (YYYY-MM-DD). Por defecto, hoy')
+        parser.add_argument('--dias-por-lote', type=int, default=31, help='Días reconstruidos por transacción')
+
+    def handle(self, *args, **options):
+        hasta = options['hasta'] or timezone.localdate()
+        desde = options['desde']
+        if desde is None:
+            # Las órdenes archivadas son las más antiguas; si hay alguna, la primera está ahí
+            primera = (
+                OrdenArchivada.objects.aggregate(primera=Min('fecha_hora'))['primera']
+                or Orden.objects.filter(estatus='pagada').aggregate(primera=Min('fecha_hora'))['primera']
+            )
+            if primera is None:
+                self.stdout.write('No hay órdenes pagadas')
+                return
+            desde = timezone.localdate(primera)
+        if desde > hasta:
+            raise CommandError('--desde debe ser anterior o igual a --hasta')
+
+        lote = timedelta(days=options['dias_por_lote'])
+        inicio = desde
+        while inicio <= hasta:
+            fin = min(inicio + lote - timedelta(days=1), hasta)
+            with transaction.atomic():
+                reconstruir_ventas(inicio, fin)
+            self.stdout.write(f'Reconstruido {inicio} a {fin}')
+            inicio = fin + timedelta(days=1)
+
+        with transaction.atomic():
+            reconstruir_ventas_platillo()
+        self.stdout.write('Reconstruido el histórico por platillo')
+        self.stdout.write(self.style.SUCCESS(f'Ventas diarias reconstruidas de {desde} a {hasta}'))
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.6 on 2026-10-18 19:38
+
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import Count, DecimalField, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def calcular_totales(apps, schema_editor):
+    Orden = apps.get_model('ordenes', 'Orden')
+    OrdenDetalle = apps.get_model('ordenes', 'OrdenDetalle')
+    detalles = OrdenDetalle.objects.filter(orden=OuterRef('pk')).order_by().values('orden')
+    subtotales = detalles.annotate(
+        suma=Sum(F('cantidad') * F('precio_unitario'), output_field=DecimalField(max_digits=10, decimal_places=2))
+    ).values('suma')
+    conteos = detalles.annotate(conteo=Count('id')).values('conteo')
+    Orden.objects.update(
+        total=Coalesce(Subquery(subtotales), Value(Decimal('0.00')), output_field=DecimalField(max_digits=10, decimal_places=2)),
+        num_detalles=Coalesce(Subquery(conteos), Value(0)),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ordenes', '0002_metodopago_pago'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='orden',
+            name='num_detalles',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='orden',
+            name='total',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=10),
+        ),
+        migrations.RunPython(calcular_totales, migrations.RunPython.noop),
+    ]
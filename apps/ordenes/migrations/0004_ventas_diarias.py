@@ -0,0 +1,86 @@
+# Generated by Django 5.2.6 on 2026-10-18 19:39
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import Count, DecimalField, F, Sum
+from django.db.models.functions import TruncDate
+
+
+def llenar_ventas_diarias(apps, schema_editor):
+    """Acumulados de las órdenes ya pagadas, con las mismas agregaciones que ventas.reconstruir_ventas()."""
+    Orden = apps.get_model('ordenes', 'Orden')
+    OrdenDetalle = apps.get_model('ordenes', 'OrdenDetalle')
+    Pago = apps.get_model('ordenes', 'Pago')
+    VentasDiarias = apps.get_model('ordenes', 'VentasDiarias')
+    VentasDiariasMetodoPago = apps.get_model('ordenes', 'VentasDiariasMetodoPago')
+    VentasDiariasCategoria = apps.get_model('ordenes', 'VentasDiariasCategoria')
+
+    VentasDiarias.objects.bulk_create(
+        VentasDiarias(fecha=fila['dia'], total=fila['suma'], ordenes=fila['conteo'])
+        for fila in Orden.objects.filter(estatus='pagada').annotate(dia=TruncDate('fecha_hora')).values('dia').annotate(
+            suma=Sum('total'), conteo=Count('id'),
+        ).order_by()
+    )
+    VentasDiariasMetodoPago.objects.bulk_create(
+        VentasDiariasMetodoPago(fecha=fila['dia'], metodo_pago_id=fila['metodo_pago_id'], total=fila['suma'], ordenes=fila['conteo'])
+        for fila in Pago.objects.filter(orden__estatus='pagada').annotate(dia=TruncDate('orden__fecha_hora')).values(
+            'dia', 'metodo_pago_id',
+        ).annotate(suma=Sum('cantidad'), conteo=Count('orden', distinct=True)).order_by()
+    )
+    VentasDiariasCategoria.objects.bulk_create(
+        VentasDiariasCategoria(fecha=fila['dia'], categoria_id=fila['platillo__categoria_id'], total=fila['suma'], cantidad=fila['vendidos'])
+        for fila in OrdenDetalle.objects.filter(orden__estatus='pagada').annotate(dia=TruncDate('orden__fecha_hora')).values(
+            'dia', 'platillo__categoria_id',
+        ).annotate(
+            vendidos=Sum('cantidad'),
+            suma=Sum(F('cantidad') * F('precio_unitario'), output_field=DecimalField(max_digits=12, decimal_places=2)),
+        ).order_by()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ordenes', '0003_orden_total_num_detalles'),
+        ('platillos', '0002_alter_categoria_options_alter_platillo_options_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VentasDiarias',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField(unique=True)),
+                ('total', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12)),
+                ('ordenes', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='VentasDiariasCategoria',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField()),
+                ('total', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12)),
+                ('cantidad', models.IntegerField(default=0)),
+                ('categoria', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ventas_diarias', to='platillos.categoria')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('fecha', 'categoria'), name='ventas_diarias_categoria_unica')],
+            },
+        ),
+        migrations.CreateModel(
+            name='VentasDiariasMetodoPago',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField()),
+                ('total', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12)),
+                ('ordenes', models.IntegerField(default=0)),
+                ('metodo_pago', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ventas_diarias', to='ordenes.metodopago')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('fecha', 'metodo_pago'), name='ventas_diarias_metodo_unica')],
+            },
+        ),
+        migrations.RunPython(llenar_ventas_diarias, migrations.RunPython.noop),
+    ]
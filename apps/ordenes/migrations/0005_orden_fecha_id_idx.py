@@ -0,0 +1,19 @@
+# Generated by Django 5.2.6 on 2026-10-18 19:41
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ordenes', '0004_ventas_diarias'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='orden',
+            index=models.Index(fields=['fecha_hora', 'id'], name='orden_fecha_id_idx'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.6 on 2026-10-18 20:05
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ordenes', '0005_orden_fecha_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='orden',
+            name='actualizado',
+            field=models.DateTimeField(auto_now=True, db_index=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+    ]
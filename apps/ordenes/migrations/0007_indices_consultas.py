@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-10-18 19:48
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ordenes', '0006_orden_actualizado'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='orden',
+            index=models.Index(fields=['estatus', 'fecha_hora', 'id'], name='orden_estatus_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pago',
+            index=models.Index(fields=['fecha_hora'], name='pago_fecha_idx'),
+        ),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 5.2.6 on 2026-10-18 19:56
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import DecimalField, F, Sum
+from django.db.models.functions import TruncDate
+
+
+def llenar_ventas_platillo(apps, schema_editor):
+    """
+    Acumulados por día y platillo de las órdenes ya pagadas y, a partir de
+    ellos, el histórico por platillo, como ventas.reconstruir_ventas() y
+    ventas.reconstruir_ventas_platillo().
+    """
+    OrdenDetalle = apps.get_model('ordenes', 'OrdenDetalle')
+    VentasDiariasPlatillo = apps.get_model('ordenes', 'VentasDiariasPlatillo')
+    VentasPlatillo = apps.get_model('ordenes', 'VentasPlatillo')
+
+    VentasDiariasPlatillo.objects.bulk_create(
+        VentasDiariasPlatillo(fecha=fila['dia'], platillo_id=fila['platillo_id'], total=fila['suma'], cantidad=fila['vendidos'])
+        for fila in OrdenDetalle.objects.filter(orden__estatus='pagada').annotate(dia=TruncDate('orden__fecha_hora')).values(
+            'dia', 'platillo_id',
+        ).annotate(
+            vendidos=Sum('cantidad'),
+            suma=Sum(F('cantidad') * F('precio_unitario'), output_field=DecimalField(max_digits=12, decimal_places=2)),
+        ).order_by()
+    )
+    VentasPlatillo.objects.bulk_create(
+        VentasPlatillo(platillo_id=fila['platillo_id'], total=fila['suma'], cantidad=fila['vendidos'])
+        for fila in VentasDiariasPlatillo.objects.values('platillo_id').annotate(
+            suma=Sum('total'), vendidos=Sum('cantidad'),
+        ).order_by()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ordenes', '0007_indices_consultas'),
+        ('platillos', '0002_alter_categoria_options_alter_platillo_options_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VentasDiariasPlatillo',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField()),
+                ('total', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12)),
+                ('cantidad', models.IntegerField(default=0)),
+                ('platillo', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ventas_diarias', to='platillos.platillo')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['fecha', '-cantidad', 'platillo'], name='ventas_platillo_dia_idx')],
+                'constraints': [models.UniqueConstraint(fields=('fecha', 'platillo'), name='ventas_diarias_platillo_unica')],
+            },
+        ),
+        migrations.CreateModel(
+            name='VentasPlatillo',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('cantidad', models.IntegerField(default=0)),
+                ('platillo', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='ventas', to='platillos.platillo')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['-cantidad', 'platillo'], name='ventas_platillo_cantidad_idx')],
+            },
+        ),
+        migrations.RunPython(llenar_ventas_platillo, migrations.RunPython.noop),
+    ]
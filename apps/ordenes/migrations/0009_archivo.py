@@ -0,0 +1,61 @@
+# Generated by Django 5.2.6 on 2026-10-18 20:04
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ordenes', '0008_ventas_platillo'),
+        ('platillos', '0002_alter_categoria_options_alter_platillo_options_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrdenArchivada',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('fecha_hora', models.DateTimeField()),
+                ('estatus', models.CharField(max_length=50)),
+                ('total', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=10)),
+                ('num_detalles', models.IntegerField(default=0)),
+                ('actualizado', models.DateTimeField()),
+                ('archivada', models.DateTimeField(auto_now_add=True)),
+                ('empleado', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ordenes_archivadas', to=settings.AUTH_USER_MODEL)),
+                ('mesa', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ordenes_archivadas', to='ordenes.mesa')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='OrdenDetalleArchivado',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('cantidad', models.IntegerField()),
+                ('notas', models.TextField(blank=True, null=True)),
+                ('precio_unitario', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('orden', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='detalles', to='ordenes.ordenarchivada')),
+                ('platillo', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='detalles_archivados', to='platillos.platillo')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='PagoArchivado',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('cantidad', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('fecha_hora', models.DateTimeField()),
+                ('metodo_pago', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pagos_archivados', to='ordenes.metodopago')),
+                ('orden', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pagos', to='ordenes.ordenarchivada')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='ordenarchivada',
+            index=models.Index(fields=['fecha_hora', 'id'], name='orden_archivada_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pagoarchivado',
+            index=models.Index(fields=['fecha_hora'], name='pago_archivado_fecha_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+from django.db import migrations
+
+ESTADOS_REQUERIDOS = ('Disponible', 'Ocupada')
+
+
+def crear_estados(apps, schema_editor):
+    MesaEstado = apps.get_model('ordenes', 'MesaEstado')
+    for nombre in ESTADOS_REQUERIDOS:
+        if not MesaEstado.objects.filter(nombre=nombre).exists():
+            MesaEstado.objects.create(nombre=nombre)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ordenes', '0009_archivo'),
+    ]
+
+    operations = [
+        migrations.RunPython(crear_estados, migrations.RunPython.noop),
+    ]
@@ -1,7 +1,11 @@
 # apps/ordenes/models.py
+from decimal import Decimal
 from django.db import models
+from django.db.models import Count, DecimalField, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 from apps.accounts.models import AppUser
-from apps.platillos.models import Platillo
+from apps.platillos.models import Categoria, Platillo
 
 class MesaEstado(models.Model):
     nombre = models.CharField(max_length=50)
@@ -17,16 +21,53 @@ class Mesa(models.Model):
     def __str__(self):
         return self.nombre
 
+class OrdenQuerySet(models.QuerySet):
+    def recalcular_totales(self, solo_distintas=False):
+        """
+        Recalcula total y num_detalles de las órdenes del queryset
+        a partir de sus detalles, en un solo UPDATE. También marca las
+        órdenes como actualizadas para el feed incremental de cocina.
+        Con `solo_distintas` toca únicamente las órdenes cuyos valores
+        guardados no coinciden, así que las demás conservan su `actualizado`.
+        """
+        detalles = OrdenDetalle.objects.filter(orden=OuterRef('pk')).order_by().values('orden')
+        subtotales = detalles.annotate(
+            suma=Sum(F('cantidad') * F('precio_unitario'), output_field=DecimalField(max_digits=10, decimal_places=2))
+        ).values('suma')
+        conteos = detalles.annotate(conteo=Count('id')).values('conteo')
+        total = Coalesce(Subquery(subtotales), Value(Decimal('0.00')), output_field=DecimalField(max_digits=10, decimal_places=2))
+        num_detalles = Coalesce(Subquery(conteos), Value(0))
+        queryset = self
+        if solo_distintas:
+            queryset = self.alias(nuevo_total=total, nuevo_num=num_detalles).exclude(
+                total=F('nuevo_total'), num_detalles=F('nuevo_num'),
+            )
+        return queryset.update(actualizado=timezone.now(), total=total, num_detalles=num_detalles)
+
 class Orden(models.Model):
     empleado = models.ForeignKey(AppUser, on_delete=models.CASCADE, related_name='ordenes')
     mesa = models.ForeignKey(Mesa, on_delete=models.CASCADE, related_name='ordenes')
     fecha_hora = models.DateTimeField(auto_now_add=True)
     estatus = models.CharField(max_length=50, default='pendiente')
+    # Se mantienen desde las señales de OrdenDetalle (ver signals.py)
+    total = models.DecimalField(max_digits=10, decimal_places=2, default=Decimal('0.00'))
+    num_detalles = models.IntegerField(default=0)
+    # Cambia con el estatus y con cualquier alta, edición o baja de detalles
+    actualizado = models.DateTimeField(auto_now=True, db_index=True)
 
-    @property
-    def total(self):
-        detalles = self.detalles.all()
-        return sum(detalle.subtotal for detalle in detalles)
+    objects = OrdenQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Paginación por cursor (ver paginacion.py)
+            models.Index(fields=['fecha_hora', 'id'], name='orden_fecha_id_idx'),
+            # Listas y reportes filtrados por estatus y rango de fechas
+            models.Index(fields=['estatus', 'fecha_hora', 'id'], name='orden_estatus_fecha_idx'),
+        ]
+
+    def recalcular_total(self):
+        Orden.objects.filter(pk=self.pk).recalcular_totales()
+        self.refresh_from_db(fields=['total', 'num_detalles'])
 
 class OrdenDetalle(models.Model):
     orden = models.ForeignKey(Orden, on_delete=models.CASCADE, related_name='detalles')
@@ -53,3 +94,115 @@ class Pago(models.Model):
     metodo_pago = models.ForeignKey(MetodoPago, on_delete=models.CASCADE, related_name='pagos')
     cantidad = models.DecimalField(max_digits=10, decimal_places=2)
     fecha_hora = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['fecha_hora'], name='pago_fecha_idx'),
+        ]
+
+class VentasDiarias(models.Model):
+    """Acumulado de órdenes pagadas por día (fecha de la orden)."""
+    fecha = models.DateField(unique=True)
+    total = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'))
+    ordenes = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.fecha}: ${self.total}"
+
+class VentasDiariasMetodoPago(models.Model):
+    """Acumulado de lo cobrado por día y método de pago."""
+    fecha = models.DateField()
+    metodo_pago = models.ForeignKey(MetodoPago, on_delete=models.CASCADE, related_name='ventas_diarias')
+    total = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'))
+    ordenes = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['fecha', 'metodo_pago'], name='ventas_diarias_metodo_unica'),
+        ]
+
+class VentasDiariasCategoria(models.Model):
+    """Acumulado de platillos vendidos por día y categoría."""
+    fecha = models.DateField()
+    categoria = models.ForeignKey(Categoria, on_delete=models.CASCADE, related_name='ventas_diarias')
+    total = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'))
+    cantidad = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['fecha', 'categoria'], name='ventas_diarias_categoria_unica'),
+        ]
+
+class VentasDiariasPlatillo(models.Model):
+    """Acumulado de unidades e ingresos por día y platillo."""
+    fecha = models.DateField()
+    platillo = models.ForeignKey(Platillo, on_delete=models.CASCADE, related_name='ventas_diarias')
+    total = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'))
+    cantidad = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['fecha', 'platillo'], name='ventas_diarias_platillo_unica'),
+        ]
+        indexes = [
+            # Top del día: lectura por índice sin ordenar en memoria
+            models.Index(fields=['fecha', '-cantidad', 'platillo'], name='ventas_platillo_dia_idx'),
+        ]
+
+class VentasPlatillo(models.Model):
+    """Acumulado histórico por platillo; el top de todos los tiempos es una lectura por índice."""
+    platillo = models.OneToOneField(Platillo, on_delete=models.CASCADE, related_name='ventas')
+    total = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+    cantidad = models.IntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-cantidad', 'platillo'], name='ventas_platillo_cantidad_idx'),
+        ]
+
+# Archivo de órdenes pagadas antiguas (ver archivo.py). Conservan los ids de
+# las tablas vivas y los mismos nombres de campo, así que los serializers y
+# reportes las leen igual que a Orden, OrdenDetalle y Pago.
+
+class OrdenArchivada(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    empleado = models.ForeignKey(AppUser, on_delete=models.CASCADE, related_name='ordenes_archivadas')
+    mesa = models.ForeignKey(Mesa, on_delete=models.CASCADE, related_name='ordenes_archivadas')
+    fecha_hora = models.DateTimeField()
+    estatus = models.CharField(max_length=50)
+    total = models.DecimalField(max_digits=10, decimal_places=2, default=Decimal('0.00'))
+    num_detalles = models.IntegerField(default=0)
+    actualizado = models.DateTimeField()
+    archivada = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['fecha_hora', 'id'], name='orden_archivada_fecha_idx'),
+        ]
+
+    def __str__(self):
+        return f"Orden archivada {self.id}"
+
+class OrdenDetalleArchivado(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    orden = models.ForeignKey(OrdenArchivada, on_delete=models.CASCADE, related_name='detalles')
+    platillo = models.ForeignKey(Platillo, on_delete=models.CASCADE, related_name='detalles_archivados')
+    cantidad = models.IntegerField()
+    notas = models.TextField(blank=True, null=True)
+    precio_unitario = models.DecimalField(max_digits=10, decimal_places=2)
+
+    @property
+    def subtotal(self):
+        return self.cantidad * self.precio_unitario
+
+class PagoArchivado(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    orden = models.ForeignKey(OrdenArchivada, on_delete=models.CASCADE, related_name='pagos')
+    metodo_pago = models.ForeignKey(MetodoPago, on_delete=models.CASCADE, related_name='pagos_archivados')
+    cantidad = models.DecimalField(max_digits=10, decimal_places=2)
+    fecha_hora = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['fecha_hora'], name='pago_archivado_fecha_idx'),
+        ]
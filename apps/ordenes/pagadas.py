@@ -0,0 +1,59 @@
+"""
+Caché de órdenes pagadas.
+
+Una orden pagada casi no cambia, así que su representación en la API y los
+datos de su recibo se guardan ORDENES_PAGADAS_TIMEOUT segundos, con clave
+por tipo, versión de formato y id de orden. Se invalidan si la orden o sus
+detalles se vuelven a guardar o se eliminan (p. ej. al reabrir una orden
+pagada); ver signals.py. Los datos anidados, como el estado de la mesa,
+quedan como estaban al guardarse en caché.
+
+La invalidación borra la entrada del caché default, así que solo llega a
+todos los workers si ese caché es compartido; el check platillos.E001 lo
+exige con WEB_CONCURRENCY > 1. El timeout acota lo que dura una entrada
+vieja cuando el borrado no llega a algún caché.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+# Cambiar al modificar OrdenSerializer o los datos del recibo, para no servir el formato anterior
+FORMATO = 1
+TIPOS = ('api', 'recibo')
+
+
+def clave_orden_pagada(tipo, pk):
+    return f'orden_pagada:{tipo}:v{FORMATO}:{pk}'
+
+
+def etag_orden_pagada(orden):
+    """ETag fuerte: id, formato y el momento del último cambio de la orden."""
+    return f'"orden-{orden.pk}-v{FORMATO}-{int(orden.actualizado.timestamp() * 1_000_000)}"'
+
+
+def obtener_orden_pagada(tipo, pk):
+    return cache.get(clave_orden_pagada(tipo, pk))
+
+
+def guardar_orden_pagada(tipo, orden, valor):
+    """Guarda `valor` si la orden está pagada; retorna `valor`."""
+    if orden.estatus == 'pagada':
+        cache.set(clave_orden_pagada(tipo, orden.pk), valor, settings.ORDENES_PAGADAS_TIMEOUT)
+    return valor
+
+
+async def aobtener_orden_pagada(tipo, pk):
+    return await cache.aget(clave_orden_pagada(tipo, pk))
+
+
+async def aguardar_orden_pagada(tipo, orden, valor):
+    if orden.estatus == 'pagada':
+        await cache.aset(clave_orden_pagada(tipo, orden.pk), valor, settings.ORDENES_PAGADAS_TIMEOUT)
+    return valor
+
+
+def invalidar_orden_pagada(pk):
+    """Borra las entradas ahora y otra vez al confirmar, por si otro worker las regeneró con datos viejos."""
+    claves = [clave_orden_pagada(tipo, pk) for tipo in TIPOS]
+    cache.delete_many(claves)
+    transaction.on_commit(lambda: cache.delete_many(claves))
@@ -0,0 +1,91 @@
+"""
+Paginación por cursor (keyset) de órdenes sobre (fecha_hora, id).
+
+En lugar de OFFSET, cada página continúa a partir de la última orden de la
+anterior, así que el costo de una página es el mismo sin importar qué tan
+profundo se navegue: un recorrido por rango del índice orden_fecha_id_idx.
+
+Con `archivo` (ver archivo.archivo_de_filtros) se pide la misma página a
+las órdenes archivadas y se mezclan las dos: los ids no se repiten entre
+tablas, así que el cursor sirve para ambas.
+"""
+import base64
+from datetime import date, datetime, time, timedelta
+from django.db.models import Q
+from django.utils import timezone
+
+
+class CursorInvalido(ValueError):
+    pass
+
+
+def codificar_cursor(orden):
+    valor = f'{orden.fecha_hora.isoformat()}|{orden.pk}'
+    return base64.urlsafe_b64encode(valor.encode()).decode()
+
+
+def decodificar_cursor(cursor):
+    try:
+        fecha_hora, pk = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        return datetime.fromisoformat(fecha_hora), int(pk)
+    except (ValueError, UnicodeError):
+        raise CursorInvalido('Cursor inválido')
+
+
+def _fecha(valor):
+    try:
+        return date.fromisoformat(valor)
+    except ValueError:
+        raise CursorInvalido(f'Fecha inválida: {valor}')
+
+
+def filtrar_ordenes(queryset, params):
+    """Aplica los filtros estatus, desde y hasta (YYYY-MM-DD, inclusivos)."""
+    if params.get('estatus'):
+        queryset = queryset.filter(estatus=params['estatus'])
+    if params.get('desde'):
+        desde = _fecha(params['desde'])
+        queryset = queryset.filter(fecha_hora__gte=timezone.make_aware(datetime.combine(desde, time.min)))
+    if params.get('hasta'):
+        hasta = _fecha(params['hasta']) + timedelta(days=1)
+        queryset = queryset.filter(fecha_hora__lt=timezone.make_aware(datetime.combine(hasta, time.min)))
+    return queryset
+
+
+def consulta_pagina(queryset, cursor=None, tamano=25):
+    """Queryset sin evaluar de la página: tamano + 1 filas para saber si hay otra."""
+    queryset = queryset.order_by('-fecha_hora', '-id')
+    if cursor:
+        fecha_hora, pk = decodificar_cursor(cursor)
+        # fecha_hora__lte acota el rango del índice; el OR desempata por id
+        queryset = queryset.filter(fecha_hora__lte=fecha_hora).filter(
+            Q(fecha_hora__lt=fecha_hora) | Q(id__lt=pk)
+        )
+    return queryset[:tamano + 1]
+
+
+def _cortar_pagina(ordenes, tamano):
+    ordenes = sorted(ordenes, key=lambda orden: (orden.fecha_hora, orden.pk), reverse=True)[:tamano + 1]
+    if len(ordenes) > tamano:
+        return ordenes[:tamano], codificar_cursor(ordenes[tamano - 1])
+    return ordenes, None
+
+
+def paginar_por_cursor(queryset, cursor=None, tamano=25, archivo=None):
+    """
+    Retorna (ordenes, siguiente_cursor) con las `tamano` órdenes más recientes
+    posteriores al cursor, de `queryset` y del queryset `archivo` si se da.
+    siguiente_cursor es None en la última página.
+    """
+    ordenes = list(consulta_pagina(queryset, cursor, tamano))
+    if archivo is not None:
+        ordenes += consulta_pagina(archivo, cursor, tamano)
+    return _cortar_pagina(ordenes, tamano)
+
+
+async def apaginar_por_cursor(queryset, cursor=None, tamano=25, archivo=None):
+    """Igual que paginar_por_cursor, con el ORM async."""
+    ordenes = [orden async for orden in consulta_pagina(queryset, cursor, tamano)]
+    if archivo is not None:
+        ordenes += [orden async for orden in consulta_pagina(archivo, cursor, tamano)]
+    return _cortar_pagina(ordenes, tamano)
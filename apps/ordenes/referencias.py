@@ -0,0 +1,88 @@
+"""
+Registro en memoria de las tablas de referencia MesaEstado y MetodoPago.
+
+Sigue el mismo esquema que apps.platillos.catalogo (ver
+restaurante/versiones.py): cada worker guarda las filas junto con una
+versión que vive en el caché de Django, y las señales de los modelos la
+cambian en cada alta, edición o baja. Así abrir una orden o registrar un
+pago ya no consulta estas tablas.
+
+Los estados Disponible y Ocupada se crean en la migración 0010 y son
+obligatorios: calentar_referencias() falla al arrancar si no existen.
+"""
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DEFAULT_DB_ALIAS
+from restaurante.versiones import cambiar_version, obtener_version
+from .models import MesaEstado, MetodoPago
+
+CLAVE_VERSION = 'referencias:version'
+ESTADO_DISPONIBLE = 'Disponible'
+ESTADO_OCUPADA = 'Ocupada'
+ESTADOS_REQUERIDOS = (ESTADO_DISPONIBLE, ESTADO_OCUPADA)
+
+_referencias = None
+
+
+class EstadoMesaFaltante(ImproperlyConfigured):
+    pass
+
+
+class Referencias:
+    def __init__(self, version, estados_mesa, metodos_pago):
+        self.version = version
+        self.estados_mesa = {estado.nombre: estado for estado in estados_mesa}
+        self.metodos_pago = metodos_pago
+        self.metodos_pago_por_id = {metodo.id: metodo for metodo in metodos_pago}
+
+    def estado_mesa(self, nombre):
+        try:
+            return self.estados_mesa[nombre]
+        except KeyError:
+            raise EstadoMesaFaltante(f"No existe el estado de mesa '{nombre}'; créelo en Estados de mesa")
+
+    @property
+    def disponible(self):
+        return self.estado_mesa(ESTADO_DISPONIBLE)
+
+    @property
+    def ocupada(self):
+        return self.estado_mesa(ESTADO_OCUPADA)
+
+    def faltantes(self):
+        return [nombre for nombre in ESTADOS_REQUERIDOS if nombre not in self.estados_mesa]
+
+    def metodo_pago(self, pk):
+        return self.metodos_pago_por_id.get(pk)
+
+    def metodos_pago_choices(self):
+        return [(metodo.id, metodo.nombre) for metodo in self.metodos_pago]
+
+
+def version_referencias():
+    return obtener_version(CLAVE_VERSION)
+
+
+def obtener_referencias():
+    global _referencias
+    version = version_referencias()
+    if _referencias is None or _referencias.version != version:
+        # Del primario, como el catálogo de platillos
+        _referencias = Referencias(
+            version,
+            list(MesaEstado.objects.using(DEFAULT_DB_ALIAS)),
+            list(MetodoPago.objects.using(DEFAULT_DB_ALIAS).order_by('nombre')),
+        )
+    return _referencias
+
+
+def invalidar_referencias():
+    cambiar_version(CLAVE_VERSION)
+
+
+def calentar_referencias():
+    """Carga el registro antes de atender tráfico; lanza EstadoMesaFaltante si faltan estados requeridos."""
+    faltantes = obtener_referencias().faltantes()
+    if faltantes:
+        raise EstadoMesaFaltante(
+            f'Faltan estados de mesa requeridos: {", ".join(faltantes)}. Créelos en Estados de mesa o desde manage.py shell'
+        )
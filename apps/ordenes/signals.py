@@ -0,0 +1,49 @@
+from django.db.models.signals import post_save, post_delete, pre_delete
+from django.dispatch import receiver
+from .eventos import evento_detalle, evento_orden, publicar_al_confirmar
+from .models import MesaEstado, MetodoPago, Orden, OrdenDetalle
+from .pagadas import invalidar_orden_pagada
+from .referencias import invalidar_referencias
+from .ventas import descontar_venta
+
+@receiver(post_save, sender=OrdenDetalle)
+@receiver(post_delete, sender=OrdenDetalle)
+def actualizar_total_orden(sender, instance, **kwargs):
+    # Mantiene Orden.total y Orden.num_detalles al crear, editar o eliminar un detalle
+    Orden.objects.filter(pk=instance.orden_id).recalcular_totales()
+
+@receiver(post_save, sender=OrdenDetalle)
+def publicar_detalle(sender, instance, **kwargs):
+    publicar_al_confirmar(evento_detalle(instance))
+
+@receiver(post_delete, sender=OrdenDetalle)
+def publicar_detalle_eliminado(sender, instance, **kwargs):
+    publicar_al_confirmar(evento_detalle(instance, tipo='detalle_eliminado'))
+
+@receiver(post_save, sender=Orden)
+def publicar_orden(sender, instance, **kwargs):
+    publicar_al_confirmar(evento_orden(instance))
+
+@receiver(pre_delete, sender=Orden)
+def descontar_orden_eliminada(sender, instance, **kwargs):
+    # Antes del borrado, mientras existen sus detalles y pagos (también al eliminar su mesa o mesero)
+    if instance.estatus == 'pagada':
+        descontar_venta(instance)
+
+@receiver(post_save, sender=Orden)
+@receiver(post_delete, sender=Orden)
+def invalidar_cache_orden(sender, instance, **kwargs):
+    # El pago usa un UPDATE condicional, así que solo llega aquí una orden reabierta, editada o eliminada
+    invalidar_orden_pagada(instance.pk)
+
+@receiver(post_save, sender=OrdenDetalle)
+@receiver(post_delete, sender=OrdenDetalle)
+def invalidar_cache_orden_detalle(sender, instance, **kwargs):
+    invalidar_orden_pagada(instance.orden_id)
+
+@receiver(post_save, sender=MesaEstado)
+@receiver(post_delete, sender=MesaEstado)
+@receiver(post_save, sender=MetodoPago)
+@receiver(post_delete, sender=MetodoPago)
+def cambiar_version_referencias(sender, **kwargs):
+    invalidar_referencias()
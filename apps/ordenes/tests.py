@@ -1,3 +1,946 @@
-from django.test import TestCase
+import asyncio
+import random
+import tempfile
+import threading
+from datetime import timedelta
+from importlib import import_module
+from decimal import Decimal
+from io import StringIO
+from pathlib import Path
+from unittest import mock, skipUnless
+from django.conf import settings
+from django.apps import apps as django_apps
+from django.contrib.staticfiles import finders
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.templatetags.static import static
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection, connections, router, transaction
+from django.db.models import QuerySet
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
+from django.utils import timezone
+from apps.accounts.models import AppUser
+from apps.platillos.catalogo import obtener_catalogo
+from apps.platillos.models import Categoria, Platillo
+from restaurante.dashboard import CONSULTAS_DASHBOARD, resumen_dashboard
+from restaurante.arranque import PASOS, calentar
+from restaurante.metricas import Medicion, RegistroMetricas, registro
+from restaurante.middleware import ReplicaMiddleware
+from restaurante.estaticos import referencias_estaticas
+from restaurante.replicas import COOKIE_ESCRITURA, lectura_en_replica
+from .archivo import archivar_lote, fecha_corte
+from .datos_sinteticos import asegurar_referencias, cargar_referencias, generar_ordenes
+from .management.commands.medir_arranque import agrupar_importaciones
+from .exportacion import filas_csv, respuesta_csv
+from .forms import PagoForm
+from .models import (
+    Mesa, MesaEstado, MetodoPago, Orden, OrdenArchivada, OrdenDetalle, Pago, PagoArchivado, VentasDiarias,
+    VentasDiariasCategoria, VentasDiariasMetodoPago, VentasDiariasPlatillo, VentasPlatillo,
+)
+from .estados import MesaNoDisponible, ocupar_mesa
+from .eventos import Broker, broker, publicar_al_confirmar
+from .paginacion import paginar_por_cursor
+from .views import EventosOrdenesView
+from .referencias import obtener_referencias
+from .ventas import acumular_venta, mas_vendidos, reconstruir_ventas, reconstruir_ventas_platillo
+
+
+class DatosOrdenesMixin:
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = AppUser.objects.create_user(username='mesero', password='secreto123')
+        # Los crea la migración 0010, salvo después de vaciar la base en un TransactionTestCase
+        cls.disponible, _ = MesaEstado.objects.get_or_create(nombre='Disponible')
+        cls.ocupada, _ = MesaEstado.objects.get_or_create(nombre='Ocupada')
+        cls.mesa = Mesa.objects.create(nombre='Mesa 1', capacidad=4, estado=cls.disponible)
+        cls.categoria = Categoria.objects.create(nombre='Pizzas')
+        cls.platillo = Platillo.objects.create(
+            nombre='Margherita', descripcion='', precio=Decimal('15.00'), categoria=cls.categoria
+        )
+        cls.efectivo = MetodoPago.objects.create(nombre='Efectivo')
+
+    def setUp(self):
+        # Un worker en marcha ya tiene cargados el catálogo y las referencias
+        obtener_catalogo()
+        obtener_referencias()
+
+    def crear_orden(self, cantidad=1, estatus='pagada', fecha_hora=None, platillo=None):
+        platillo = platillo or self.platillo
+        orden = Orden.objects.create(empleado=self.usuario, mesa=self.mesa, estatus=estatus)
+        OrdenDetalle.objects.create(
+            orden=orden, platillo=platillo, cantidad=cantidad, precio_unitario=platillo.precio
+        )
+        if fecha_hora:
+            Orden.objects.filter(pk=orden.pk).update(fecha_hora=fecha_hora)
+        orden.refresh_from_db()
+        if estatus == 'pagada':
+            pago = Pago.objects.create(orden=orden, metodo_pago=self.efectivo, cantidad=orden.total)
+            acumular_venta(orden, pago)
+        return orden
+
+
+class TotalesOrdenTests(DatosOrdenesMixin, TestCase):
+    def test_detalles_mantienen_total_y_num_detalles(self):
+        orden = self.crear_orden(cantidad=2, estatus='pendiente')
+        self.assertEqual((orden.total, orden.num_detalles), (Decimal('30.00'), 1))
+
+        detalle = OrdenDetalle.objects.create(orden=orden, platillo=self.platillo, cantidad=1, precio_unitario=Decimal('10.00'))
+        orden.refresh_from_db()
+        self.assertEqual((orden.total, orden.num_detalles), (Decimal('40.00'), 2))
+
+        detalle.cantidad = 3
+        detalle.save()
+        orden.refresh_from_db()
+        self.assertEqual((orden.total, orden.num_detalles), (Decimal('60.00'), 2))
+
+        detalle.delete()
+        orden.detalles.get().delete()
+        orden.refresh_from_db()
+        self.assertEqual((orden.total, orden.num_detalles), (Decimal('0.00'), 0))
+
+    def test_recalcular_totales_corrige_valores_guardados(self):
+        ordenes = [self.crear_orden(cantidad=cantidad, estatus='pendiente') for cantidad in (1, 2, 3, 4)]
+        hace_un_dia = timezone.now() - timedelta(days=1)
+        Orden.objects.update(actualizado=hace_un_dia)
+        Orden.objects.exclude(pk=ordenes[-1].pk).update(total=Decimal('0.00'), num_detalles=0)
+
+        salida = StringIO()
+        call_command('recalcular_totales', lote=2, stdout=salida)
+
+        self.assertIn('3 órdenes', salida.getvalue())
+        self.assertEqual(
+            list(Orden.objects.order_by('id').values_list('total', 'num_detalles')),
+            [(orden.total, 1) for orden in ordenes],
+        )
+        # La orden que ya estaba bien no aparece como cambiada en el feed de cocina
+        ordenes[-1].refresh_from_db()
+        self.assertEqual(ordenes[-1].actualizado, hace_un_dia)
+
+
+class DashboardTests(DatosOrdenesMixin, TestCase):
+    def test_resumen_usa_consultas_fijas(self):
+        self.crear_orden(cantidad=2)
+        with self.assertNumQueries(CONSULTAS_DASHBOARD):
+            resumen_dashboard()
+
+        for _ in range(5):
+            self.crear_orden()
+        with self.assertNumQueries(CONSULTAS_DASHBOARD):
+            resumen = resumen_dashboard()
+
+        self.assertEqual(resumen['ventas_totales'], Decimal('105.00'))
+        self.assertEqual(resumen['cantidad_ordenes'], 6)
+        self.assertEqual(resumen['platillos_mas_vendidos'][0]['cantidad'], 7)
+
+    def test_semana_no_mezcla_anios(self):
+        self.crear_orden(cantidad=1)
+        self.crear_orden(cantidad=3, fecha_hora=timezone.now() - timedelta(weeks=52))
+        self.crear_orden(cantidad=3, estatus='pendiente')
+
+        resumen = resumen_dashboard()
+
+        self.assertEqual(sum(dia['total'] for dia in resumen['ventas_por_dia']), 15.0)
+
+    def test_vista_dashboard(self):
+        self.client.force_login(self.usuario)
+        response = self.client.get(reverse('index_user'))
+        self.assertEqual(response.status_code, 200)
+
+
+class VentasDiariasTests(DatosOrdenesMixin, TestCase):
+    def test_reconstruir_coincide_con_acumulado(self):
+        self.crear_orden(cantidad=2)
+        self.crear_orden(cantidad=1)
+        self.crear_orden(cantidad=4, fecha_hora=timezone.now() - timedelta(days=3))
+        incremental = list(VentasDiarias.objects.order_by('fecha').values_list('fecha', 'total', 'ordenes'))
+        categorias = list(VentasDiariasCategoria.objects.order_by('fecha').values_list('fecha', 'total', 'cantidad'))
+
+        hoy = timezone.localdate()
+        reconstruir_ventas(hoy - timedelta(days=10), hoy)
+
+        self.assertEqual(list(VentasDiarias.objects.order_by('fecha').values_list('fecha', 'total', 'ordenes')), incremental)
+        self.assertEqual(list(VentasDiariasCategoria.objects.order_by('fecha').values_list('fecha', 'total', 'cantidad')), categorias)
+        self.assertEqual(VentasDiarias.objects.get(fecha=hoy).total, Decimal('45.00'))
+
+    def test_migracion_llena_acumulados_diarios(self):
+        self.crear_orden(cantidad=2)
+        self.crear_orden(cantidad=4, fecha_hora=timezone.now() - timedelta(days=3))
+        self.crear_orden(estatus='pendiente')
+        tablas = {
+            VentasDiarias: ('fecha', 'total', 'ordenes'),
+            VentasDiariasMetodoPago: ('fecha', 'metodo_pago_id', 'total', 'ordenes'),
+            VentasDiariasCategoria: ('fecha', 'categoria_id', 'total', 'cantidad'),
+        }
+        esperado = {modelo: set(modelo.objects.values_list(*campos)) for modelo, campos in tablas.items()}
+        for modelo in tablas:
+            modelo.objects.all().delete()
+
+        import_module('apps.ordenes.migrations.0004_ventas_diarias').llenar_ventas_diarias(django_apps, None)
+
+        self.assertEqual({modelo: set(modelo.objects.values_list(*campos)) for modelo, campos in tablas.items()}, esperado)
+
+    def test_migracion_llena_acumulados_por_platillo(self):
+        self.crear_orden(cantidad=2)
+        self.crear_orden(cantidad=4, fecha_hora=timezone.now() - timedelta(days=3))
+        self.crear_orden(estatus='pendiente')
+        diarios = set(VentasDiariasPlatillo.objects.values_list('fecha', 'platillo_id', 'total', 'cantidad'))
+        VentasDiariasPlatillo.objects.all().delete()
+        VentasPlatillo.objects.all().delete()
+
+        import_module('apps.ordenes.migrations.0008_ventas_platillo').llenar_ventas_platillo(django_apps, None)
+
+        self.assertEqual(set(VentasDiariasPlatillo.objects.values_list('fecha', 'platillo_id', 'total', 'cantidad')), diarios)
+        self.assertEqual(mas_vendidos(), [{'platillo_id': self.platillo.pk, 'cantidad': 6, 'total': Decimal('90.00')}])
+
+    def test_pagar_actualiza_acumulado(self):
+        orden = self.crear_orden(cantidad=2, estatus='pendiente')
+        self.client.force_login(self.usuario)
+        self.client.post(reverse('ordenes:ordenes_pagar', args=[orden.id]), {
+            'orden': orden.id, 'metodo_pago': self.efectivo.id, 'cantidad': '30.00',
+        })
+        venta = VentasDiarias.objects.get(fecha=timezone.localdate(orden.fecha_hora))
+        self.assertEqual((venta.total, venta.ordenes), (Decimal('30.00'), 1))
+
+    def test_acumular_venta_hace_un_upsert_por_tabla(self):
+        postres = Categoria.objects.create(nombre='Postres')
+        tiramisu = Platillo.objects.create(nombre='Tiramisú', descripcion='', precio=Decimal('8.00'), categoria=postres)
+        self.crear_orden(cantidad=1)
+        orden = self.crear_orden(cantidad=2, estatus='pendiente')
+        OrdenDetalle.objects.create(orden=orden, platillo=self.platillo, cantidad=1, precio_unitario=Decimal('15.00'))
+        OrdenDetalle.objects.create(orden=orden, platillo=tiramisu, cantidad=3, precio_unitario=tiramisu.precio)
+        orden.refresh_from_db()
+        pago = Pago.objects.create(orden=orden, metodo_pago=self.efectivo, cantidad=orden.total)
+
+        # Líneas, y un upsert por cada tabla de acumulados
+        with self.assertNumQueries(6):
+            acumular_venta(orden, pago)
+
+        hoy = timezone.localdate()
+        self.assertEqual(
+            list(VentasDiariasPlatillo.objects.filter(fecha=hoy).order_by('platillo_id').values_list('cantidad', 'total')),
+            [(4, Decimal('60.00')), (3, Decimal('24.00'))],
+        )
+        self.assertEqual(VentasPlatillo.objects.get(platillo=tiramisu).cantidad, 3)
+        self.assertEqual(VentasDiariasCategoria.objects.get(fecha=hoy, categoria=self.categoria).cantidad, 4)
+        self.assertEqual(
+            VentasDiariasMetodoPago.objects.filter(fecha=hoy).values_list('total', 'ordenes').get(),
+            (Decimal('84.00'), 2),
+        )
+        self.assertEqual(VentasDiarias.objects.get(fecha=hoy).ordenes, 2)
+
+    def test_platillos_de_orden_pagada_no_se_modifican(self):
+        orden = self.crear_orden(cantidad=2)
+        detalle = orden.detalles.get()
+        self.client.force_login(self.usuario)
+
+        editar = self.client.post(reverse('ordenes:ordenes_detalle_update', args=[detalle.id]), {
+            'platillo': self.platillo.id, 'cantidad': 5, 'notas': '', 'orden_id': orden.id,
+        })
+        eliminar = self.client.post(reverse('ordenes:ordenes_detalle_delete', args=[detalle.id]))
+        agregar = self.client.post(reverse('ordenes:ordenes_detalle_list', args=[orden.id]), {
+            'platillo': self.platillo.id, 'cantidad': 1, 'notas': '', 'orden_id': orden.id,
+        })
+
+        self.assertEqual([editar.status_code, eliminar.status_code, agregar.status_code], [409, 409, 409])
+        self.assertEqual(list(orden.detalles.values_list('cantidad', flat=True)), [2])
+        self.assertEqual(VentasDiarias.objects.get().total, Decimal('30.00'))
+
+    def test_eliminar_orden_pagada_la_descuenta(self):
+        self.crear_orden(cantidad=2)
+        orden = self.crear_orden(cantidad=1)
+        self.crear_orden(cantidad=3, estatus='pendiente')
+        orden.delete()
+
+        def acumulados():
+            return [
+                list(modelo.objects.order_by('pk').values_list(*campos))
+                for modelo, campos in (
+                    (VentasDiarias, ('fecha', 'total', 'ordenes')),
+                    (VentasDiariasMetodoPago, ('fecha', 'metodo_pago', 'total', 'ordenes')),
+                    (VentasDiariasCategoria, ('fecha', 'categoria', 'total', 'cantidad')),
+                    (VentasDiariasPlatillo, ('fecha', 'platillo', 'total', 'cantidad')),
+                    (VentasPlatillo, ('platillo', 'total', 'cantidad')),
+                )
+            ]
+        incremental = acumulados()
+        hoy = timezone.localdate()
+        reconstruir_ventas(hoy, hoy)
+        reconstruir_ventas_platillo()
+
+        self.assertEqual(acumulados(), incremental)
+        self.assertEqual(incremental[0][0][1:], (Decimal('30.00'), 1))
+
+
+class MasVendidosTests(DatosOrdenesMixin, TestCase):
+    def test_ventanas_y_reconstruccion(self):
+        hoy = timezone.localdate()
+        refresco = Platillo.objects.create(nombre='Refresco', descripcion='', precio=Decimal('2.50'), categoria=self.categoria)
+        self.crear_orden(cantidad=8, fecha_hora=timezone.now() - timedelta(days=10))
+        self.crear_orden(cantidad=1)
+        self.crear_orden(cantidad=5, platillo=refresco)
+        self.crear_orden(cantidad=3, estatus='pendiente', platillo=refresco)
+
+        def top(ventana):
+            return [(fila['platillo_id'], fila['cantidad']) for fila in mas_vendidos(ventana, hoy=hoy)]
+
+        esperado = {
+            'hoy': [(refresco.id, 5), (self.platillo.id, 1)],
+            '7d': [(refresco.id, 5), (self.platillo.id, 1)],
+            '30d': [(self.platillo.id, 9), (refresco.id, 5)],
+            'todo': [(self.platillo.id, 9), (refresco.id, 5)],
+        }
+        self.assertEqual({ventana: top(ventana) for ventana in esperado}, esperado)
+        self.assertEqual(mas_vendidos('todo')[0]['total'], Decimal('135.00'))
+
+        reconstruir_ventas(hoy - timedelta(days=30), hoy)
+        reconstruir_ventas_platillo()
+        self.assertEqual({ventana: top(ventana) for ventana in esperado}, esperado)
+
+    def test_top_historico_es_una_lectura(self):
+        self.crear_orden(cantidad=2)
+        with self.assertNumQueries(1):
+            mas_vendidos('todo', limite=5)
+
+
+class ExportacionCSVTests(DatosOrdenesMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.crear_orden(cantidad=2)
+        self.crear_orden(cantidad=1, fecha_hora=timezone.now() - timedelta(days=40))
+        self.crear_orden(estatus='pendiente')
+
+    def test_detalles_en_streaming_con_filtro(self):
+        self.client.force_login(self.usuario)
+        desde = (timezone.localdate() - timedelta(days=7)).isoformat()
+        response = self.client.get(reverse('ordenes:exportar_csv', args=['detalles']), {'desde': desde})
+
+        self.assertTrue(response.streaming)
+        lineas = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lineas[0].split(',')[:5], ['detalle', 'orden', 'fecha_hora', 'estatus', 'platillo'])
+        self.assertEqual([linea.split(',')[4] for linea in lineas[1:]], ['Margherita', 'Margherita'])
+        self.assertEqual(self.client.get(reverse('ordenes:exportar_csv', args=['pagos']), {'hasta': 'ayer'}).status_code, 400)
+
+    def test_lista_de_pagos_sin_consulta_por_fila(self):
+        self.client.force_login(self.usuario)
+        # Sesión, usuario, conteo del paginador y la página con su método de pago
+        with self.assertNumQueries(4):
+            response = self.client.get(reverse('ordenes:pagos_list'))
+        self.assertEqual(len(response.context['pagos']), 2)
+
+    async def test_asgi_no_consume_todo_antes_de_enviar(self):
+        await self.async_client.aforce_login(self.usuario)
+        response = await self.async_client.get(reverse('ordenes:exportar_csv', args=['pagos']))
+
+        self.assertTrue(response.is_async)
+        contenido = b''.join([bloque async for bloque in response.streaming_content]).decode()
+        self.assertEqual(len(contenido.splitlines()), 3)  # Encabezado y dos pagos
+        self.assertIn('Efectivo', contenido)
+
+
+class PaginacionCursorTests(DatosOrdenesMixin, TestCase):
+    def test_recorre_todas_las_ordenes_con_empates(self):
+        momento = timezone.now()
+        ids = [self.crear_orden(estatus='pendiente', fecha_hora=momento).id for _ in range(5)]
+        ids.append(self.crear_orden(estatus='pendiente', fecha_hora=momento - timedelta(hours=1)).id)
+
+        vistos, cursor = [], None
+        while True:
+            with self.assertNumQueries(1):
+                pagina, cursor = paginar_por_cursor(Orden.objects.all(), cursor, tamano=2)
+            vistos.extend(orden.id for orden in pagina)
+            if cursor is None:
+                break
+
+        self.assertEqual(vistos, sorted(ids[:5], reverse=True) + [ids[5]])
+
+    def test_lista_html_con_filtro(self):
+        self.crear_orden(estatus='pendiente')
+        self.crear_orden()
+        self.client.force_login(self.usuario)
+        response = self.client.get(reverse('ordenes:ordenes_list'), {'estatus': 'pagada', 'limite': 1})
+        self.assertEqual([orden.estatus for orden in response.context['ordenes']], ['pagada'])
+        self.assertNotIn('siguiente_url', response.context)
+
+
+class CapturaLineasTests(DatosOrdenesMixin, TestCase):
+    def test_captura_varias_lineas_en_un_envio(self):
+        orden = self.crear_orden(estatus='pendiente')
+        refresco = Platillo.objects.create(nombre='Refresco', descripcion='', precio=Decimal('2.50'), categoria=self.categoria)
+        datos = {
+            'lineas-TOTAL_FORMS': '3', 'lineas-INITIAL_FORMS': '0',
+            'lineas-0-platillo': self.platillo.id, 'lineas-0-cantidad': '2', 'lineas-0-notas': 'sin cebolla',
+            'lineas-1-platillo': refresco.id, 'lineas-1-cantidad': '4', 'lineas-1-notas': '',
+            'lineas-2-platillo': '', 'lineas-2-cantidad': '1', 'lineas-2-notas': '',
+        }
+        self.client.force_login(self.usuario)
+        url = reverse('ordenes:ordenes_detalle_list', args=[orden.id])
+        obtener_catalogo()  # Refresco cambió la versión del catálogo
+
+        # Sesión, usuario, orden, savepoint, UPDATE condicional de la orden pendiente,
+        # bulk_create, total, release; los precios salen del catálogo
+        with self.assertNumQueries(8):
+            response = self.client.post(url, datos)
+
+        self.assertRedirects(response, url)
+        orden.refresh_from_db()
+        self.assertEqual((orden.num_detalles, orden.total), (3, Decimal('55.00')))
+
+    def test_linea_va_a_la_orden_de_la_url(self):
+        pendiente = self.crear_orden(estatus='pendiente')
+        pagada = self.crear_orden(cantidad=2)
+        self.client.force_login(self.usuario)
+        response = self.client.post(reverse('ordenes:ordenes_detalle_list', args=[pendiente.id]), {
+            'platillo': self.platillo.id, 'cantidad': 1, 'notas': '', 'orden_id': pagada.id,
+        })
+
+        self.assertRedirects(response, reverse('ordenes:ordenes_detalle_list', args=[pendiente.id]))
+        self.assertEqual(pendiente.detalles.count(), 2)
+        self.assertEqual(pagada.detalles.count(), 1)
+        self.assertEqual(VentasDiarias.objects.get().total, Decimal('30.00'))
+
+    def test_orden_inexistente_responde_404(self):
+        self.client.force_login(self.usuario)
+        url = reverse('ordenes:ordenes_detalle_list', args=[999999])
+        self.assertEqual(self.client.get(url).status_code, 404)
+        self.assertEqual(self.client.post(url, {'platillo': self.platillo.id, 'cantidad': 1}).status_code, 404)
+
+    def test_orden_cobrada_durante_la_captura_responde_409(self):
+        orden = self.crear_orden(estatus='pendiente')
+        # La vista leyó la orden pendiente; otra petición la cobra antes de guardar las líneas
+        leida = Orden.objects.get(pk=orden.pk)
+        Orden.objects.filter(pk=orden.pk).update(estatus='pagada')
+        self.client.force_login(self.usuario)
+        with mock.patch('apps.ordenes.views.get_object_or_404', return_value=leida):
+            response = self.client.post(reverse('ordenes:ordenes_detalle_list', args=[orden.id]), {
+                'platillo': self.platillo.id, 'cantidad': 1, 'notas': '',
+            })
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(orden.detalles.count(), 1)
+
+    def test_editar_linea_redirige_a_la_orden(self):
+        orden = self.crear_orden(estatus='pendiente')
+        detalle = orden.detalles.get()
+        self.client.force_login(self.usuario)
+        response = self.client.post(reverse('ordenes:ordenes_detalle_update', args=[detalle.id]), {
+            'platillo': self.platillo.id, 'cantidad': 3, 'notas': 'bien cocida', 'orden_id': orden.id,
+        })
+
+        url = reverse('ordenes:ordenes_detalle_list', args=[orden.id])
+        self.assertRedirects(response, url)
+        self.assertIn('formset', self.client.get(url).context)
+        orden.refresh_from_db()
+        self.assertEqual(orden.total, Decimal('45.00'))
+
+    def test_lineas_invalidas_no_guardan_nada(self):
+        orden = self.crear_orden(estatus='pendiente')
+        datos = {
+            'lineas-TOTAL_FORMS': '2', 'lineas-INITIAL_FORMS': '0',
+            'lineas-0-platillo': self.platillo.id, 'lineas-0-cantidad': '2',
+            'lineas-1-platillo': self.platillo.id, 'lineas-1-cantidad': '0',
+        }
+        self.client.force_login(self.usuario)
+        response = self.client.post(reverse('ordenes:ordenes_detalle_list', args=[orden.id]), datos)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(orden.detalles.count(), 1)
+
+
+class ReferenciasTests(DatosOrdenesMixin, TestCase):
+    def test_abrir_y_pagar_sin_consultar_referencias(self):
+        self.client.force_login(self.usuario)
+        with CaptureQueriesContext(connection) as consultas:
+            self.client.post(reverse('ordenes:ordenes_create'), {'mesa': self.mesa.id, 'empleado': self.usuario.id})
+            orden = Orden.objects.get(mesa=self.mesa)
+            self.client.post(reverse('ordenes:ordenes_pagar', args=[orden.id]), {
+                'orden': orden.id, 'metodo_pago': self.efectivo.id, 'cantidad': '0.00',
+            })
+
+        self.assertEqual(Orden.objects.get(pk=orden.pk).estatus, 'pagada')
+        tablas = ' '.join(consulta['sql'] for consulta in consultas.captured_queries if consulta['sql'].startswith('SELECT'))
+        self.assertNotIn('ordenes_mesaestado', tablas)
+        self.assertNotIn('ordenes_metodopago', tablas)
+
+    def test_estado_faltante_falla_con_mensaje_claro(self):
+        self.ocupada.delete()
+        with self.assertRaisesMessage(ImproperlyConfigured, 'Ocupada'):
+            obtener_referencias().ocupada
+        # El arranque de gunicorn falla en lugar de esperar a la primera orden
+        with self.assertRaisesMessage(ImproperlyConfigured, 'Faltan estados de mesa requeridos: Ocupada'):
+            calentar()
+
+    def test_metodo_pago_se_valida_contra_el_registro(self):
+        orden = self.crear_orden(estatus='pendiente')
+        form = PagoForm({'orden': orden.id, 'metodo_pago': 999, 'cantidad': '15.00'})
+        self.assertIn('metodo_pago', form.errors)
+
+        form = PagoForm({'orden': orden.id, 'metodo_pago': self.efectivo.id, 'cantidad': '15.00'})
+        self.assertTrue(form.is_valid())
+        self.assertEqual(form.save(commit=False).metodo_pago, self.efectivo)
+        self.assertEqual(list(form.fields), ['orden', 'metodo_pago', 'cantidad'])
+
+
+class EstadosConcurrentesTests(DatosOrdenesMixin, TestCase):
+    def test_mesa_ganada_por_otro_mesero_responde_409(self):
+        self.client.force_login(self.usuario)
+        datos = {'mesa': self.mesa.id, 'empleado': self.usuario.id}
+        # Otro mesero ocupa la mesa entre la validación del formulario y el guardado
+        def otro_mesero_primero(mesa_id):
+            Mesa.objects.filter(pk=mesa_id).update(estado=self.ocupada)
+            ocupar_mesa(mesa_id)
+
+        with mock.patch('apps.ordenes.forms.ocupar_mesa', side_effect=otro_mesero_primero):
+            response = self.client.post(reverse('ordenes:ordenes_create'), datos)
+
+        self.assertEqual(response.status_code, 409)
+        self.assertFalse(Orden.objects.exists())
+
+    def test_pago_duplicado_responde_409(self):
+        orden = self.crear_orden(cantidad=2, estatus='pendiente')
+        Mesa.objects.filter(pk=self.mesa.pk).update(estado=self.ocupada)
+        self.client.force_login(self.usuario)
+        url = reverse('ordenes:ordenes_pagar', args=[orden.id])
+        datos = {'orden': orden.id, 'metodo_pago': self.efectivo.id, 'cantidad': '30.00'}
+
+        self.assertEqual(self.client.post(url, datos).status_code, 302)
+        response = self.client.post(url, datos)
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(Pago.objects.filter(orden=orden).count(), 1)
+        self.assertEqual(VentasDiarias.objects.get().ordenes, 1)
+        self.assertEqual(Mesa.objects.get(pk=self.mesa.pk).estado, self.disponible)
+
+
+class ReciboOrdenPagadaTests(DatosOrdenesMixin, TestCase):
+    def test_recibo_desde_cache(self):
+        orden = self.crear_orden(cantidad=2)
+        self.client.force_login(self.usuario)
+        url = reverse('ordenes:ordenes_pagar', args=[orden.id])
+        self.client.get(url)
+
+        with self.assertNumQueries(2):  # Solo sesión y usuario
+            response = self.client.get(url)
+        self.assertEqual(response.context['total'], Decimal('30.00'))
+        self.assertNotIn('form', response.context)
+        self.assertContains(response, 'Margherita')
+        self.assertEqual(response['Cache-Control'], 'private, max-age=300')
+
+        with self.assertNumQueries(2):
+            response = self.client.get(url, headers={'If-None-Match': response['ETag']})
+        self.assertEqual(response.status_code, 304)
+
+    def test_recibo_de_orden_pendiente_no_se_guarda_en_el_navegador(self):
+        orden = self.crear_orden(estatus='pendiente')
+        self.client.force_login(self.usuario)
+        response = self.client.get(reverse('ordenes:ordenes_pagar', args=[orden.id]))
+        self.assertIn('form', response.context)
+        self.assertNotIn('ETag', response)
+
+
+class ExplicarConsultasTests(TestCase):
+    def test_consultas_frecuentes_usan_indices(self):
+        salida = StringIO()
+        call_command('explicar_consultas', estricto=True, stdout=salida)
+        self.assertIn('Ninguna consulta recorre tablas completas', salida.getvalue())
+
+    def test_recorrido_completo_termina_con_error(self):
+        consultas = [('Detalles por notas', OrdenDetalle.objects.filter(notas='sin cebolla'))]
+        with mock.patch(
+            'apps.ordenes.management.commands.explicar_consultas.consultas_frecuentes', return_value=consultas
+        ):
+            salida = StringIO()
+            call_command('explicar_consultas', stdout=salida)
+            self.assertIn('Recorrido completo de: ordenes_ordendetalle', salida.getvalue())
+            with self.assertRaisesMessage(CommandError, 'Detalles por notas'):
+                call_command('explicar_consultas', estricto=True, stdout=StringIO())
+
+
+class DatosSinteticosTests(DatosOrdenesMixin, TestCase):
+    def test_catalogo_pequeno_y_meseros_reales(self):
+        # El catálogo existente tiene un solo platillo y ya hay un usuario real 'mesero'
+        rng = random.Random(1)
+        asegurar_referencias(rng, mesas=2, empleados=2)
+        platillos, mesas, empleados, metodos = cargar_referencias()
+        self.assertEqual(len(empleados), 2)
+        self.assertNotIn(self.usuario, empleados)
+
+        creadas = generar_ordenes(rng, [timezone.localdate()], 5, mesas, empleados, platillos, metodos)
+        self.assertEqual(creadas, 5)
+        self.assertFalse(Orden.objects.filter(empleado=self.usuario).exists())
+        self.assertEqual(set(Orden.objects.values_list('num_detalles', flat=True)), {1})
+
+
+class MetricasTests(DatosOrdenesMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        registro.limpiar()
+
+    @staticmethod
+    def server_timing(response):
+        return {
+            nombre: dict(parametro.split('=', 1) for parametro in parametros)
+            for nombre, *parametros in (
+                [parte.strip() for parte in metrica.split(';')] for metrica in response['Server-Timing'].split(',')
+            )
+        }
+
+    def test_server_timing_con_consultas_y_plantillas(self):
+        self.crear_orden()
+        self.client.force_login(self.usuario)
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.get(reverse('ordenes:ordenes_list'))
+
+        metricas = self.server_timing(response)
+        self.assertEqual(metricas['db']['desc'], f'"{len(consultas)} consultas"')
+        self.assertGreater(float(metricas['db']['dur']), 0)
+        self.assertGreater(float(metricas['tpl']['dur']), 0)
+        self.assertGreaterEqual(float(metricas['total']['dur']), float(metricas['db']['dur']))
+
+        response = self.client.get(reverse('api:ultimas_ordenes'))
+        self.assertEqual(float(self.server_timing(response)['tpl']['dur']), 0)
+
+    def test_percentiles_por_vista(self):
+        registro_prueba = RegistroMetricas(muestras=4)
+        for total in (5, 1, 4, 2, 3):
+            medicion = Medicion()
+            medicion.consultas = total
+            registro_prueba.agregar('vista', total / 1000, medicion)
+
+        resumen = registro_prueba.resumen()['vista']
+        self.assertEqual(resumen['muestras'], 4)  # La primera muestra salió de la ventana
+        self.assertEqual(resumen['total'], {'p50': 3.0, 'p95': 4.0, 'p99': 4.0})
+        self.assertEqual(resumen['consultas'], {'p50': 3, 'p95': 4, 'p99': 4})
+
+    def test_metricas_solo_para_staff(self):
+        url = reverse('metricas')
+        self.assertEqual(self.client.get(url).status_code, 302)
+        self.client.force_login(self.usuario)
+        self.assertEqual(self.client.get(url).status_code, 302)
+
+        self.usuario.is_staff = True
+        self.usuario.save()
+        self.client.get(reverse('ordenes:ordenes_list'))
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['ordenes:ordenes_list']['muestras'], 1)
+
+
+class EventosTests(TestCase):
+    async def test_reparte_a_todas_las_colas_y_descarta_el_mas_antiguo(self):
+        broker = Broker(tamano_cola=2)
+        colas = [broker.suscribir() for _ in range(3)]
+        for numero in range(3):
+            broker.publicar({'tipo': 'orden', 'id': numero})
+        await asyncio.sleep(0)
+
+        for cola in colas:
+            self.assertEqual([cola.get_nowait()['id'] for _ in range(cola.qsize())], [1, 2])
+
+    async def test_desconectar_cancela_la_suscripcion(self):
+        cola = broker.suscribir()
+        stream = EventosOrdenesView().stream(cola)
+        self.assertTrue(broker.hay_suscriptores)
+
+        self.assertEqual(await anext(stream), 'retry: 3000\n\n')
+        broker.publicar({'tipo': 'orden', 'id': 1})
+        self.assertTrue((await anext(stream)).startswith('event: orden\n'))
+        await stream.aclose()
+        self.assertFalse(broker.hay_suscriptores)
+
+    def test_publica_solo_al_confirmar(self):
+        with mock.patch.object(Broker, 'hay_suscriptores', new_callable=mock.PropertyMock, return_value=True), \
+                mock.patch.object(broker, 'publicar') as publicar:
+            with self.captureOnCommitCallbacks(execute=True):
+                with self.assertRaises(RuntimeError), transaction.atomic():
+                    publicar_al_confirmar({'tipo': 'orden', 'id': 1})
+                    raise RuntimeError
+                publicar_al_confirmar({'tipo': 'orden', 'id': 2})
+                publicar.assert_not_called()
+
+        publicar.assert_called_once_with({'tipo': 'orden', 'id': 2})
+
+    def test_sin_asgi_responde_501(self):
+        usuario = AppUser.objects.create_user(username='cocina', password='secreto123')
+        self.client.force_login(usuario)
+        self.assertEqual(self.client.get(reverse('ordenes:ordenes_eventos')).status_code, 501)
+
+
+class ArchivoOrdenesTests(DatosOrdenesMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.vieja = self.crear_orden(cantidad=3, fecha_hora=timezone.now() - timedelta(days=400))
+        self.vieja_pendiente = self.crear_orden(estatus='pendiente', fecha_hora=timezone.now() - timedelta(days=400))
+        self.reciente = self.crear_orden(cantidad=1)
+
+    def test_mueve_solo_pagadas_viejas_conservando_ids(self):
+        acumulados = list(VentasDiarias.objects.order_by('fecha').values_list('fecha', 'total', 'ordenes'))
+        self.assertEqual(archivar_lote(fecha_corte(365), tamano=10), 1)
+        self.assertEqual(archivar_lote(fecha_corte(365), tamano=10), 0)
+
+        self.assertFalse(Orden.objects.filter(pk=self.vieja.pk).exists())
+        self.assertFalse(OrdenDetalle.objects.filter(orden_id=self.vieja.pk).exists())
+        archivada = OrdenArchivada.objects.get(pk=self.vieja.pk)
+        self.assertEqual((archivada.total, archivada.detalles.get().cantidad), (Decimal('45.00'), 3))
+        self.assertEqual(PagoArchivado.objects.get(orden=archivada).cantidad, Decimal('45.00'))
+        self.assertTrue(Orden.objects.filter(pk=self.vieja_pendiente.pk).exists())
+        # Las órdenes archivadas siguen contando en los acumulados
+        self.assertEqual(list(VentasDiarias.objects.order_by('fecha').values_list('fecha', 'total', 'ordenes')), acumulados)
+
+    def test_listas_con_rango_de_fechas_incluyen_archivo(self):
+        archivar_lote(fecha_corte(365))
+        self.client.force_login(self.usuario)
+        desde = (timezone.localdate() - timedelta(days=500)).isoformat()
+        todas = [self.reciente.pk, self.vieja_pendiente.pk, self.vieja.pk]
+
+        response = self.client.get(reverse('ordenes:ordenes_list'), {'desde': desde})
+        self.assertEqual([orden.pk for orden in response.context['ordenes']], todas)
+        self.assertNotContains(response, reverse('ordenes:ordenes_detalle_list', args=[self.vieja.pk]))
+        for nombre in ('api:ultimas_ordenes', 'api:ultimas_ordenes_async'):
+            response = self.client.get(reverse(nombre), {'desde': desde})
+            self.assertEqual([orden['id'] for orden in response.json()], todas)
+
+        # Página a página, el cursor recorre las dos tablas
+        vistas = []
+        response = self.client.get(reverse('api:ultimas_ordenes'), {'desde': desde, 'limite': 1})
+        while True:
+            vistas += [orden['id'] for orden in response.json()]
+            if 'Link' not in response:
+                break
+            response = self.client.get(response['Link'][1:response['Link'].index('>')])
+        self.assertEqual(vistas, todas)
+
+        # Sin fechas la lista es operativa: solo tablas vivas
+        response = self.client.get(reverse('api:ultimas_ordenes'))
+        self.assertEqual([orden['id'] for orden in response.json()], [self.reciente.pk, self.vieja_pendiente.pk])
+        response = self.client.get(reverse('api:ultimas_ordenes'), {'desde': desde, 'estatus': 'pendiente'})
+        self.assertEqual([orden['id'] for orden in response.json()], [self.vieja_pendiente.pk])
+
+    def test_detalle_y_recibo_de_orden_archivada(self):
+        self.client.force_login(self.usuario)
+        api = self.client.get(reverse('api:orden_detail', args=[self.vieja.pk])).json()
+        archivar_lote(fecha_corte(365))
+
+        # El caché de la API sobrevive al archivo; sin él, se lee del archivo igual
+        cache.clear()
+        self.assertEqual(self.client.get(reverse('api:orden_detail', args=[self.vieja.pk])).json(), api)
+        response = self.client.get(reverse('ordenes:ordenes_pagar', args=[self.vieja.pk]))
+        self.assertContains(response, 'Orden pagada')
+        self.assertEqual(response.context['total'], Decimal('45.00'))
+        self.assertEqual(self.client.get(reverse('ordenes:ordenes_pagar', args=[999999])).status_code, 404)
+
+    def test_reconstruir_y_exportar_incluyen_archivo(self):
+        hoy = timezone.localdate()
+        desde = hoy - timedelta(days=500)
+        reconstruir_ventas(desde, hoy)
+        antes = list(VentasDiariasPlatillo.objects.order_by('fecha').values_list('fecha', 'total', 'cantidad'))
+        exportadas = list(filas_csv('ordenes', desde))
+
+        archivar_lote(fecha_corte(365))
+        reconstruir_ventas(desde, hoy)
+
+        self.assertEqual(list(VentasDiariasPlatillo.objects.order_by('fecha').values_list('fecha', 'total', 'cantidad')), antes)
+        self.assertEqual(list(filas_csv('ordenes', desde)), exportadas)
+        self.assertEqual(len(list(filas_csv('ordenes', hoy))), 2)  # Encabezado y la reciente; no lee el archivo
+
+
+@override_settings(DATABASE_REPLICA='replica')
+class ReplicaRouterTests(TransactionTestCase):
+    """Decisiones del router sin consultar: la base de pruebas no tiene réplica."""
+    def pedir(self, vista, metodo='get', cookies=None):
+        request = getattr(RequestFactory(), metodo)('/')
+        request.COOKIES.update(cookies or {})
+
+        def get_response(request):
+            return middleware.process_view(request, vista, (), {}) or vista(request)
+        middleware = ReplicaMiddleware(get_response)
+        return middleware(request)
+
+    @staticmethod
+    def base_de_lectura(request):
+        return HttpResponse(router.db_for_read(Orden))
+
+    def test_solo_vistas_marcadas_leen_de_la_replica(self):
+        marcada = lectura_en_replica(lambda request: self.base_de_lectura(request))
+        self.assertEqual(self.pedir(marcada).content, b'replica')
+        self.assertEqual(self.pedir(self.base_de_lectura).content, b'default')
+        self.assertEqual(self.pedir(marcada, metodo='post').content, b'default')
+        with override_settings(DATABASE_REPLICA=None):
+            self.assertEqual(self.pedir(marcada).content, b'default')
+
+    def test_lee_lo_propio_despues_de_escribir(self):
+        @lectura_en_replica
+        def escribe(request):
+            router.db_for_write(Orden)
+            return self.base_de_lectura(request)
+
+        response = self.pedir(escribe)
+        self.assertEqual(response.content, b'default')
+        self.assertEqual(response.cookies[COOKIE_ESCRITURA]['max-age'], 10)
+
+        marcada = lectura_en_replica(lambda request: self.base_de_lectura(request))
+        self.assertEqual(self.pedir(marcada, cookies={COOKIE_ESCRITURA: '1'}).content, b'default')
+        self.assertNotIn(COOKIE_ESCRITURA, self.pedir(marcada).cookies)
+
+    def test_transaccion_en_el_primario_lee_del_primario(self):
+        @lectura_en_replica
+        def en_transaccion(request):
+            with transaction.atomic():
+                return self.base_de_lectura(request)
+        self.assertEqual(self.pedir(en_transaccion).content, b'default')
+
+    def test_exportacion_lee_de_la_replica_despues_del_middleware(self):
+        exportar = lectura_en_replica(lambda request: respuesta_csv(request, 'detalles'))
+        with mock.patch.object(QuerySet, 'iterator', autospec=True, return_value=iter([])) as iterator:
+            b''.join(self.pedir(exportar).streaming_content)
+        self.assertEqual([llamada.args[0].db for llamada in iterator.call_args_list], ['replica'])
+
+    def test_vistas_de_lectura_marcadas(self):
+        marcadas = ['index_user', 'api:ventas_diarias', 'api:orden_detail', 'api:orden_detail_async', 'ordenes:pagos_list']
+        for nombre in marcadas:
+            args = [1] if 'detail' in nombre else []
+            vista = resolve(reverse(nombre, args=args)).func
+            self.assertTrue(getattr(vista, 'lectura_replica', False) or vista.view_class.lectura_replica, nombre)
+        self.assertFalse(hasattr(resolve(reverse('ordenes:ordenes_pagar', args=[1])).func.view_class, 'lectura_replica'))
+
+
+class EstaticosTests(TestCase):
+    def test_recolecta_solo_lo_referenciado_y_sirve_immutable(self):
+        with tempfile.TemporaryDirectory() as carpeta, override_settings(STATIC_ROOT=carpeta):
+            call_command('collectstatic', interactive=False, verbosity=0)
+            propios = sorted(
+                ruta.relative_to(carpeta).as_posix() for ruta in Path(carpeta).glob('[cj]s*/*') if ruta.suffix != '.gz'
+            )
+            self.assertEqual(len(propios), 2)
+            self.assertRegex(propios[0], r'^css/bootstrap\.min\.[0-9a-f]{12}\.css$')
+            self.assertRegex(propios[1], r'^js/bootstrap\.bundle\.min\.[0-9a-f]{12}\.js$')
+
+            url = static('css/bootstrap.min.css')
+            self.assertTrue(url.endswith(propios[0]))
+            response = self.client.get(url, headers={'Accept-Encoding': 'gzip'})
+            self.assertIn('immutable', response.headers['Cache-Control'])
+            self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+            # Un archivo que no se recolectó falla en producción y usa el nombre sin hash en desarrollo
+            with override_settings(ESTATICOS_ESTRICTOS=True), self.assertRaises(ValueError):
+                static('images/no-existe.png')
+            with override_settings(ESTATICOS_ESTRICTOS=False):
+                self.assertEqual(static('images/no-existe.png'), '/static/images/no-existe.png')
+
+    def test_plantillas_solo_usan_estaticos_existentes(self):
+        self.assertEqual(sorted(ruta for ruta in referencias_estaticas() if not finders.find(ruta)), [])
+
+    def test_construir_falla_si_falta_un_estatico(self):
+        comando = 'apps.ordenes.management.commands.construir_estaticos'
+        with mock.patch(f'{comando}.referencias_estaticas', return_value={'images/no-existe.png'}), \
+                self.assertRaisesMessage(CommandError, 'images/no-existe.png'):
+            call_command('construir_estaticos', stdout=StringIO())
+
+
+class ArranqueTests(DatosOrdenesMixin, TestCase):
+    def test_calentar_deja_el_catalogo_listo(self):
+        cache.clear()
+        tiempos = calentar()
+        self.assertEqual(list(tiempos), [nombre for nombre, _ in PASOS])
+        self.assertNotIn(None, tiempos.values())
+        with self.assertNumQueries(0):
+            obtener_catalogo()
+
+    def test_un_paso_que_falla_no_impide_arrancar(self):
+        with mock.patch('restaurante.arranque.reverse', side_effect=RuntimeError), self.assertLogs('restaurante.arranque'):
+            tiempos = calentar()
+        self.assertIsNone(tiempos['urls'])
+        self.assertIsNotNone(tiempos['plantillas'])
+
+    def test_agrupa_importaciones_por_paquete_y_app(self):
+        salida = (
+            'import time: self [us] | cumulative | imported package\n'
+            'import time:       100 |        100 |   django.utils\n'
+            'import time:        50 |        150 | django\n'
+            'import time:        30 |         30 |     apps.ordenes.models\n'
+            'import time:        20 |         50 |   apps.ordenes\n'
+            'import time:         5 |          5 | apps\n'
+            'import time:        40 |         40 | restaurante.settings\n'
+        )
+        self.assertEqual(
+            agrupar_importaciones(salida),
+            {'django': 150, 'apps.ordenes': 50, 'apps': 5, 'restaurante': 40},
+        )
+
+
+@skipUnless(connection.vendor == 'sqlite', 'El perfil solo se aplica a SQLite')
+class PerfilSQLiteTests(SimpleTestCase):
+    def test_cada_conexion_aplica_el_perfil(self):
+        # La base de pruebas está en memoria, donde WAL no aplica: se abre un archivo con las mismas opciones
+        with tempfile.TemporaryDirectory() as directorio:
+            conexion = type(connections['default'])(
+                {**connections['default'].settings_dict, 'NAME': str(Path(directorio) / 'perfil.sqlite3')}, alias='perfil'
+            )
+            try:
+                valores = {}
+                with conexion.cursor() as cursor:
+                    for pragma in ('journal_mode', 'busy_timeout', 'synchronous', 'cache_size'):
+                        cursor.execute(f'PRAGMA {pragma}')
+                        valores[pragma] = cursor.fetchone()[0]
+            finally:
+                conexion.close()
+
+        self.assertEqual(valores, {
+            'journal_mode': 'wal',
+            'busy_timeout': settings.SQLITE_TIMEOUT * 1000,
+            'synchronous': 1,  # NORMAL
+            'cache_size': -settings.SQLITE_CACHE_KB,
+        })
+        self.assertEqual(conexion.transaction_mode, 'IMMEDIATE')
+
+
+class ContencionMesasTests(TransactionTestCase):
+    meseros = 8
+    num_mesas = 30
+
+    def setUp(self):
+        disponible, _ = MesaEstado.objects.get_or_create(nombre='Disponible')
+        MesaEstado.objects.get_or_create(nombre='Ocupada')
+        self.mesas = [
+            mesa.pk for mesa in Mesa.objects.bulk_create(
+                Mesa(nombre=f'Mesa {numero}', capacidad=4, estado=disponible) for numero in range(self.num_mesas)
+            )
+        ]
+        obtener_referencias()
+
+    def test_cada_mesa_se_ocupa_una_sola_vez(self):
+        """
+        Varios meseros intentan ocupar todas las mesas a la vez; cada mesa tiene un solo ganador.
+        El throughput con meseros concurrentes (órdenes por minuto y conflictos de mesa) lo
+        reporta el comando benchmark_escrituras, que ocupa mesas con el mismo ocupar_mesa.
+        """
+        inicio = threading.Barrier(self.meseros)
+        ganadas, conflictos, errores = [], [], []
+
+        def mesero(semilla):
+            mesas = self.mesas[:]
+            random.Random(semilla).shuffle(mesas)
+            inicio.wait()
+            try:
+                for mesa_id in mesas:
+                    try:
+                        ocupar_mesa(mesa_id)
+                        ganadas.append(mesa_id)
+                    except MesaNoDisponible:
+                        conflictos.append(mesa_id)
+            except Exception as e:
+                errores.append(e)
+            finally:
+                connection.close()
+
+        hilos = [threading.Thread(target=mesero, args=(semilla,)) for semilla in range(self.meseros)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+
+        self.assertEqual(errores, [])
+        self.assertEqual(sorted(ganadas), sorted(self.mesas))
+        self.assertEqual(len(conflictos), self.num_mesas * (self.meseros - 1))
 
-# Create your tests here.
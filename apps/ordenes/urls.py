@@ -19,9 +19,11 @@ urlpatterns = [
     path('ordenes/<int:pk>/detalles/edit/', views.OrdenDetalleUpdateView.as_view(), name='ordenes_detalle_update'),
     path('ordenes/detalles/eliminar/<int:pk>/', views.OrdenDetalleDeleteView.as_view(), name='ordenes_detalle_delete'),
     path('ordenes/<int:orden_id>/pagar', views.OrdenPagarView.as_view(), name='ordenes_pagar'),
+    path('ordenes/eventos/', views.EventosOrdenesView.as_view(), name='ordenes_eventos'),
     path('metodos_pago/', views.MetodoPagoListView.as_view(), name='metodos_pago_list'),
     path('metodos_pago/nuevo/', views.MetodoPagoCreateView.as_view(), name='metodos_pago_create'),
     path('metodos_pago/editar/<int:pk>/', views.MetodoPagoUpdateView.as_view(), name='metodos_pago_edit'),
     path('metodos_pago/eliminar/<int:pk>/', views.MetodoPagoDeleteView.as_view(), name='metodos_pago_delete'),
     path('pagos/', views.PagoListView.as_view(), name='pagos_list'),
+    path('exportar/<str:tipo>.csv', views.ExportarCSVView.as_view(), name='exportar_csv'),
 ]
\ No newline at end of file
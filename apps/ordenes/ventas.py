@@ -0,0 +1,220 @@
+"""
+Mantenimiento de las tablas de acumulados diarios (VentasDiarias*) y del
+acumulado histórico por platillo (VentasPlatillo).
+
+OrdenPagarView llama a acumular_venta() dentro de la transacción del pago,
+y la señal pre_delete de Orden llama a descontar_venta() al eliminar una
+orden pagada. Los platillos de una orden pagada no se pueden editar (ver
+estados.exigir_pendiente), así que sus acumulados no cambian después.
+El comando reconstruir_ventas usa reconstruir_ventas() para rellenar o
+corregir un rango de fechas desde las órdenes pagadas (incluidas las
+archivadas, ver archivo.py), y después reconstruir_ventas_platillo() para
+el histórico. mas_vendidos() lee el top de platillos de estas tablas en
+lugar de agregar todos los detalles.
+"""
+from datetime import datetime, time, timedelta
+from django.db import connections, router
+from django.db.models import Count, DecimalField, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from .archivo import modelos_de_rango
+from .models import (
+    Orden, OrdenDetalle, Pago, VentasDiarias, VentasDiariasCategoria, VentasDiariasMetodoPago,
+    VentasDiariasPlatillo, VentasPlatillo,
+)
+
+
+def dia_de_venta(orden):
+    return timezone.localdate(orden.fecha_hora)
+
+
+def _inicio_del_dia(dia):
+    return timezone.make_aware(datetime.combine(dia, time.min))
+
+
+def _acumular(modelo, claves, incrementos, filas):
+    """
+    Suma a `modelo` las `filas` (tuplas con los valores de `claves` y luego
+    los de `incrementos`) en un solo INSERT ... ON CONFLICT DO UPDATE: crea
+    las filas que no existen y suma en la base a las que ya existen, así que
+    no se pierden incrementos concurrentes. bulk_create(update_conflicts=True)
+    reemplaza los valores en lugar de sumarlos, por eso el SQL va a mano.
+    """
+    if not filas:
+        return
+    conexion = connections[router.db_for_write(modelo)]
+    nombre = conexion.ops.quote_name
+    campos = [modelo._meta.get_field(campo) for campo in (*claves, *incrementos)]
+    tabla = nombre(modelo._meta.db_table)
+    columnas = [nombre(campo.column) for campo in campos]
+    fila_sql = f'({", ".join(["%s"] * len(campos))})'
+    sumas = ', '.join(f'{columna} = {tabla}.{columna} + excluded.{columna}' for columna in columnas[len(claves):])
+    sql = (
+        f'INSERT INTO {tabla} ({", ".join(columnas)}) VALUES {", ".join([fila_sql] * len(filas))} '
+        f'ON CONFLICT ({", ".join(columnas[:len(claves)])}) DO UPDATE SET {sumas}'
+    )
+    # Orden fijo de filas: dos pagos simultáneos bloquean las mismas filas en el mismo orden
+    parametros = [
+        campo.get_db_prep_save(valor, conexion)
+        for fila in sorted(filas) for campo, valor in zip(campos, fila)
+    ]
+    with conexion.cursor() as cursor:
+        cursor.execute(sql, parametros)
+
+
+def _aplicar_venta(orden, pagos, signo):
+    """
+    Suma (signo 1) o resta (signo -1) la orden y sus `pagos` en los acumulados
+    de su día: agrupa las líneas en memoria y hace un upsert por tabla.
+    """
+    fecha = dia_de_venta(orden)
+    por_platillo, por_categoria, por_metodo = {}, {}, {}
+    for platillo_id, categoria_id, cantidad, precio in OrdenDetalle.objects.filter(orden=orden).values_list(
+        'platillo_id', 'platillo__categoria_id', 'cantidad', 'precio_unitario'
+    ):
+        for acumulado, clave in ((por_platillo, platillo_id), (por_categoria, categoria_id)):
+            total, vendidos = acumulado.get(clave, (0, 0))
+            acumulado[clave] = (total + signo * cantidad * precio, vendidos + signo * cantidad)
+    for pago in pagos:
+        total, ordenes = por_metodo.get(pago.metodo_pago_id, (0, 0))
+        por_metodo[pago.metodo_pago_id] = (total + signo * pago.cantidad, ordenes + signo)
+
+    _acumular(VentasDiarias, ['fecha'], ['total', 'ordenes'], [(fecha, signo * orden.total, signo)])
+    _acumular(VentasDiariasMetodoPago, ['fecha', 'metodo_pago'], ['total', 'ordenes'], [
+        (fecha, metodo_id, total, ordenes) for metodo_id, (total, ordenes) in por_metodo.items()
+    ])
+    _acumular(VentasDiariasPlatillo, ['fecha', 'platillo'], ['total', 'cantidad'], [
+        (fecha, platillo_id, total, cantidad) for platillo_id, (total, cantidad) in por_platillo.items()
+    ])
+    _acumular(VentasPlatillo, ['platillo'], ['total', 'cantidad'], [
+        (platillo_id, total, cantidad) for platillo_id, (total, cantidad) in por_platillo.items()
+    ])
+    _acumular(VentasDiariasCategoria, ['fecha', 'categoria'], ['total', 'cantidad'], [
+        (fecha, categoria_id, total, cantidad) for categoria_id, (total, cantidad) in por_categoria.items()
+    ])
+
+
+def acumular_venta(orden, pago=None):
+    """Registra una orden recién pagada en los acumulados de su día."""
+    _aplicar_venta(orden, [] if pago is None else [pago], 1)
+
+
+def descontar_venta(orden):
+    """
+    Quita de los acumulados una orden pagada que se va a eliminar, con sus
+    pagos y detalles. Debe llamarse antes de borrarlos (ver signals.py).
+    """
+    _aplicar_venta(orden, list(Pago.objects.filter(orden=orden)), -1)
+
+
+def _sumar(acumulado, filas, claves, valores):
+    """Suma en `acumulado` los `valores` de cada fila agrupados por `claves` (filas de varias tablas)."""
+    for fila in filas:
+        clave = tuple(fila[campo] for campo in claves)
+        nuevos = [fila[campo] for campo in valores]
+        previos = acumulado.get(clave)
+        acumulado[clave] = nuevos if previos is None else [a + b for a, b in zip(previos, nuevos)]
+
+
+def reconstruir_ventas(desde, hasta):
+    """
+    Recalcula los acumulados de las fechas desde..hasta (inclusive) a partir
+    de las órdenes pagadas, vivas y archivadas. Debe llamarse dentro de una
+    transacción.
+    """
+    inicio, fin = _inicio_del_dia(desde), _inicio_del_dia(hasta + timedelta(days=1))
+    rango = {'orden__estatus': 'pagada', 'orden__fecha_hora__gte': inicio, 'orden__fecha_hora__lt': fin}
+    subtotal = Sum(F('cantidad') * F('precio_unitario'), output_field=DecimalField(max_digits=12, decimal_places=2))
+
+    VentasDiarias.objects.filter(fecha__range=(desde, hasta)).delete()
+    VentasDiariasMetodoPago.objects.filter(fecha__range=(desde, hasta)).delete()
+    VentasDiariasCategoria.objects.filter(fecha__range=(desde, hasta)).delete()
+    VentasDiariasPlatillo.objects.filter(fecha__range=(desde, hasta)).delete()
+
+    dias, por_metodo, por_categoria, por_platillo = {}, {}, {}, {}
+    for orden_modelo, detalle_modelo, pago_modelo in modelos_de_rango(desde):
+        _sumar(dias, orden_modelo.objects.filter(
+            estatus='pagada', fecha_hora__gte=inicio, fecha_hora__lt=fin,
+        ).annotate(dia=TruncDate('fecha_hora')).values('dia').annotate(
+            suma=Sum('total'), conteo=Count('id'),
+        ).order_by(), ['dia'], ['suma', 'conteo'])
+
+        _sumar(por_metodo, pago_modelo.objects.filter(**rango).annotate(
+            dia=TruncDate('orden__fecha_hora')
+        ).values('dia', 'metodo_pago_id').annotate(
+            suma=Sum('cantidad'), conteo=Count('orden', distinct=True),
+        ).order_by(), ['dia', 'metodo_pago_id'], ['suma', 'conteo'])
+
+        detalles = detalle_modelo.objects.filter(**rango).annotate(dia=TruncDate('orden__fecha_hora'))
+        _sumar(por_categoria, detalles.values('dia', 'platillo__categoria_id').annotate(
+            vendidos=Sum('cantidad'), subtotal=subtotal,
+        ).order_by(), ['dia', 'platillo__categoria_id'], ['subtotal', 'vendidos'])
+        _sumar(por_platillo, detalles.values('dia', 'platillo_id').annotate(
+            vendidos=Sum('cantidad'), subtotal=subtotal,
+        ).order_by(), ['dia', 'platillo_id'], ['subtotal', 'vendidos'])
+
+    VentasDiarias.objects.bulk_create(
+        VentasDiarias(fecha=dia, total=total, ordenes=ordenes)
+        for (dia,), (total, ordenes) in dias.items()
+    )
+    VentasDiariasMetodoPago.objects.bulk_create(
+        VentasDiariasMetodoPago(fecha=dia, metodo_pago_id=metodo_id, total=total, ordenes=ordenes)
+        for (dia, metodo_id), (total, ordenes) in por_metodo.items()
+    )
+    VentasDiariasCategoria.objects.bulk_create(
+        VentasDiariasCategoria(fecha=dia, categoria_id=categoria_id, total=total, cantidad=cantidad)
+        for (dia, categoria_id), (total, cantidad) in por_categoria.items()
+    )
+    VentasDiariasPlatillo.objects.bulk_create(
+        VentasDiariasPlatillo(fecha=dia, platillo_id=platillo_id, total=total, cantidad=cantidad)
+        for (dia, platillo_id), (total, cantidad) in por_platillo.items()
+    )
+
+
+def reconstruir_ventas_platillo():
+    """
+    Recalcula el acumulado histórico por platillo sumando VentasDiariasPlatillo.
+    Llamar después de reconstruir_ventas() sobre todo el historial.
+    """
+    VentasPlatillo.objects.all().delete()
+    VentasPlatillo.objects.bulk_create(
+        VentasPlatillo(platillo_id=fila['platillo_id'], total=fila['suma'], cantidad=fila['vendidos'])
+        for fila in VentasDiariasPlatillo.objects.values('platillo_id').annotate(
+            suma=Sum('total'), vendidos=Sum('cantidad'),
+        ).order_by()
+    )
+
+
+# Días hacia atrás (incluyendo hoy) de cada ventana del top de platillos; None es todo el historial
+VENTANAS = {'hoy': 0, '7d': 6, '30d': 29, 'todo': None}
+
+
+def consulta_mas_vendidos(ventana='todo', hoy=None):
+    """
+    QuerySet de tuplas (platillo_id, cantidad, total) ordenado por unidades.
+    'todo' y 'hoy' leen un índice ordenado; 7d y 30d suman como máximo 30
+    filas por platillo.
+    """
+    if ventana not in VENTANAS:
+        raise ValueError(f'Ventana inválida: {ventana}. Opciones: {", ".join(VENTANAS)}')
+    hoy = hoy or timezone.localdate()
+    dias = VENTANAS[ventana]
+    if dias is None:
+        return VentasPlatillo.objects.order_by('-cantidad', 'platillo_id').values_list('platillo_id', 'cantidad', 'total')
+    if dias == 0:
+        return VentasDiariasPlatillo.objects.filter(fecha=hoy).order_by(
+            '-cantidad', 'platillo_id'
+        ).values_list('platillo_id', 'cantidad', 'total')
+    return VentasDiariasPlatillo.objects.filter(
+        fecha__range=(hoy - timedelta(days=dias), hoy)
+    ).values('platillo_id').annotate(
+        vendidos=Sum('cantidad'), suma=Sum('total'),
+    ).order_by('-vendidos', 'platillo_id').values_list('platillo_id', 'vendidos', 'suma')
+
+
+def mas_vendidos(ventana='todo', limite=10, hoy=None):
+    """Top de platillos de la ventana como filas {'platillo_id', 'cantidad', 'total'}."""
+    return [
+        {'platillo_id': platillo_id, 'cantidad': cantidad, 'total': total}
+        for platillo_id, cantidad, total in consulta_mas_vendidos(ventana, hoy)[:limite]
+    ]
@@ -1,12 +1,28 @@
 # apps/ordenes/views.py
-from django.shortcuts import render, redirect
+import asyncio
+import json
+from datetime import date
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.core.exceptions import SuspiciousOperation
+from django.db import transaction
+from django.shortcuts import get_object_or_404, render, redirect
+from django.utils.cache import get_conditional_response
 from django.views.generic import ListView
 from django.views.generic.edit import CreateView, UpdateView, DeleteView
 from django.views import View
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db import transaction
-from .models import Mesa, MesaEstado, Orden, OrdenDetalle, MetodoPago, Pago
-from .forms import MesaEstadoForm, MesaForm, OrdenForm, OrdenDetalleForm, MetodoPagoForm, PagoForm
+from restaurante.replicas import lectura_en_replica
+from .models import Mesa, MesaEstado, Orden, OrdenArchivada, OrdenDetalle, MetodoPago, Pago
+from .archivo import archivo_de_filtros, buscar_orden
+from .eventos import broker
+from .exportacion import EXPORTACIONES, respuesta_csv
+from .pagadas import etag_orden_pagada, guardar_orden_pagada, obtener_orden_pagada
+from .estados import ConflictoEstado, exigir_pendiente, registrar_pago
+from .paginacion import CursorInvalido, filtrar_ordenes, paginar_por_cursor
+from .forms import MesaEstadoForm, MesaForm, OrdenForm, OrdenDetalleForm, OrdenDetalleLineaFormSet, MetodoPagoForm, PagoForm
 
 class MesaEstadoListView(LoginRequiredMixin, ListView):
     model = MesaEstado
@@ -56,7 +72,38 @@ class OrdenListView(LoginRequiredMixin, ListView):
     model = Orden
     template_name = 'ordenes/ordenes_list.html'
     context_object_name = 'ordenes'
-    ordering = ['-fecha_hora']
+
+    def get_queryset(self):
+        try:
+            return filtrar_ordenes(Orden.objects.select_related('mesa'), self.request.GET)
+        except CursorInvalido as e:
+            raise SuspiciousOperation(str(e))
+
+    def get_tamano_pagina(self):
+        try:
+            tamano = int(self.request.GET.get('limite', settings.ORDENES_POR_PAGINA))
+        except ValueError:
+            tamano = settings.ORDENES_POR_PAGINA
+        return max(1, min(tamano, settings.ORDENES_POR_PAGINA_MAX))
+
+    def get_context_data(self, **kwargs):
+        try:
+            ordenes, siguiente = paginar_por_cursor(
+                self.object_list, self.request.GET.get('cursor'), self.get_tamano_pagina(),
+                archivo_de_filtros(self.request.GET, OrdenArchivada.objects.select_related('mesa')),
+            )
+        except CursorInvalido as e:
+            raise SuspiciousOperation(str(e))
+
+        params = self.request.GET.copy()
+        params.pop('cursor', None)
+        context = super().get_context_data(object_list=ordenes, **kwargs)
+        context['filtros'] = params
+        context['primera_url'] = f'?{params.urlencode()}'
+        if siguiente:
+            params['cursor'] = siguiente
+            context['siguiente_url'] = f'?{params.urlencode()}'
+        return context
 
 class OrdenCreateView(LoginRequiredMixin, CreateView):
     model = Orden
@@ -69,99 +116,182 @@ class OrdenCreateView(LoginRequiredMixin, CreateView):
         initial['empleado'] = self.request.user
         return initial
 
+    def form_valid(self, form):
+        try:
+            return super().form_valid(form)
+        except ConflictoEstado as e:
+            form.add_error('mesa', str(e))
+            return self.render_to_response(self.get_context_data(form=form), status=409)
+
 class OrdenDetalleView(LoginRequiredMixin, ListView):
     model = OrdenDetalle
     template_name = 'ordenes/orden_detalle_list.html'
     context_object_name = 'orden_detalles'
+    formset_prefix = 'lineas'
+
+    def get_formset(self, data=None):
+        return OrdenDetalleLineaFormSet(data, prefix=self.formset_prefix)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['orden'] = Orden.objects.get(id=self.kwargs.get('orden_id'))
-        context['form'] = OrdenDetalleForm(initial={'orden_id': self.kwargs.get('orden_id')})
+        context['orden'] = get_object_or_404(Orden, id=self.kwargs.get('orden_id'))
+        context.setdefault('form', OrdenDetalleForm(initial={'orden_id': self.kwargs.get('orden_id')}))
+        context.setdefault('formset', self.get_formset())
         return context
 
     def get_queryset(self):
         orden_id = self.kwargs.get('orden_id')
-        return OrdenDetalle.objects.filter(orden__id=orden_id)
+        return OrdenDetalle.objects.filter(orden__id=orden_id).select_related('platillo')
 
     def post(self, request, *args, **kwargs):
-        form = OrdenDetalleForm(request.POST)
-        if form.is_valid():
-            orden_detalle = OrdenDetalle(
-                orden=Orden.objects.get(id=form.cleaned_data['orden_id']),
-                platillo=form.cleaned_data['platillo'],
-                cantidad=form.cleaned_data['cantidad'],
-                notas=form.cleaned_data['notas'],
-                precio_unitario=form.cleaned_data['platillo'].precio
+        # Las líneas van siempre a la orden de la URL, la misma que se revisa como pendiente
+        orden = get_object_or_404(Orden, id=self.kwargs.get('orden_id'))
+        if f'{self.formset_prefix}-TOTAL_FORMS' in request.POST:
+            formulario, nombre = self.get_formset(request.POST), 'formset'
+        else:
+            formulario, nombre = OrdenDetalleForm(request.POST), 'form'
+
+        self.object_list = self.get_queryset()
+        if not formulario.is_valid():
+            return self.render_to_response(self.get_context_data(**{nombre: formulario}))
+        try:
+            with transaction.atomic():
+                exigir_pendiente(orden)
+                self.guardar(formulario, orden)
+        except ConflictoEstado as e:
+            form = OrdenDetalleForm(request.POST)
+            form.add_error(None, str(e))
+            return self.render_to_response(self.get_context_data(form=form), status=409)
+        return redirect('ordenes:ordenes_detalle_list', orden_id=orden.pk)
+
+    def guardar(self, formulario, orden):
+        if isinstance(formulario, OrdenDetalleForm):
+            OrdenDetalle.objects.create(
+                orden=orden,
+                platillo=formulario.cleaned_data['platillo'],
+                cantidad=formulario.cleaned_data['cantidad'],
+                notas=formulario.cleaned_data['notas'],
+                precio_unitario=formulario.cleaned_data['platillo'].precio
             )
-            orden_detalle.save()
-            return self.get(request, *args, **kwargs)
         else:
-            return render(request, self.template_name, {'form': form, 'orden_detalles': self.get_queryset(), 'orden': Orden.objects.get(id=self.kwargs.get('orden_id'))})
+            formulario.save(orden)
 
 class OrdenDetalleUpdateView(LoginRequiredMixin, View):
     def get(self, request, pk):
         detalle = OrdenDetalle.objects.get(id=pk)
         form = OrdenDetalleForm(initial={
-            'platillo': detalle.platillo,
+            'platillo': detalle.platillo_id,
             'cantidad': detalle.cantidad,
             'notas': detalle.notas,
-            'orden_id': detalle.orden.id
+            'orden_id': detalle.orden_id
         })
         return render(request, 'ordenes/orden_detalle_edit_form.html', {'form': form, 'detalle': detalle})
 
     def post(self, request, pk):
-        detalle = OrdenDetalle.objects.get(id=pk)
+        detalle = OrdenDetalle.objects.select_related('orden').get(id=pk)
         form = OrdenDetalleForm(request.POST)
-        if form.is_valid():
-            detalle.platillo = form.cleaned_data['platillo']
-            detalle.cantidad = form.cleaned_data['cantidad']
-            detalle.notas = form.cleaned_data['notas']
-            detalle.precio_unitario = form.cleaned_data['platillo'].precio
-            detalle.save()
-            return render(request, 'ordenes/orden_detalle_list.html', {
-                'orden_detalles': OrdenDetalle.objects.filter(orden=detalle.orden),
-                'orden': detalle.orden,
-                'form': OrdenDetalleForm(initial={'orden_id': detalle.orden.id})
-            })
-        else:
+        if not form.is_valid():
             return render(request, 'ordenes/orden_detalle_edit_form.html', {'form': form, 'detalle': detalle})
+        try:
+            with transaction.atomic():
+                exigir_pendiente(detalle.orden)
+                detalle.platillo = form.cleaned_data['platillo']
+                detalle.cantidad = form.cleaned_data['cantidad']
+                detalle.notas = form.cleaned_data['notas']
+                detalle.precio_unitario = form.cleaned_data['platillo'].precio
+                detalle.save()
+        except ConflictoEstado as e:
+            form.add_error(None, str(e))
+            return render(request, 'ordenes/orden_detalle_edit_form.html', {'form': form, 'detalle': detalle}, status=409)
+        return redirect('ordenes:ordenes_detalle_list', orden_id=detalle.orden_id)
 
 class OrdenDetalleDeleteView(LoginRequiredMixin, DeleteView):
     model = OrdenDetalle
     template_name = 'ordenes/orden_detalle_confirm_delete.html'
 
+    def form_valid(self, form):
+        try:
+            with transaction.atomic():
+                exigir_pendiente(self.object.orden)
+                return super().form_valid(form)
+        except ConflictoEstado as e:
+            form.add_error(None, str(e))
+            return self.render_to_response(self.get_context_data(form=form), status=409)
+
     def get_success_url(self):
         return f'/ordenes/ordenes/{self.object.orden.id}/detalles/'
 
 class OrdenPagarView(LoginRequiredMixin, View):
     def get(self, request, orden_id):
-        orden = Orden.objects.get(id=orden_id)
-        detalles = OrdenDetalle.objects.filter(orden=orden)
-        total = sum(detalle.cantidad * detalle.precio_unitario for detalle in detalles)
-        
-        form = PagoForm(initial={'orden': orden, 'cantidad': total})
+        # El recibo de una orden pagada no cambia: se arma una vez y se sirve desde caché.
+        # Las órdenes archivadas solo tienen recibo, se buscan en el archivo
+        recibo = obtener_orden_pagada('recibo', orden_id)
+        if recibo is None:
+            orden = buscar_orden(orden_id)
+            if orden is None:
+                raise Http404('La orden no existe')
+            detalles = list(orden.detalles.select_related('platillo'))
+            recibo = guardar_orden_pagada('recibo', orden, {'orden': orden, 'detalles': detalles, 'total': orden.total})
+
+        orden = recibo['orden']
+        if orden.estatus != 'pagada':
+            context = dict(recibo, form=PagoForm(initial={'orden': orden, 'cantidad': recibo['total']}))
+            return render(request, 'ordenes/ordenes_pagar.html', context)
 
-        return render(request, 'ordenes/ordenes_pagar.html', {'orden': orden, 'detalles': detalles, 'total': total, 'form': form})
+        # El navegador guarda el recibo y lo revalida con el ETag, que incluye al usuario
+        # porque la página lleva su menú. max-age corto: una orden reabierta no se puede
+        # invalidar en el navegador, solo en el caché del servidor
+        etag = f'{etag_orden_pagada(orden)[:-1]}-u{request.user.pk}"'
+        response = get_conditional_response(request, etag=etag) or render(request, 'ordenes/ordenes_pagar.html', recibo)
+        response['ETag'] = etag
+        response['Cache-Control'] = f'private, max-age={settings.ORDENES_PAGADAS_MAX_AGE}'
+        return response
 
     def post(self, request, orden_id):
         form = PagoForm(request.POST)
         if form.is_valid():
-            with transaction.atomic():
-                pago = form.save(commit=False)
-                pago.orden = Orden.objects.get(id=orden_id)
-                pago.save()
+            orden = Orden.objects.get(id=orden_id)
+            try:
+                registrar_pago(orden, form.save(commit=False))
+            except ConflictoEstado as e:
+                form.add_error(None, str(e))
+                return render(request, 'ordenes/ordenes_pagar.html', {'orden': orden, 'form': form}, status=409)
+            return redirect('ordenes:ordenes_list')
+        return render(request, 'ordenes/ordenes_pagar.html', {'form': form})
 
-                orden = pago.orden
-                orden.estatus = 'pagada'
-                orden.save()
+class EventosOrdenesView(View):
+    """
+    Stream de Server-Sent Events con altas, cambios y bajas de detalles y
+    cambios de estatus de órdenes. Requiere un servidor ASGI (ver eventos.py):
+    bajo WSGI cada pantalla ocuparía un worker completo y solo vería los
+    eventos de ese proceso, así que responde 501.
+    """
+    latido = 15
 
-                mesa = orden.mesa
-                mesa.estado = MesaEstado.objects.get(nombre='Disponible')
-                mesa.save()
+    async def get(self, request):
+        if not isinstance(request, ASGIRequest):
+            return HttpResponse('Los eventos requieren servir la aplicación con ASGI', status=501)
+        usuario = await request.auser()
+        if not usuario.is_authenticated:
+            return HttpResponse(status=401)
 
-                return redirect('ordenes:ordenes_list')
-        return render(request, 'ordenes/ordenes_pagar.html', {'form': form})
+        response = StreamingHttpResponse(self.stream(broker.suscribir()), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    async def stream(self, cola):
+        try:
+            yield 'retry: 3000\n\n'
+            while True:
+                try:
+                    evento = await asyncio.wait_for(cola.get(), timeout=self.latido)
+                except asyncio.TimeoutError:
+                    yield ': latido\n\n'
+                    continue
+                yield f"event: {evento['tipo']}\ndata: {json.dumps(evento, cls=DjangoJSONEncoder)}\n\n"
+        finally:
+            broker.cancelar(cola)
 
 class MetodoPagoListView(LoginRequiredMixin, ListView):
     model = MetodoPago
@@ -185,7 +315,30 @@ class MetodoPagoDeleteView(LoginRequiredMixin, DeleteView):
     template_name = 'pagos/metodos_pago_confirm_delete.html'
     success_url = '/ordenes/metodos_pago/'    
 
+@lectura_en_replica
 class PagoListView(LoginRequiredMixin, ListView):
     model = Pago
     template_name = 'pagos/pagos_list.html'
     context_object_name = 'pagos'
+    paginate_by = 50
+
+    def get_queryset(self):
+        return Pago.objects.select_related('metodo_pago').order_by('-fecha_hora', '-id')
+
+@lectura_en_replica
+class ExportarCSVView(LoginRequiredMixin, View):
+    """
+    Descarga en streaming de órdenes, detalles o pagos en CSV. Parámetros
+    opcionales desde y hasta (YYYY-MM-DD, inclusivos).
+    """
+    def get(self, request, tipo):
+        if tipo not in EXPORTACIONES:
+            raise Http404('Exportación desconocida')
+        try:
+            desde, hasta = (
+                date.fromisoformat(request.GET[campo]) if request.GET.get(campo) else None
+                for campo in ('desde', 'hasta')
+            )
+        except ValueError:
+            raise SuspiciousOperation('Fecha inválida, use YYYY-MM-DD')
+        return respuesta_csv(request, tipo, desde, hasta)
@@ -3,4 +3,7 @@ from django.apps import AppConfig
 
 class PlatillosConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'apps.platillos'
\ No newline at end of file
+    name = 'apps.platillos'
+
+    def ready(self):
+        from . import checks, signals  # noqa: F401
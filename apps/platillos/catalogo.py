@@ -0,0 +1,59 @@
+"""
+Caché por worker del menú (Platillo y Categoria).
+
+Cada proceso guarda el catálogo completo en memoria junto con la versión con
+la que se cargó. La versión vive en el caché de Django y las señales de
+Platillo y Categoria la cambian en cada alta, edición o baja, así que el menú
+se consulta una vez por cambio y no una vez por request. Con varios workers el
+caché debe ser compartido (REDIS_URL); el check de checks.py lo exige.
+"""
+from django.db import DEFAULT_DB_ALIAS
+from restaurante.versiones import cambiar_version, obtener_version
+from .models import Categoria, Platillo
+
+CLAVE_VERSION = 'catalogo:version'
+
+_catalogo = None
+
+
+class Catalogo:
+    def __init__(self, version, categorias, platillos):
+        self.version = version
+        self.categorias = categorias
+        self.platillos = platillos
+        self.por_id = {platillo.id: platillo for platillo in platillos}
+        self._serializados = {}
+
+    def platillo(self, pk):
+        return self.por_id.get(pk)
+
+    def choices(self):
+        return [(platillo.id, platillo.nombre) for platillo in self.platillos]
+
+    def serializado(self, pk, serializer_class):
+        """Representación del platillo con serializer_class, calculada una vez por versión."""
+        clave = (serializer_class, pk)
+        if clave not in self._serializados:
+            self._serializados[clave] = serializer_class(self.por_id[pk]).data
+        return self._serializados[clave]
+
+
+def version_catalogo():
+    return obtener_version(CLAVE_VERSION)
+
+
+def obtener_catalogo():
+    global _catalogo
+    version = version_catalogo()
+    if _catalogo is None or _catalogo.version != version:
+        # Siempre del primario: una réplica atrasada dejaría el menú viejo guardado con la versión nueva
+        _catalogo = Catalogo(
+            version,
+            list(Categoria.objects.using(DEFAULT_DB_ALIAS).order_by('nombre')),
+            list(Platillo.objects.using(DEFAULT_DB_ALIAS).select_related('categoria').order_by('nombre')),
+        )
+    return _catalogo
+
+
+def invalidar_catalogo():
+    cambiar_version(CLAVE_VERSION)
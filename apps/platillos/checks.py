@@ -0,0 +1,37 @@
+"""
+El catálogo por worker (catalogo.py), el registro de referencias y la caché
+de órdenes pagadas de apps.ordenes se invalidan cambiando una versión o
+borrando una entrada en el caché default. Con LocMemCache cada proceso
+tiene su propio caché: el cambio solo lo ve el worker que lo hizo y los
+demás siguen sirviendo precios y estados viejos.
+"""
+from django.conf import settings
+from django.core import checks
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured
+
+MENSAJE = (
+    'Con {workers} workers el caché default debe compartirse entre procesos: con LocMemCache, '
+    'un cambio de precio o de estado solo lo ve el worker que lo hizo'
+)
+SUGERENCIA = 'Configure REDIS_URL o use WEB_CONCURRENCY=1'
+
+
+def cache_compartido():
+    return not isinstance(caches['default'], LocMemCache)
+
+
+def exigir_cache_compartido(workers):
+    """Falla si `workers` procesos atenderían con un caché local a cada uno."""
+    if workers > 1 and not cache_compartido():
+        raise ImproperlyConfigured(f'{MENSAJE.format(workers=workers)}. {SUGERENCIA}')
+
+
+@checks.register(checks.Tags.caches)
+def revisar_cache_compartido(app_configs, **kwargs):
+    if settings.WEB_CONCURRENCY > 1 and not cache_compartido():
+        return [checks.Error(
+            MENSAJE.format(workers=settings.WEB_CONCURRENCY), hint=SUGERENCIA, id='platillos.E001',
+        )]
+    return []
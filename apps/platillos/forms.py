@@ -1,4 +1,6 @@
 ﻿import django.forms as forms
+from django.utils.choices import CallableChoiceIterator
+from .catalogo import obtener_catalogo
 from .models import Categoria, Platillo
 
 class CategoriaForm(forms.ModelForm):
@@ -19,3 +21,33 @@ class PlatilloForm(forms.ModelForm):
             'precio': forms.NumberInput(attrs={'class': 'form-control', 'placeholder': 'Ingrese el precio del platillo'}),
             'categoria': forms.Select(attrs={'class': 'form-control'})
         }
+
+class PlatilloCatalogoField(forms.TypedChoiceField):
+    """
+    Selección de platillo servida desde el catálogo en memoria: no consulta
+    la base de datos para mostrar las opciones ni para validar, y retorna la
+    instancia de Platillo (con su precio vigente).
+    """
+    def __init__(self, **kwargs):
+        kwargs.setdefault('empty_value', None)
+        super().__init__(
+            choices=CallableChoiceIterator(lambda: [('', '---------'), *obtener_catalogo().choices()]),
+            coerce=self.a_platillo,
+            **kwargs,
+        )
+
+    @staticmethod
+    def a_platillo(valor):
+        platillo = obtener_catalogo().platillo(int(valor))
+        if platillo is None:
+            raise ValueError('Platillo inexistente')
+        return platillo
+
+    def valid_value(self, value):
+        try:
+            return obtener_catalogo().platillo(int(value)) is not None
+        except (TypeError, ValueError):
+            return False
+
+    def prepare_value(self, value):
+        return value.pk if isinstance(value, Platillo) else value
@@ -0,0 +1,11 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .catalogo import invalidar_catalogo
+from .models import Categoria, Platillo
+
+@receiver(post_save, sender=Platillo)
+@receiver(post_delete, sender=Platillo)
+@receiver(post_save, sender=Categoria)
+@receiver(post_delete, sender=Categoria)
+def cambiar_version_catalogo(sender, **kwargs):
+    invalidar_catalogo()
@@ -1,3 +1,83 @@
-from django.test import TestCase
+from decimal import Decimal
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from apps.accounts.models import AppUser
+from .catalogo import obtener_catalogo
+from .checks import exigir_cache_compartido, revisar_cache_compartido
+from .models import Categoria, Platillo
 
-# Create your tests here.
\ No newline at end of file
+
+class CatalogoTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = AppUser.objects.create_user(username='admin', password='secreto123')
+        cls.categoria = Categoria.objects.create(nombre='Pizzas')
+        cls.platillo = Platillo.objects.create(
+            nombre='Margherita', descripcion='', precio=Decimal('15.00'), categoria=cls.categoria
+        )
+
+    def test_catalogo_se_carga_una_vez_por_version(self):
+        obtener_catalogo()
+        with self.assertNumQueries(0):
+            catalogo = obtener_catalogo()
+        self.assertEqual(catalogo.platillo(self.platillo.id).categoria.nombre, 'Pizzas')
+
+    def test_edicion_desde_la_vista_invalida_el_catalogo(self):
+        version = obtener_catalogo().version
+        self.client.force_login(self.usuario)
+        self.client.post(reverse('platillos:platillos_edit', args=[self.platillo.id]), {
+            'nombre': 'Margherita', 'descripcion': 'Clásica', 'precio': '18.00', 'categoria': self.categoria.id,
+        })
+
+        catalogo = obtener_catalogo()
+        self.assertNotEqual(catalogo.version, version)
+        self.assertEqual(catalogo.platillo(self.platillo.id).precio, Decimal('18.00'))
+
+
+class FragmentosCatalogoTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = AppUser.objects.create_user(username='admin', password='secreto123')
+        cls.categoria = Categoria.objects.create(nombre='Pizzas')
+        Platillo.objects.create(nombre='Margherita', descripcion='', precio=Decimal('15.00'), categoria=cls.categoria)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.usuario)
+
+    def test_lista_y_menu_desde_cache_hasta_editar(self):
+        url = reverse('platillos:platillos_list')
+        self.client.get(url)
+        with self.assertNumQueries(2):  # Solo sesión y usuario
+            response = self.client.get(url)
+        self.assertContains(response, 'Margherita')
+        self.assertContains(response, '<span class="menu-badge">1</span>', count=2)
+
+        self.client.post(reverse('platillos:platillos_create'), {
+            'nombre': 'Pepperoni', 'descripcion': 'Picante', 'precio': '17.00', 'categoria': self.categoria.id,
+        })
+        response = self.client.get(url)
+        self.assertContains(response, 'Pepperoni')
+        self.assertContains(response, '<span class="menu-badge">2</span>')
+
+    def test_menu_marca_la_pagina_activa(self):
+        self.client.get(reverse('platillos:platillos_list'))
+        response = self.client.get(reverse('platillos:categoria_list'))
+        self.assertContains(response, '<a href="/platillos/categorias/" class="menu-link active">')
+        self.assertContains(response, '<a href="/platillos/platillos/" class="menu-link ">')
+
+
+class CacheCompartidoTests(SimpleTestCase):
+    def test_varios_workers_con_cache_local_es_error(self):
+        self.assertEqual(revisar_cache_compartido(None), [])
+        with override_settings(WEB_CONCURRENCY=4):
+            self.assertEqual([error.id for error in revisar_cache_compartido(None)], ['platillos.E001'])
+            with self.assertRaisesMessage(ImproperlyConfigured, 'REDIS_URL'):
+                exigir_cache_compartido(4)
+
+        compartido = {'default': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': '/tmp'}}
+        with override_settings(WEB_CONCURRENCY=4, CACHES=compartido):
+            self.assertEqual(revisar_cache_compartido(None), [])
+            exigir_cache_compartido(4)
@@ -5,8 +5,8 @@ set -o errexit
 # Install dependencies
 pip install -r requirements.txt
 
-# Collect static files
-python manage.py collectstatic --no-input
+# Collect static files: solo los que usan las plantillas, con hash, gzip y brotli
+python manage.py construir_estaticos
 
 # Run migrations
 python manage.py migrate
@@ -0,0 +1,54 @@
+"""
+Configuración de gunicorn. gunicorn la lee sola desde la raíz del proyecto:
+
+    gunicorn restaurante.wsgi
+
+Con preload_app el maestro importa Django una vez y calienta catálogo,
+referencias, URLs y plantillas antes de crear los workers, que lo heredan
+por copy-on-write. Cada worker abre y verifica sus propias conexiones a la
+base antes de aceptar tráfico (ver restaurante/arranque.py).
+
+Los workers comparten el catálogo, las referencias y la caché de órdenes
+pagadas a través del caché default. Sin REDIS_URL ese caché es local a cada
+proceso, así que por defecto hay un solo worker, y con WEB_CONCURRENCY > 1
+los workers no arrancan (ver apps/platillos/checks.py).
+
+Los workers son síncronos, así que /ordenes/eventos/ (Server-Sent Events)
+responde 501. Los eventos requieren servir la aplicación con uvicorn en un
+solo proceso (ver apps/ordenes/eventos.py).
+"""
+# Como módulo y no `from decouple import config`: gunicorn tomaría `config` como su opción -c
+import decouple
+
+wsgi_app = 'restaurante.wsgi:application'
+bind = f"0.0.0.0:{decouple.config('PORT', default='8000')}"
+workers = decouple.config('WEB_CONCURRENCY', default=2 if decouple.config('REDIS_URL', default=None) else 1, cast=int)
+timeout = decouple.config('GUNICORN_TIMEOUT', default=30, cast=int)
+preload_app = decouple.config('GUNICORN_PRELOAD', default=True, cast=bool)
+
+# Reciclar workers cada N peticiones (0 = nunca); el jitter evita que se reinicien todos juntos
+max_requests = decouple.config('GUNICORN_MAX_REQUESTS', default=0, cast=int)
+max_requests_jitter = max_requests // 10
+
+
+def when_ready(server):
+    if server.cfg.preload_app:
+        from restaurante.arranque import calentar
+        # Las conexiones del maestro no deben pasar a los workers
+        tiempos = calentar(cerrar_conexiones=True)
+        server.log.info('Maestro calentado: %s', _formato(tiempos))
+
+
+def post_worker_init(worker):
+    from apps.platillos.checks import exigir_cache_compartido
+    from restaurante.arranque import calentar
+    # ImproperlyConfigured aquí detiene a gunicorn (WORKER_BOOT_ERROR) en lugar de atender con cachés separados
+    exigir_cache_compartido(worker.cfg.workers)
+    tiempos = calentar()
+    worker.log.info('Worker %s calentado: %s', worker.pid, _formato(tiempos))
+
+
+def _formato(tiempos):
+    return ', '.join(
+        f'{nombre} {"falló" if segundos is None else f"{segundos * 1000:.0f} ms"}' for nombre, segundos in tiempos.items()
+    )
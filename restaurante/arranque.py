@@ -0,0 +1,87 @@
+"""
+Calentamiento de un worker antes de aceptar tráfico.
+
+gunicorn.conf.py llama a calentar() en el maestro (con preload_app, antes
+de crear los workers, para que hereden lo cargado) y en cada worker al
+terminar de iniciar. Así las primeras peticiones después de un deploy o de
+reciclar un worker no pagan la conexión a la base, la carga del catálogo y
+las referencias, la importación de las vistas ni la compilación de las
+plantillas. El comando medir_arranque reporta estos tiempos.
+"""
+import logging
+import time
+from pathlib import Path
+from django.apps import apps
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DatabaseError, connections
+from django.template.loader import get_template
+from django.urls import reverse
+
+logger = logging.getLogger(__name__)
+
+
+def abrir_conexiones():
+    """Abre cada conexión configurada y verifica que responda."""
+    for conexion in connections.all():
+        conexion.ensure_connection()
+        if not conexion.is_usable():
+            raise DatabaseError(f'La base {conexion.alias} no responde')
+
+
+def cargar_urls():
+    # Resolver una URL construye el URLconf completo e importa todas las vistas
+    reverse('index_user')
+
+
+def cargar_referencias():
+    # Es el mismo calentamiento que OrdenesConfig hace en el primer request; así ya no lo hace.
+    # Si faltan estados de mesa requeridos lanza EstadoMesaFaltante y el worker no arranca
+    apps.get_app_config('ordenes').calentar()
+
+
+def cargar_catalogo():
+    from apps.platillos.catalogo import obtener_catalogo
+    obtener_catalogo()
+
+
+def compilar_plantillas():
+    """Compila las plantillas del proyecto; el cargador con caché las guarda compiladas."""
+    for motor in settings.TEMPLATES:
+        for carpeta in map(Path, motor.get('DIRS', [])):
+            for plantilla in carpeta.rglob('*.html'):
+                get_template(plantilla.relative_to(carpeta).as_posix())
+
+
+PASOS = [
+    ('conexiones', abrir_conexiones),
+    ('urls', cargar_urls),
+    ('referencias', cargar_referencias),
+    ('catalogo', cargar_catalogo),
+    ('plantillas', compilar_plantillas),
+]
+
+
+def calentar(cerrar_conexiones=False):
+    """
+    Ejecuta cada paso de PASOS y retorna sus segundos. Un paso que falla se
+    registra en el log y queda en None, sin impedir que el worker arranque,
+    salvo por configuración incompleta (ImproperlyConfigured), que se lanza.
+    Con `cerrar_conexiones`, como en el maestro antes de crear los workers,
+    las conexiones no se heredan.
+    """
+    tiempos = {}
+    for nombre, paso in PASOS:
+        inicio = time.perf_counter()
+        try:
+            paso()
+        except ImproperlyConfigured:
+            raise
+        except Exception:
+            logger.exception('Falló el paso %s del calentamiento', nombre)
+            tiempos[nombre] = None
+        else:
+            tiempos[nombre] = time.perf_counter() - inicio
+    if cerrar_conexiones:
+        connections.close_all()
+    return tiempos
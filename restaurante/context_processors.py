@@ -0,0 +1,23 @@
+"""
+Variables para el caché de fragmentos de plantilla ({% cache %}).
+
+Los fragmentos del menú lateral y de las listas de catálogo varían con la
+versión del catálogo de platillos o del registro de referencias. Las
+señales de esos modelos cambian la versión en cada alta, edición o baja
+(también desde las vistas CRUD), así que el fragmento se vuelve a generar
+solo después de editar el menú. Se pasan funciones y no valores: la
+plantilla consulta la versión o el catálogo solo si los usa.
+"""
+from django.conf import settings
+from apps.ordenes.referencias import version_referencias
+from apps.platillos.catalogo import obtener_catalogo, version_catalogo
+
+
+def fragmentos(request):
+    return {
+        'fragmentos_timeout': settings.FRAGMENTOS_TIMEOUT,
+        'version_catalogo': version_catalogo,
+        'version_referencias': version_referencias,
+        'categorias_count': lambda: len(obtener_catalogo().categorias),
+        'platillos_count': lambda: len(obtener_catalogo().platillos),
+    }
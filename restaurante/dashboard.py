@@ -0,0 +1,81 @@
+"""
+Consultas agregadas del dashboard (index_user).
+
+Cada sección se resuelve con una sola consulta, de modo que el número de
+consultas es fijo sin importar cuántas órdenes pagadas existan:
+
+1. Ventas y número de órdenes por día de la semana actual (incluye hoy),
+   leídas de los acumulados de VentasDiarias (siete filas como máximo).
+2. Últimas órdenes registradas.
+3. Platillos más vendidos de la ventana elegida, leídos de los acumulados
+   por platillo (VentasPlatillo o VentasDiariasPlatillo).
+"""
+from datetime import timedelta
+from django.utils import timezone
+from apps.ordenes.models import Orden, VentasDiarias
+from apps.ordenes.ventas import mas_vendidos
+from apps.platillos.catalogo import obtener_catalogo
+
+CONSULTAS_DASHBOARD = 3
+
+VENTANAS_DASHBOARD = [('hoy', 'Hoy'), ('7d', '7 días'), ('30d', '30 días'), ('todo', 'Siempre')]
+
+
+def ventas_semana(hoy):
+    """Ventas por día de la semana (lunes a domingo) que contiene a `hoy`."""
+    lunes = hoy - timedelta(days=hoy.isoweekday() - 1)
+    dias = [lunes + timedelta(days=i) for i in range(7)]
+
+    por_dia = {
+        venta.fecha: venta
+        for venta in VentasDiarias.objects.filter(fecha__range=(dias[0], dias[-1]))
+    }
+
+    return [
+        {
+            'dia': dia,
+            'total': por_dia[dia].total if dia in por_dia else 0,
+            'cantidad': por_dia[dia].ordenes if dia in por_dia else 0,
+        }
+        for dia in dias
+    ]
+
+
+def platillos_mas_vendidos(limite=10, ventana='todo', hoy=None):
+    """Top de platillos de la ventana, leído de los acumulados por platillo; nombres y categorías salen del catálogo."""
+    catalogo = obtener_catalogo()
+    resultado = []
+    for fila in mas_vendidos(ventana, limite, hoy):
+        platillo = catalogo.platillo(fila['platillo_id'])
+        if platillo is None:
+            continue
+        resultado.append({
+            'platillo': platillo.nombre,
+            'categoria': platillo.categoria.nombre,
+            'cantidad': fila['cantidad'],
+            'ingresos': fila['total'],
+        })
+    return resultado
+
+
+def resumen_dashboard(hoy=None, ventana='todo'):
+    """
+    Retorna los datos del dashboard en CONSULTAS_DASHBOARD consultas.
+    `ventana` es una de VENTANAS_DASHBOARD para el top de platillos.
+    """
+    hoy = hoy or timezone.localdate()
+    semana = ventas_semana(hoy)
+    dia_actual = next(dia for dia in semana if dia['dia'] == hoy)
+
+    return {
+        'ventas_totales': dia_actual['total'],
+        'cantidad_ordenes': dia_actual['cantidad'],
+        'ventas_por_dia': [
+            {'dia': dia['dia'].strftime('%Y-%m-%d'), 'total': float(dia['total'])}
+            for dia in semana
+        ],
+        'ultimas_ordenes': list(Orden.objects.select_related('mesa').order_by('-fecha_hora')[:5]),
+        'platillos_mas_vendidos': platillos_mas_vendidos(ventana=ventana, hoy=hoy),
+        'ventana': ventana,
+        'ventanas': VENTANAS_DASHBOARD,
+    }
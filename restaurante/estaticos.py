@@ -0,0 +1,66 @@
+"""
+Archivos estáticos del proyecto: solo se recolecta lo que usan las plantillas.
+
+static/ trae la distribución completa de Bootstrap (RTL, grid, reboot,
+utilities, ESM, versiones sin minificar y source maps). ReferenciadosFinder
+reemplaza a FileSystemFinder en collectstatic y lista solo los archivos de
+STATICFILES_DIRS que aparecen en un {% static '...' %} de alguna plantilla;
+los estáticos de las apps (admin, DRF) se recolectan completos. En
+desarrollo, find() sigue encontrando cualquier archivo.
+
+EstaticosStorage agrega el hash al nombre y genera las versiones .gz y .br
+(brotli, si está instalado) al recolectar. WhiteNoise sirve esos nombres con
+Cache-Control immutable de un año. Ver el comando construir_estaticos.
+"""
+import re
+from pathlib import Path
+from django.apps import apps
+from django.conf import settings
+from django.contrib.staticfiles.finders import FileSystemFinder
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+PATRON_STATIC = re.compile(r"""{%\s*static\s+['"]([^'"]+)['"]""")
+
+
+def carpetas_de_plantillas():
+    for motor in settings.TEMPLATES:
+        yield from (Path(carpeta) for carpeta in motor.get('DIRS', []))
+        if motor.get('APP_DIRS'):
+            for app in apps.get_app_configs():
+                yield Path(app.path) / 'templates'
+
+
+def referencias_estaticas():
+    """Rutas usadas con {% static %} en todas las plantillas del proyecto y de las apps."""
+    referencias = set()
+    for carpeta in carpetas_de_plantillas():
+        for plantilla in carpeta.rglob('*.html') if carpeta.is_dir() else ():
+            referencias.update(PATRON_STATIC.findall(plantilla.read_text(encoding='utf-8-sig')))
+    return referencias
+
+
+class ReferenciadosFinder(FileSystemFinder):
+    def list(self, ignore_patterns):
+        referencias = referencias_estaticas()
+        for ruta, storage in super().list(ignore_patterns):
+            if ruta.replace('\\', '/') in referencias:
+                yield ruta, storage
+
+
+class EstaticosStorage(CompressedManifestStaticFilesStorage):
+    # Los source maps no se recolectan: se deja el comentario sourceMappingURL tal cual
+    # en lugar de reescribirlo con el hash de un archivo que no existe
+    patterns = tuple(
+        (extension, tuple(patron for patron in lista if 'sourceMappingURL' not in str(patron)))
+        for extension, lista in CompressedManifestStaticFilesStorage.patterns
+    )
+
+    def stored_name(self, name):
+        # Sin manifest (desarrollo, pruebas) se usa el nombre sin hash; en producción un
+        # archivo que no se recolectó es un error, no una URL rota (ESTATICOS_ESTRICTOS)
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            if settings.ESTATICOS_ESTRICTOS:
+                raise
+            return name
@@ -0,0 +1,125 @@
+"""
+Medición por request de consultas SQL, render de plantillas y tiempo total.
+
+MetricasMiddleware abre una Medicion en una variable de contexto; el wrapper
+de consultas (instalado en cada conexión) y el backend de plantillas
+DjangoTemplatesMedidas suman a la medición activa. Al terminar, el resultado
+va al encabezado Server-Timing y a una ventana de muestras por vista de la
+que se calculan percentiles (ver la vista metricas). El registro vive en la
+memoria del proceso, así que con varios workers cada uno reporta solo las
+peticiones que atendió.
+"""
+import threading
+import time
+from collections import defaultdict, deque
+from contextvars import ContextVar
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.template.backends.django import DjangoTemplates
+
+medicion_actual = ContextVar('medicion_actual', default=None)
+
+
+class Medicion:
+    __slots__ = ('consultas', 'db', 'plantillas')
+
+    def __init__(self):
+        self.consultas = 0
+        self.db = 0.0
+        self.plantillas = 0.0
+
+
+def medir_consulta(execute, sql, params, many, context):
+    medicion = medicion_actual.get()
+    if medicion is None:
+        return execute(sql, params, many, context)
+    inicio = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        medicion.consultas += 1
+        medicion.db += time.perf_counter() - inicio
+
+
+def instalar_en_conexion(connection, **kwargs):
+    if medir_consulta not in connection.execute_wrappers:
+        connection.execute_wrappers.append(medir_consulta)
+
+
+def instalar_en_conexiones_abiertas():
+    for connection in connections.all(initialized_only=True):
+        instalar_en_conexion(connection)
+
+
+connection_created.connect(instalar_en_conexion, dispatch_uid='metricas_medir_consultas')
+
+
+class PlantillaMedida:
+    def __init__(self, plantilla):
+        self.plantilla = plantilla
+
+    def __getattr__(self, nombre):
+        return getattr(self.plantilla, nombre)
+
+    def render(self, context=None, request=None):
+        medicion = medicion_actual.get()
+        if medicion is None:
+            return self.plantilla.render(context, request)
+        inicio = time.perf_counter()
+        try:
+            return self.plantilla.render(context, request)
+        finally:
+            medicion.plantillas += time.perf_counter() - inicio
+
+
+class DjangoTemplatesMedidas(DjangoTemplates):
+    """Backend de plantillas de Django que suma el tiempo de render a la medición activa."""
+
+    def from_string(self, template_code):
+        return PlantillaMedida(super().from_string(template_code))
+
+    def get_template(self, template_name):
+        return PlantillaMedida(super().get_template(template_name))
+
+
+def percentil(valores_ordenados, p):
+    indice = min(len(valores_ordenados) - 1, int(round(p / 100 * (len(valores_ordenados) - 1))))
+    return valores_ordenados[indice]
+
+
+class RegistroMetricas:
+    """Últimas N muestras por vista; agregar es O(1) y los percentiles se calculan al leer."""
+
+    campos = ('total', 'db', 'plantillas', 'consultas')
+
+    def __init__(self, muestras):
+        self.muestras = muestras
+        self._por_vista = defaultdict(lambda: deque(maxlen=self.muestras))
+        self._lock = threading.Lock()
+
+    def agregar(self, vista, total, medicion):
+        with self._lock:
+            self._por_vista[vista].append((total, medicion.db, medicion.plantillas, medicion.consultas))
+
+    def resumen(self):
+        with self._lock:
+            copia = {vista: list(muestras) for vista, muestras in self._por_vista.items()}
+
+        resumen = {}
+        for vista, muestras in copia.items():
+            resumen[vista] = {'muestras': len(muestras)}
+            for posicion, campo in enumerate(self.campos):
+                valores = sorted(muestra[posicion] for muestra in muestras)
+                escala = 1 if campo == 'consultas' else 1000
+                resumen[vista][campo] = {
+                    f'p{p}': round(percentil(valores, p) * escala, 2) for p in (50, 95, 99)
+                }
+        return resumen
+
+    def limpiar(self):
+        with self._lock:
+            self._por_vista.clear()
+
+
+registro = RegistroMetricas(getattr(settings, 'METRICAS_MUESTRAS', 500))
@@ -0,0 +1,105 @@
+import time
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from .metricas import Medicion, instalar_en_conexiones_abiertas, medicion_actual, registro
+from .replicas import COOKIE_ESCRITURA, EstadoLectura, es_de_lectura, estado_actual
+
+
+class MetricasMiddleware:
+    """
+    Mide cada request (consultas SQL, tiempo en base de datos, render de
+    plantillas y total), lo reporta en el encabezado Server-Timing y lo
+    acumula por vista en metricas.registro.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.es_async = iscoroutinefunction(get_response)
+        if self.es_async:
+            markcoroutinefunction(self)
+        instalar_en_conexiones_abiertas()
+
+    def __call__(self, request):
+        if self.es_async:
+            return self.__acall__(request)
+        medicion = Medicion()
+        token = medicion_actual.set(medicion)
+        inicio = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            medicion_actual.reset(token)
+        return self.registrar(request, response, medicion, time.perf_counter() - inicio)
+
+    async def __acall__(self, request):
+        medicion = Medicion()
+        token = medicion_actual.set(medicion)
+        inicio = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            medicion_actual.reset(token)
+        return self.registrar(request, response, medicion, time.perf_counter() - inicio)
+
+    def registrar(self, request, response, medicion, total):
+        vista = request.resolver_match.view_name if request.resolver_match else 'sin_resolver'
+        registro.agregar(vista, total, medicion)
+        response['Server-Timing'] = (
+            f'db;dur={medicion.db * 1000:.1f};desc="{medicion.consultas} consultas", '
+            f'tpl;dur={medicion.plantillas * 1000:.1f}, '
+            f'total;dur={total * 1000:.1f}'
+        )
+        return response
+
+
+class ReplicaMiddleware:
+    """
+    Decide por petición si las lecturas van a la réplica (ver
+    restaurante/replicas.py). Debe ir antes de SessionMiddleware para ver
+    también la escritura de la sesión al responder.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.es_async = iscoroutinefunction(get_response)
+        if self.es_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.es_async:
+            return self.__acall__(request)
+        estado = EstadoLectura()
+        token = estado_actual.set(estado)
+        try:
+            response = self.get_response(request)
+        finally:
+            estado_actual.reset(token)
+        return self.marcar_escritura(response, estado)
+
+    async def __acall__(self, request):
+        estado = EstadoLectura()
+        token = estado_actual.set(estado)
+        try:
+            response = await self.get_response(request)
+        finally:
+            estado_actual.reset(token)
+        return self.marcar_escritura(response, estado)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        estado = estado_actual.get()
+        if (
+            estado is not None and settings.DATABASE_REPLICA and request.method in ('GET', 'HEAD')
+            and es_de_lectura(view_func) and COOKIE_ESCRITURA not in request.COOKIES
+        ):
+            estado.replica = True
+
+    def marcar_escritura(self, response, estado):
+        if estado.escribio and settings.DATABASE_REPLICA:
+            response.set_cookie(
+                COOKIE_ESCRITURA, '1', max_age=settings.REPLICA_PEGAJOSA_SEGUNDOS, httponly=True, samesite='Lax',
+            )
+        return response
@@ -0,0 +1,15 @@
+"""
+Corredor de pruebas del proyecto (TEST_RUNNER en settings).
+
+Las pruebas corren sin collectstatic, así que no hay manifest de estáticos:
+se desactiva ESTATICOS_ESTRICTOS para que las plantillas usen el nombre sin
+hash. EstaticosTests activa el modo estricto con override_settings.
+"""
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+
+
+class CorredorPruebas(DiscoverRunner):
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        settings.ESTATICOS_ESTRICTOS = False
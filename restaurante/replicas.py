@@ -0,0 +1,80 @@
+"""
+Réplica de lectura opcional para el dashboard, los reportes y la API de
+solo lectura.
+
+Con DATABASE_REPLICA_URL configurada, settings agrega el alias 'replica'.
+Las vistas marcadas con @lectura_en_replica leen de la réplica cuando la
+petición es GET o HEAD; todo lo demás (captura de órdenes, pagos, catálogo)
+sigue en el primario. ReplicaMiddleware guarda el estado de cada petición
+en estado_actual y ReplicaRouter lo consulta.
+
+Leer lo propio: si una petición escribe, el resto de la petición lee del
+primario, y el middleware deja una cookie para que las siguientes
+peticiones de ese cliente también lo hagan durante REPLICA_PEGAJOSA_SEGUNDOS,
+el retraso máximo esperado de la réplica. Dentro de una transacción en el
+primario también se lee del primario.
+
+Las respuestas en streaming (exportación CSV) se generan después de salir
+del middleware; por eso fijan con base_de_lectura() el alias al armar la
+respuesta y sus consultas usan .using(alias).
+"""
+from contextvars import ContextVar
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+COOKIE_ESCRITURA = 'escritura_reciente'
+
+
+class EstadoLectura:
+    """Estado de la petición en curso; es mutable para que los hilos de sync_to_async lo compartan."""
+    def __init__(self):
+        self.replica = False
+        self.escribio = False
+
+
+estado_actual = ContextVar('estado_lectura', default=None)
+
+
+def lectura_en_replica(vista):
+    """Marca una vista (función o clase) cuyas lecturas GET pueden ir a la réplica."""
+    vista.lectura_replica = True
+    return vista
+
+
+def es_de_lectura(vista):
+    clase = getattr(vista, 'view_class', None)
+    return getattr(vista, 'lectura_replica', False) or getattr(clase, 'lectura_replica', False)
+
+
+def base_de_lectura():
+    """Alias al que van ahora las lecturas de la petición en curso."""
+    return ReplicaRouter().db_for_read(None) or DEFAULT_DB_ALIAS
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        estado = estado_actual.get()
+        if estado is None or not estado.replica or not settings.DATABASE_REPLICA:
+            return None
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        return settings.DATABASE_REPLICA
+
+    def db_for_write(self, model, **hints):
+        estado = estado_actual.get()
+        if estado is not None:
+            estado.escribio = True
+            estado.replica = False
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        bases = {DEFAULT_DB_ALIAS, settings.DATABASE_REPLICA}
+        if obj1._state.db in bases and obj2._state.db in bases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # La réplica se copia del primario, nunca se migra directamente
+        if db == settings.DATABASE_REPLICA:
+            return False
+        return None
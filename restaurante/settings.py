@@ -52,6 +52,8 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',  # Whitenoise for static files
+    'restaurante.middleware.MetricasMiddleware',  # Server-Timing y percentiles por vista
+    'restaurante.middleware.ReplicaMiddleware',  # Lecturas en la réplica, antes de la sesión
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -64,7 +66,8 @@ ROOT_URLCONF = 'restaurante.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates con medición del tiempo de render (ver restaurante/metricas.py)
+        'BACKEND': 'restaurante.metricas.DjangoTemplatesMedidas',
         'DIRS': [os.path.join(BASE_DIR, 'templates')],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -72,6 +75,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'restaurante.context_processors.fragmentos',
             ],
         },
     },
@@ -100,6 +104,71 @@ else:
         }
     }
 
+# Réplica de lectura opcional para dashboard, reportes y API de solo lectura
+# (ver restaurante/replicas.py). Para probar en local con dos archivos:
+# DATABASE_URL=sqlite:///db.sqlite3 DATABASE_REPLICA_URL=sqlite:///replica.sqlite3
+if config('DATABASE_REPLICA_URL', default=None):
+    DATABASES['replica'] = dj_database_url.parse(
+        config('DATABASE_REPLICA_URL'),
+        conn_max_age=600,
+        conn_health_checks=True,
+    )
+    # En pruebas la réplica apunta a la misma base de pruebas que default
+    DATABASES['replica']['TEST'] = {'MIRROR': 'default'}
+    DATABASE_REPLICA = 'replica'
+else:
+    DATABASE_REPLICA = None
+
+DATABASE_ROUTERS = ['restaurante.replicas.ReplicaRouter']
+
+# Segundos que un cliente que acaba de escribir sigue leyendo del primario (retraso máximo de la réplica)
+REPLICA_PEGAJOSA_SEGUNDOS = config('REPLICA_PEGAJOSA_SEGUNDOS', default=10, cast=int)
+
+# Perfil SQLite para varios workers de gunicorn, aplicado en cada conexión:
+# - WAL: las lecturas no bloquean al escritor ni al revés.
+# - timeout: espera el bloqueo de escritura en lugar de fallar con "database is locked".
+# - BEGIN IMMEDIATE: las transacciones (captura de órdenes, pagos) toman el bloqueo de
+#   escritura al empezar; con BEGIN normal, dos transacciones que leen y luego escriben
+#   se bloquean entre sí y una falla sin esperar.
+# - synchronous=NORMAL: con WAL no se pierde consistencia, solo las últimas transacciones
+#   si se cae el sistema operativo.
+# Ver el comando benchmark_escrituras.
+SQLITE_TIMEOUT = config('SQLITE_TIMEOUT', default=20, cast=int)
+SQLITE_SYNCHRONOUS = config('SQLITE_SYNCHRONOUS', default='NORMAL')
+SQLITE_CACHE_KB = config('SQLITE_CACHE_KB', default=64 * 1024, cast=int)
+for _base in DATABASES.values():
+    if _base['ENGINE'] == 'django.db.backends.sqlite3':
+        _base.setdefault('OPTIONS', {}).update({
+            'timeout': SQLITE_TIMEOUT,
+            'transaction_mode': 'IMMEDIATE',
+            'init_command': (
+                'PRAGMA journal_mode=WAL;'
+                f'PRAGMA synchronous={SQLITE_SYNCHRONOUS};'
+                f'PRAGMA cache_size=-{SQLITE_CACHE_KB}'
+            ),
+        })
+del _base
+
+
+# Cache
+# El catálogo de platillos y las referencias se guardan por worker y su versión
+# en este caché. LocMemCache es local a cada proceso: con más de un worker
+# (WEB_CONCURRENCY) hace falta REDIS_URL; el check platillos.E001 lo exige.
+WEB_CONCURRENCY = config('WEB_CONCURRENCY', default=1, cast=int)
+if config('REDIS_URL', default=None):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': config('REDIS_URL'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -141,8 +210,29 @@ STATICFILES_DIRS = [
 ]
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 
-# Whitenoise configuration for serving static files
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+# Solo se recolectan los archivos de static/ que usan las plantillas (ver restaurante/estaticos.py)
+STATICFILES_FINDERS = [
+    'restaurante.estaticos.ReferenciadosFinder',
+    'django.contrib.staticfiles.finders.AppDirectoriesFinder',
+]
+
+# Whitenoise configuration for serving static files: nombres con hash, .gz y .br.
+# Django 5.1 ya no lee STATICFILES_STORAGE, se configura en STORAGES
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'restaurante.estaticos.EstaticosStorage',
+    },
+}
+# Sin los originales sin hash en STATIC_ROOT; las plantillas siempre piden el nombre con hash
+WHITENOISE_KEEP_ONLY_HASHED_FILES = True
+# Si una plantilla pide un estático sin entrada en el manifest, falla al renderizar en lugar
+# de generar una URL que responde 404. En desarrollo se usa el nombre sin hash; las pruebas
+# corren sin collectstatic y el corredor lo desactiva (restaurante/pruebas.py).
+ESTATICOS_ESTRICTOS = config('ESTATICOS_ESTRICTOS', default=not DEBUG, cast=bool)
+TEST_RUNNER = 'restaurante.pruebas.CorredorPruebas'
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
@@ -151,6 +241,27 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 AUTH_USER_MODEL = 'accounts.AppUser'
 
+# Muestras por vista para los percentiles de /metricas/
+METRICAS_MUESTRAS = config('METRICAS_MUESTRAS', default=500, cast=int)
+
+# Paginación por cursor de órdenes (lista HTML y /api/ultimas-ordenes/)
+ORDENES_POR_PAGINA = config('ORDENES_POR_PAGINA', default=25, cast=int)
+ORDENES_POR_PAGINA_API = config('ORDENES_POR_PAGINA_API', default=10, cast=int)
+ORDENES_POR_PAGINA_MAX = config('ORDENES_POR_PAGINA_MAX', default=100, cast=int)
+
+# Órdenes pagadas (ver apps/ordenes/pagadas.py): segundos en el caché del servidor y
+# max-age de /api/ordenes/<id>/ en el cliente, que después revalida con su ETag. Acotan
+# cuánto se sirve una orden corregida si su invalidación no llega a algún caché.
+ORDENES_PAGADAS_TIMEOUT = config('ORDENES_PAGADAS_TIMEOUT', default=3600, cast=int)
+ORDENES_PAGADAS_MAX_AGE = config('ORDENES_PAGADAS_MAX_AGE', default=300, cast=int)
+
+# Segundos que se guardan los fragmentos de plantilla; las claves llevan la versión del
+# catálogo o de las referencias, así que esto solo limpia las versiones viejas
+FRAGMENTOS_TIMEOUT = config('FRAGMENTOS_TIMEOUT', default=24 * 3600, cast=int)
+
+# Antigüedad en días a partir de la cual archivar_ordenes mueve órdenes pagadas al archivo
+ARCHIVO_DIAS = config('ARCHIVO_DIAS', default=365, cast=int)
+
 # Django REST Framework Configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
@@ -26,4 +26,5 @@ urlpatterns = [
     path('ordenes/', include('apps.ordenes.urls')),
     path('dashboard/', views.index_user, name='index_user'),
     path('api/', include('apps.api.urls')),
+    path('metricas/', views.metricas, name='metricas'),
 ]
\ No newline at end of file
@@ -0,0 +1,28 @@
+"""
+Versiones compartidas entre workers de los registros en memoria
+(apps.platillos.catalogo y apps.ordenes.referencias).
+
+Cada registro guarda sus filas junto con la versión con la que se cargó y
+la compara en cada uso con la del caché default; las señales de sus modelos
+la cambian en cada alta, edición o baja.
+"""
+import uuid
+from django.core.cache import cache
+from django.db import transaction
+
+
+def obtener_version(clave):
+    version = cache.get(clave)
+    if version is None:
+        cache.add(clave, uuid.uuid4().hex, None)
+        version = cache.get(clave)
+    return version
+
+
+def cambiar_version(clave):
+    """
+    Cambia la versión ahora y otra vez al confirmar la transacción, para que
+    ningún worker se quede con datos leídos antes del commit.
+    """
+    cache.set(clave, uuid.uuid4().hex, None)
+    transaction.on_commit(lambda: cache.set(clave, uuid.uuid4().hex, None))